@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmark: streaming VTT parser vs. the original line-set parser.
+
+Usage:
+    uv run python benchmarks/bench_vtt_parser.py [--hours 1 3 6] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import time
+import tracemalloc
+
+from trip_planner.tools.youtube import _parse_vtt_lines
+
+WORDS = (
+    "tokyo shibuya crossing ramen sushi market temple shrine station train "
+    "walk street food night view tower park garden museum coffee bar alley "
+    "today we are going to try the best spot in town and it is really amazing "
+    "so let's head over there right now because the line gets long later"
+).split()
+
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def legacy_parse_vtt_lines(raw_lines):
+    """The original parser: whole-line set dedup, join, then truncate."""
+    lines = []
+    seen_lines = set()
+    for line in raw_lines:
+        line = line.strip()
+        if not line or 'WEBVTT' in line or '-->' in line or line.isdigit():
+            continue
+        if line not in seen_lines:
+            lines.append(line)
+            seen_lines.add(line)
+    full_text = " ".join(lines)
+    if len(full_text) > 15000:
+        full_text = full_text[:15000] + "... (truncated)"
+    return full_text
+
+
+def _ts(seconds: float) -> str:
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{int(h):02d}:{int(m):02d}:{s:06.3f}"
+
+
+def make_rolling_vtt(hours: float, seed: int = 7) -> list[str]:
+    """
+    Builds a YouTube-style auto-caption track: every cue repeats the
+    previous line, carries inline word timings, and is followed by a
+    10ms 'settle' cue with the plain text.
+    """
+    rng = random.Random(seed)
+    lines = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    t = 0.0
+    previous = ""
+    while t < hours * 3600:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(5, 9))]
+        timed = words[0] + "".join(
+            f"<{_ts(t + 0.3 * (i + 1))}><c> {w}</c>" for i, w in enumerate(words[1:])
+        )
+        lines += [f"{_ts(t)} --> {_ts(t + 2.5)} align:start position:0%", previous or " ", timed, ""]
+        current = " ".join(words)
+        lines += [f"{_ts(t + 2.5)} --> {_ts(t + 2.51)} align:start position:0%", current, " ", ""]
+        previous = current
+        t += 2.51
+    return lines
+
+
+def _signal_stats(text: str) -> tuple[float, float]:
+    """
+    Rough 'signal per byte' proxies:
+    - markup %: share of characters spent on leaked <...> timing tags
+    - dup %: share of word 4-grams (tags removed) that already appeared
+    """
+    clean = _TAG_RE.sub("", text)
+    markup = 1 - len(clean) / max(1, len(text))
+    words = clean.split()
+    grams = list(zip(words, words[1:], words[2:], words[3:], strict=False))
+    dup = 1 - len(set(grams)) / max(1, len(grams))
+    return markup * 100, dup * 100
+
+
+def _measure(fn, lines, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(iter(lines))
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(iter(lines))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 3])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("legacy (15k chars)", legacy_parse_vtt_lines),
+        ("streaming (15k chars)", lambda it: _parse_vtt_lines(it, max_chars=15000, max_tokens=0)),
+        ("streaming (full track)", lambda it: _parse_vtt_lines(it, max_chars=0, max_tokens=0)),
+    ]
+
+    print(f"{'fixture':>10} | {'parser':<24} | {'time ms':>9} | {'peak KiB':>9} | {'out chars':>9} | {'markup %':>8} | {'dup %':>6}")
+    print("-" * 95)
+    for hours in args.hours:
+        lines = make_rolling_vtt(hours)
+        label = f"{hours:g}h/{len(lines) // 1000}k ln"
+        for name, fn in cases:
+            out, best, peak = _measure(fn, lines, args.repeat)
+            markup, dup = _signal_stats(out)
+            print(
+                f"{label:>10} | {name:<24} | {best * 1000:9.2f} | {peak / 1024:9.0f} | "
+                f"{len(out):9d} | {markup:8.1f} | {dup:6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ from absl import app, flags
 from dotenv import load_dotenv
 
 from trip_planner.agent import root_agent
+from trip_planner.memory_ingest import MemoryIngestPlugin
 
 from google.adk.sessions import VertexAiSessionService
 
@@ -50,7 +51,7 @@ def create(env_vars: dict[str, str]) -> None:
         agent=root_agent,
         enable_tracing=True,
         env_vars=env_vars,
-        plugins=[LoggingPlugin()]
+        plugins=[LoggingPlugin(), MemoryIngestPlugin()]
         )
 
     remote_agent = agent_engines.create(  
@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from trip_planner.shared_libraries import circuit_breaker
+from trip_planner.shared_libraries.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake.monotonic)
+    return fake
+
+
+def _breaker(**kwargs):
+    options = {"failure_threshold": 2, "base_backoff_seconds": 10, "max_backoff_seconds": 40, "jitter": 0}
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.snapshot()["rejected"] == 1
+    assert breaker.retry_after() == pytest.approx(10)
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_lets_exactly_one_probe_through(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_doubles_the_backoff_up_to_the_cap(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    backoffs = []
+    for _ in range(4):
+        clock.now += breaker.retry_after()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        backoffs.append(breaker.retry_after())
+
+    assert backoffs == [pytest.approx(20), pytest.approx(40), pytest.approx(40), pytest.approx(40)]
+
+
+def test_neutral_result_frees_the_probe_without_closing(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+
+    breaker.record_neutral()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,117 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from trip_planner.tools import compactor
+
+
+class FakeClient:
+    """Answers distill calls; merge calls fail while `fail_merges` is set."""
+    def __init__(self):
+        self.fail_merges = False
+        self.calls = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self.generate_content))
+
+    async def generate_content(self, model, contents):
+        self.calls += 1
+        if "Merge them into one set of notes" in contents:
+            if self.fail_merges:
+                raise RuntimeError("quota exceeded")
+            return SimpleNamespace(text="- Merged | Sight | - | Everything")
+        return SimpleNamespace(text=f"- Place {self.calls} | Sight | - | Seen")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(compactor, "_get_client", lambda: fake)
+    # Small calls, so a short transcript needs several chunks and a merge
+    monkeypatch.setattr(compactor, "CALL_MAX_TOKENS", 400)
+    monkeypatch.setattr(compactor, "CHUNK_OVERLAP_TOKENS", 10)
+    compactor.compaction_cache.clear()
+    return fake
+
+
+def _transcript(words: int = 1500) -> str:
+    return " ".join(f"word{i}" for i in range(words))
+
+
+def _compact(transcript: str):
+    return asyncio.run(compactor._compact_transcript(0, transcript, asyncio.Semaphore(4)))
+
+
+def test_long_transcripts_are_mapped_then_merged(client):
+    entry, succeeded = _compact(_transcript())
+
+    assert succeeded
+    assert entry == "--- Source 1 ---\n- Merged | Sight | - | Everything"
+
+
+def test_failed_merges_are_not_cached(client):
+    transcript = _transcript()
+    client.fail_merges = True
+    entry, succeeded = _compact(transcript)
+
+    # The partial notes are still returned, just not merged
+    assert succeeded
+    assert entry.count("| Sight |") > 1
+
+    # The next attempt merges instead of serving the degraded result
+    client.fail_merges = False
+    entry, _ = _compact(transcript)
+    assert entry == "--- Source 1 ---\n- Merged | Sight | - | Everything"
+
+
+def test_complete_results_are_cached(client):
+    transcript = _transcript()
+    _compact(transcript)
+    calls = client.calls
+
+    _compact(transcript)
+    assert client.calls == calls
+
+
+def test_each_event_loop_gets_its_own_client(monkeypatch):
+    monkeypatch.setattr(compactor, "Client", lambda: object())
+
+    async def two_lookups():
+        return compactor._get_client(), compactor._get_client()
+
+    first, again = asyncio.run(two_lookups())
+    other, _ = asyncio.run(two_lookups())
+
+    assert first is again
+    assert other is not first
+
+
+def test_failed_compaction_falls_back_loudly(client, caplog):
+    async def fail(model, contents):
+        raise RuntimeError("event loop is closed")
+
+    client.aio.models.generate_content = fail
+    transcript = _transcript(100)
+
+    entry, succeeded = _compact(transcript)
+
+    assert (entry, succeeded) == (transcript, False)
+    assert any(
+        record.levelname == "WARNING" and "not compacted" in record.getMessage()
+        for record in caplog.records
+    )
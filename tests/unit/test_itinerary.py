@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from types import SimpleNamespace
+
+from trip_planner import state_views
+from trip_planner.shared_libraries.poi_store import POIStore
+from trip_planner.shared_libraries.types import Itinerary
+from trip_planner.tools.itinerary import draft_itinerary, save_itinerary
+
+ITINERARY = {
+    "destination": "Tokyo",
+    "days": [
+        {
+            "day_number": 1,
+            "events": [
+                {
+                    "event_type": "visit",
+                    "location": "Senso-ji",
+                    "description": "Oldest temple",
+                    "address": "Asakusa",
+                    "start_time": "09:00",
+                    "end_time": "11:00",
+                    "booking_required": False,
+                },
+            ],
+        }
+    ],
+}
+
+
+def test_save_itinerary_stores_one_plain_dict():
+    context = SimpleNamespace(state={})
+
+    result = save_itinerary(ITINERARY, context)
+
+    assert result["status"].startswith("Itinerary saved successfully")
+    assert context.state == {"itinerary": Itinerary(**ITINERARY).model_dump()}
+
+
+def test_root_view_renders_the_saved_itinerary():
+    context = SimpleNamespace(state={"destination": "Tokyo", "ideas_videos": ["v"], "ideas_raw_text": ["t"]})
+    save_itinerary(ITINERARY, context)
+
+    assert state_views.render_state_views(context.state)["itinerary"].startswith("Tokyo, 1 days")
+
+
+def test_draft_itinerary_stores_a_plain_dict():
+    store = POIStore()
+    store.add("Senso-ji", "Sight", "Asakusa", "Oldest temple", 1)
+    context = SimpleNamespace(state={"destination": "Tokyo", "ideas_pois": store.to_state()})
+
+    draft_itinerary(1, context)
+
+    draft = context.state["itinerary_draft"]
+    assert isinstance(draft, dict)
+    assert draft["days"][0]["events"][0]["location"] == "Senso-ji"
+    assert "Senso-ji" in state_views.render_draft_itinerary(context.state)
@@ -0,0 +1,159 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from trip_planner.shared_libraries.itinerary_validation import (
+    parse_time,
+    validate_itinerary,
+)
+
+
+def _event(location, start, end, **extra):
+    return {
+        "location": location,
+        "description": "A visit",
+        "address": "Tokyo",
+        "start_time": start,
+        "end_time": end,
+        **extra,
+    }
+
+
+def _itinerary(*days):
+    return {
+        "destination": "Tokyo",
+        "days": [{"day_number": i + 1, "events": list(events)} for i, events in enumerate(days)],
+    }
+
+
+@pytest.mark.parametrize(
+    "value, minutes",
+    [
+        ("09:00", 540),
+        ("9.30", 570),
+        ("9pm", 1260),
+        ("12 am", 0),
+        ("noon", 720),
+        ("24:00", 1440),
+        ("9", None),
+        ("25:00", None),
+        (900, None),
+    ],
+)
+def test_parse_time(value, minutes):
+    assert parse_time(value) == minutes
+
+
+def test_valid_itinerary_has_no_problems():
+    report = validate_itinerary(_itinerary([_event("Senso-ji", "09:00", "11:00")]))
+
+    assert report.errors == []
+    assert report.warnings == []
+    assert report.repairs == []
+
+
+def test_trivial_problems_are_repaired_in_a_copy():
+    original = _itinerary(
+        [
+            _event("Lunch", "12:00", "13:00", booking_required="yes"),
+            _event("Senso-ji", "9:00", "11:00"),
+        ]
+    )
+
+    report = validate_itinerary(original)
+
+    assert report.errors == []
+    events = report.itinerary["days"][0]["events"]
+    assert [event["location"] for event in events] == ["Senso-ji", "Lunch"]
+    assert events[0]["start_time"] == "09:00"
+    assert events[1]["booking_required"] is True
+    assert original["days"][0]["events"][0]["booking_required"] == "yes"
+    assert len(report.repairs) == 3
+
+
+def test_all_errors_are_collected_with_paths():
+    itinerary = _itinerary(
+        [_event("Senso-ji", "09:00", "11:00"), _event("Ueno", "10:00", "12:00")],
+        [_event("", "later", "12:00")],
+    )
+
+    report = validate_itinerary(itinerary)
+
+    assert report.errors == [
+        "days[0].events[1]: overlaps days[0].events[0] (10:00 starts before 11:00 ends)",
+        "days[1].events[0].location: is required",
+        "days[1].events[0].start_time: 'later' is not a time in HH:MM format",
+    ]
+
+
+def test_repeated_locations_are_warnings():
+    report = validate_itinerary(
+        _itinerary([_event("Hotel", "08:00", "09:00")], [_event("The Hotel", "08:00", "09:00")])
+    )
+
+    assert report.errors == []
+    assert report.warnings == ["days[1].events[0].location: 'The Hotel' is already scheduled at days[0].events[0].location"]
+
+
+def test_overnight_events_are_allowed_and_noted():
+    report = validate_itinerary(
+        _itinerary([_event("Dinner", "19:00", "21:00"), _event("Golden Gai", "22:00", "02:00")])
+    )
+
+    assert report.errors == []
+    assert report.warnings == ["days[0].events[1]: runs overnight (22:00 to 02:00 the next day)"]
+
+
+def test_overnight_events_still_overlap_later_events():
+    report = validate_itinerary(
+        _itinerary([_event("Golden Gai", "22:00", "02:00"), _event("Karaoke", "23:30", "23:59")])
+    )
+
+    assert report.errors == [
+        "days[0].events[1]: overlaps days[0].events[0] (23:30 starts before 02:00 ends)"
+    ]
+
+
+@pytest.mark.parametrize("start, end", [("14:00", "10:00"), ("10:00", "10:00")])
+def test_end_before_start_is_an_error(start, end):
+    report = validate_itinerary(_itinerary([_event("Senso-ji", start, end)]))
+
+    assert len(report.errors) == 1
+    assert report.errors[0].startswith(f"days[0].events[0].end_time: {end} must be after start_time {start}")
+
+
+def test_midnight_end_is_kept():
+    report = validate_itinerary(_itinerary([_event("Izakaya", "21:00", "24:00")]))
+
+    assert report.errors == []
+    assert report.repairs == []
+    assert report.itinerary["days"][0]["events"][0]["end_time"] == "24:00"
+
+
+def test_midnight_start_is_rejected():
+    report = validate_itinerary(_itinerary([_event("Izakaya", "24:00", "01:00")]))
+
+    assert report.errors == ["days[0].events[0].start_time: 24:00 is only valid as an end_time; use 00:00"]
+
+
+def test_day_numbers_must_run_without_gaps():
+    itinerary = _itinerary([_event("Senso-ji", "09:00", "11:00")], [_event("Ueno", "09:00", "11:00")])
+    itinerary["days"][1]["day_number"] = 3
+
+    report = validate_itinerary(itinerary)
+
+    assert report.errors == ["days: day_number values must run 1..2 without gaps; missing [2]"]
@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import logging
+import queue
+
+import pytest
+
+from trip_planner import logger_config
+from trip_planner.logger_config import DebugRateLimitFilter, _DeferredQueueHandler
+
+
+def _record(msg, *args, level=logging.DEBUG):
+    return logging.LogRecord("trip_planner.test", level, __file__, 1, msg, args, None)
+
+
+def _prepared(msg, *args):
+    handler = _DeferredQueueHandler(queue.SimpleQueue())
+    return handler.prepare(_record(msg, *args))
+
+
+def test_immutable_args_are_formatted_later():
+    record = _prepared("Fetched %s in %.1fs", "https://youtu.be/a", 1.5)
+
+    assert record.args == ("https://youtu.be/a", 1.5)
+    assert record.getMessage() == "Fetched https://youtu.be/a in 1.5s"
+
+
+def test_mutable_args_are_formatted_in_the_caller():
+    state = {"destination": "Tokyo"}
+    videos = ["a"]
+    record = _prepared("State %s, videos %s", state, videos)
+
+    state["destination"] = "Kyoto"
+    videos.append("b")
+
+    assert record.args is None
+    assert record.getMessage() == "State {'destination': 'Tokyo'}, videos ['a']"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(logger_config.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_rate_limit_drops_records_past_the_limit_and_reports_them(clock):
+    limiter = DebugRateLimitFilter(limit=2, window=10)
+
+    passed = [limiter.filter(_record("Video %s done", i)) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    clock[0] = 10.0
+    record = _record("Video %s done", 5)
+    assert limiter.filter(record)
+    assert record.getMessage() == "Video 5 done (3 similar lines suppressed)"
+
+
+def test_suppressed_note_is_added_to_the_formatted_message(clock):
+    limiter = DebugRateLimitFilter(limit=1, window=10)
+    limiter.filter(_record("Compacted %d%% of %s", 40, "a"))
+    limiter.filter(_record("Compacted %d%% of %s", 60, "b"))
+
+    clock[0] = 10.0
+    record = _record("Compacted %d%% of %s", 100, "c")
+    assert limiter.filter(record)
+    assert record.args is None
+    # Formatting again (e.g. by a second handler) leaves the literal % alone
+    assert record.getMessage() == record.getMessage() == "Compacted 100% of c (1 similar lines suppressed)"
+
+
+def test_unformattable_messages_still_get_the_note(clock):
+    limiter = DebugRateLimitFilter(limit=1, window=10)
+    limiter.filter(_record("Progress 100% for %s", "a"))
+    limiter.filter(_record("Progress 100% for %s", "b"))
+
+    clock[0] = 10.0
+    record = _record("Progress 100% for %s", "c")
+    assert limiter.filter(record)
+    assert record.getMessage() == "Progress 100% for %s (1 similar lines suppressed)"
+
+
+def test_suppressed_note_on_a_message_without_args(clock):
+    limiter = DebugRateLimitFilter(limit=1, window=10)
+    limiter.filter(_record("Cache 50% full"))
+    limiter.filter(_record("Cache 50% full"))
+
+    clock[0] = 10.0
+    record = _record("Cache 50% full")
+    assert limiter.filter(record)
+    assert record.getMessage() == "Cache 50% full (1 similar lines suppressed)"
+
+
+def test_records_above_debug_are_never_limited():
+    limiter = DebugRateLimitFilter(limit=1, window=10)
+    assert all(limiter.filter(_record("Failed %s", i, level=logging.WARNING)) for i in range(5))
@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from google.adk.memory.base_memory_service import BaseMemoryService
+
+from trip_planner.memory_ingest import MemoryIngestPlugin, MemoryIngestScheduler
+
+
+class FakeMemoryService:
+    def __init__(self):
+        self.calls = []
+
+    async def add_events_to_memory(self, *, app_name, user_id, events, session_id):
+        self.calls.append((session_id, list(events)))
+
+
+def _session(session_id: str, events: list):
+    return SimpleNamespace(app_name="trip_planner", user_id="u1", id=session_id, events=events)
+
+
+class LoopRecordingMemoryService(FakeMemoryService):
+    def __init__(self):
+        super().__init__()
+        self.loops = set()
+
+    async def add_events_to_memory(self, **kwargs):
+        self.loops.add(asyncio.get_running_loop())
+        await super().add_events_to_memory(**kwargs)
+
+
+class SessionOnlyMemoryService(BaseMemoryService):
+    """Keeps the base add_events_to_memory, which only raises."""
+    def __init__(self):
+        self.sessions = []
+
+    async def add_session_to_memory(self, session):
+        self.sessions.append(session)
+
+    async def search_memory(self, *, app_name, user_id, query):
+        raise NotImplementedError
+
+
+async def _schedule_in(scheduler, service, session):
+    scheduler.schedule(service, session)
+    return asyncio.get_running_loop()
+
+
+def test_debounces_turns_into_one_incremental_batch():
+    scheduler = MemoryIngestScheduler(debounce_seconds=0.01, max_delay_seconds=1)
+    service = FakeMemoryService()
+    session = _session("s1", ["e1"])
+
+    async def run():
+        scheduler.schedule(service, session)
+        session.events.append("e2")
+        scheduler.schedule(service, session)
+        await asyncio.sleep(0.1)
+        session.events.append("e3")
+        scheduler.schedule(service, session)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    # Two batches; the second only carries the event added since the first
+    assert service.calls == [("s1", ["e1", "e2"]), ("s1", ["e3"])]
+
+
+def test_sessions_from_closed_loops_are_ingested_on_the_scheduler_loop():
+    scheduler = MemoryIngestScheduler(debounce_seconds=0.05, max_delay_seconds=1)
+    service = LoopRecordingMemoryService()
+
+    # One asyncio.run() per query: each caller loop is closed before the flush
+    caller_loops = []
+    for session_id in ("s1", "s2"):
+        caller_loops.append(asyncio.run(_schedule_in(scheduler, service, _session(session_id, [session_id]))))
+
+    deadline = time.monotonic() + 2
+    while len(service.calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert sorted(service.calls) == [("s1", ["s1"]), ("s2", ["s2"])]
+    assert service.loops == {scheduler._loop}
+    assert all(loop not in service.loops for loop in caller_loops)
+
+
+def test_services_without_event_deltas_get_the_whole_session():
+    scheduler = MemoryIngestScheduler(debounce_seconds=60, max_delay_seconds=60)
+    service = SessionOnlyMemoryService()
+    session = _session("s1", ["e1"])
+
+    async def run():
+        scheduler.schedule(service, session)
+        await scheduler.flush()
+
+    asyncio.run(run())
+    assert service.sessions == [session]
+
+
+def test_plugin_close_flushes_pending_sessions():
+    scheduler = MemoryIngestScheduler(debounce_seconds=60, max_delay_seconds=60)
+    service = FakeMemoryService()
+
+    async def run():
+        scheduler.schedule(service, _session("s1", ["e1"]))
+        await MemoryIngestPlugin(scheduler).close()
+
+    asyncio.run(run())
+    assert service.calls == [("s1", ["e1"])]
+    assert scheduler.stats()["pending"] == 0
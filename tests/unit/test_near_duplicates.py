@@ -0,0 +1,61 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from trip_planner.shared_libraries.near_duplicates import (
+    NearDuplicateIndex,
+    select_representatives,
+    shingles,
+    similarity,
+)
+
+BASE = " ".join(f"tokyo spot{i} is great for food and views" for i in range(40))
+OTHER = " ".join(f"paris cafe{i} serves croissants near the river" for i in range(40))
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Senso-ji Temple, at dawn!", 2) == shingles("senso ji temple at dawn", 2)
+    assert shingles("", 3) == frozenset()
+
+
+def test_similarity_of_identical_and_disjoint_texts():
+    assert similarity(shingles(BASE), shingles(BASE)) == (1.0, 1.0)
+    assert similarity(shingles(BASE), shingles(OTHER)) == (0.0, 0.0)
+
+
+def test_a_recut_is_contained_in_the_full_video():
+    half = BASE[: len(BASE) // 2]
+    jaccard, containment = similarity(shingles(half), shingles(BASE))
+    assert jaccard < 0.6
+    assert containment > 0.95
+
+
+def test_index_skips_shorter_copies_and_supersedes_with_fuller_ones():
+    index = NearDuplicateIndex()
+    half = BASE[: len(BASE) // 2]
+
+    assert index.offer(0, half) == (True, None)
+    assert index.offer(1, OTHER) == (True, None)
+    # The full video covers the earlier re-cut and takes its place
+    assert index.offer(2, BASE) == (True, 0)
+    assert index.offer(3, half) == (False, None)
+
+
+def test_select_representatives_keeps_the_longest_of_each_group():
+    half = BASE[: len(BASE) // 2]
+    kept, skipped = select_representatives([(0, half), (1, OTHER), (2, BASE)])
+
+    assert [index for index, _ in kept] == [1, 2]
+    assert skipped == [0]
@@ -0,0 +1,107 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from trip_planner.tools import pipeline, transcriber, youtube
+
+
+@pytest.fixture(autouse=True)
+def host_slots(monkeypatch):
+    monkeypatch.setattr(transcriber, "_host_semaphores", {})
+
+
+@pytest.fixture
+def fake_compaction(monkeypatch):
+    async def compact(index, transcript, semaphore):
+        return f"--- Source {index+1} ---\n- {transcript[:20]} | Sight | Tokyo | Seen", True
+
+    monkeypatch.setattr(pipeline, "_compact_transcript", compact)
+
+
+def _context(videos: list[str]):
+    return SimpleNamespace(state={"ideas_videos": videos, "ideas_raw_text": []})
+
+
+def test_ingests_every_video_in_order(monkeypatch, fake_compaction):
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", lambda url, deadline=None: f"{url} " * 20)
+    context = _context(["https://youtu.be/a", "https://youtu.be/b"])
+
+    result = asyncio.run(pipeline.ingest_videos(context))
+
+    assert result.startswith("Success: Ingested 2 videos (2 compacted")
+    refined = context.state["ideas_refined_text"]
+    assert [entry.splitlines()[0] for entry in refined] == ["--- Source 1 ---", "--- Source 2 ---"]
+
+
+def test_each_video_gets_its_own_time_budget(monkeypatch, fake_compaction):
+    monkeypatch.setattr(transcriber, "VIDEO_TIMEOUT_SECONDS", 0.5)
+    monkeypatch.setattr(transcriber, "PER_HOST_LIMIT", 1)
+
+    def fetch(url, deadline=None):
+        # One slot: the second video queues for 0.3s, then gets a full 0.5s
+        time.sleep(0.3)
+        youtube._check_deadline(deadline)
+        return f"{url} " * 20
+
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", fetch)
+
+    result = asyncio.run(pipeline.ingest_videos(_context(["https://youtu.be/a", "https://youtu.be/b"])))
+
+    assert result.startswith("Success: Ingested 2 videos")
+
+
+def test_fetches_past_their_budget_are_reported(monkeypatch, fake_compaction):
+    monkeypatch.setattr(transcriber, "VIDEO_TIMEOUT_SECONDS", 0.1)
+
+    def fetch(url, deadline=None):
+        time.sleep(0.2)
+        try:
+            youtube._check_deadline(deadline)
+        except TimeoutError as e:
+            return f"Error retrieving transcript: {e}"
+        return f"{url} " * 20
+
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", fetch)
+
+    result = asyncio.run(pipeline.ingest_videos(_context(["https://youtu.be/a"])))
+
+    assert result.startswith("Partial Success: Ingested 0 videos")
+    assert "timed out" in result
+
+
+def test_superseded_sources_are_not_counted_as_compacted(monkeypatch, fake_compaction):
+    full = " ".join(f"tokyo spot{i} is great for food and views" for i in range(40))
+    recut = full[: len(full) // 2]
+
+    def fetch(url, deadline=None):
+        # The re-cut arrives (and is compacted) before the full video
+        if url.endswith("full"):
+            time.sleep(0.2)
+            return full
+        return recut
+
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", fetch)
+    context = _context(["https://youtu.be/recut", "https://youtu.be/full"])
+
+    result = asyncio.run(pipeline.ingest_videos(context))
+
+    assert result.startswith("Success: Ingested 1 videos (1 compacted")
+    assert "Skipped 1 near-duplicate" in result
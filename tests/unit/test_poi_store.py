@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from trip_planner.shared_libraries.poi_store import (
+    OTHER,
+    POIStore,
+    load_poi_store,
+    normalize_category,
+    normalize_name,
+    parse_poi_line,
+)
+
+NOTES = """--- Source 1 ---
+- Senso-ji | Sight | Asakusa | Oldest temple in Tokyo
+- **Ichiran** | Food | Shibuya | Solo ramen booths
+--- Source 2 ---
+- The Sensō-ji | Sights | - | Go at dawn to beat the crowds
+- Golden Gai | Bar | Shinjuku | Tiny bars
+Not a bullet | Sight | Nowhere | ignored
+"""
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("- Senso-ji | Sight | Asakusa | Oldest temple", ("Senso-ji", "Sight", "Asakusa", "Oldest temple")),
+        ("* Ichiran | Food | Solo booths", ("Ichiran", "Food", "", "Solo booths")),
+        ("- Park | Nature | - | Shade | picnics", ("Park", "Nature", "", "Shade | picnics")),
+        ("- Just a note", None),
+        ("Senso-ji | Sight | Asakusa | Oldest temple", None),
+        ("- | Sight | Asakusa | No name", None),
+    ],
+)
+def test_parse_poi_line(line, expected):
+    assert parse_poi_line(line) == expected
+
+
+def test_normalize_name_ignores_case_accents_punctuation_and_the():
+    assert normalize_name("The Sensō-ji!") == normalize_name("senso ji") == "senso ji"
+
+
+def test_normalize_category_tolerates_variants():
+    assert normalize_category("Sights") == "Sight"
+    assert normalize_category("Food & Drink") == "Food"
+    assert normalize_category("Bar") == OTHER
+
+
+def test_add_notes_merges_the_same_place_across_sources():
+    store = POIStore()
+
+    assert store.add_notes(NOTES) == 4
+    assert len(store) == 3
+
+    temple = store.get("senso ji")
+    assert temple.name == "Senso-ji"
+    assert temple.area == "Asakusa"
+    assert temple.reasons == ["Oldest temple in Tokyo", "Go at dawn to beat the crowds"]
+    assert temple.sources == [1, 2]
+    assert store.get("Ichiran").name == "Ichiran"
+
+
+def test_a_known_category_replaces_other():
+    store = POIStore()
+    store.add("Golden Gai", "Bar")
+    store.add("Golden Gai", "Nightlife", reason="Tiny bars")
+
+    assert store.by_category(OTHER) == []
+    assert [poi.name for poi in store.by_category("Nightlife")] == ["Golden Gai"]
+    assert store.categories() == ["Nightlife"]
+
+
+def test_to_table_lists_widely_mentioned_places_first():
+    store = POIStore()
+    store.add("Park A", "Nature", source=1)
+    store.add("Park B", "Nature", source=1)
+    store.add("Park B", "Nature", source=2)
+
+    assert store.to_table() == [
+        "## Nature (2)",
+        "- Park B | - | - | S1,S2",
+        "- Park A | - | - | S1",
+    ]
+
+
+def test_state_round_trip():
+    store = POIStore()
+    store.add_notes(NOTES)
+
+    restored = POIStore.from_state(store.to_state())
+
+    assert restored.to_state() == store.to_state()
+    assert restored.categories() == store.categories()
+
+
+def test_load_poi_store_falls_back_to_the_notes():
+    assert len(load_poi_store({"ideas_refined_text": NOTES})) == 3
+    store = load_poi_store({"ideas_pois": [{"name": "Ichiran", "category": "Food"}]})
+    assert [poi.name for poi in store] == ["Ichiran"]
@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import os
+
+import pytest
+
+from trip_planner.shared_libraries.scenarios import ScenarioCache, thaw
+
+
+def _write(path, data, mtime_ns=None):
+    path.write_text(json.dumps(data))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def scenario_dir(tmp_path):
+    _write(tmp_path / "tokyo.json", {"state": {"ideas_videos": ["a"], "trip": {"days": 3}}})
+    return tmp_path
+
+
+def test_scenarios_load_by_name_or_path(scenario_dir):
+    cache = ScenarioCache(str(scenario_dir), reload_check_seconds=0)
+
+    by_name = cache.get("tokyo")
+    assert by_name["state"]["trip"]["days"] == 3
+    assert cache.get("tokyo.json") is by_name
+    assert cache.get(str(scenario_dir / "tokyo.json")) is by_name
+
+
+def test_missing_scenarios_return_none(scenario_dir):
+    assert ScenarioCache(str(scenario_dir)).get("osaka") is None
+
+
+def test_invalid_json_raises_value_error(scenario_dir):
+    (scenario_dir / "broken.json").write_text("{not json")
+
+    with pytest.raises(ValueError):
+        ScenarioCache(str(scenario_dir)).get("broken")
+
+
+def test_preload_parses_every_scenario_and_skips_broken_ones(scenario_dir):
+    _write(scenario_dir / "kyoto.json", {"state": {}})
+    (scenario_dir / "broken.json").write_text("{not json")
+    cache = ScenarioCache(str(scenario_dir))
+
+    cache.preload()
+
+    assert cache.names() == ["kyoto", "tokyo"]
+
+
+def test_scenarios_are_frozen_and_thaw_to_independent_copies(scenario_dir):
+    data = ScenarioCache(str(scenario_dir)).get("tokyo")
+
+    with pytest.raises(TypeError):
+        data["state"]["trip"]["days"] = 4
+    assert data["state"]["ideas_videos"] == ("a",)
+
+    state = thaw(data["state"])
+    state["ideas_videos"].append("b")
+    state["trip"]["days"] = 4
+    assert state == {"ideas_videos": ["a", "b"], "trip": {"days": 4}}
+    assert data["state"]["ideas_videos"] == ("a",)
+    assert data["state"]["trip"]["days"] == 3
+
+
+def test_changed_files_are_reread(scenario_dir):
+    path = scenario_dir / "tokyo.json"
+    cache = ScenarioCache(str(scenario_dir), reload_check_seconds=0)
+    first = cache.get("tokyo")
+
+    # Same mtime: the parsed object is reused
+    assert cache.get("tokyo") is first
+
+    _write(path, {"state": {"trip": {"days": 5}}}, mtime_ns=path.stat().st_mtime_ns + 10**9)
+    assert cache.get("tokyo")["state"]["trip"]["days"] == 5
+
+
+def test_mtime_is_not_checked_within_the_reload_interval(scenario_dir):
+    path = scenario_dir / "tokyo.json"
+    cache = ScenarioCache(str(scenario_dir), reload_check_seconds=60)
+    first = cache.get("tokyo")
+
+    _write(path, {"state": {}}, mtime_ns=path.stat().st_mtime_ns + 10**9)
+    assert cache.get("tokyo") is first
+
+
+def test_deleted_files_are_dropped(scenario_dir):
+    cache = ScenarioCache(str(scenario_dir), reload_check_seconds=0)
+    cache.get("tokyo")
+
+    (scenario_dir / "tokyo.json").unlink()
+
+    assert cache.get("tokyo") is None
+    assert cache.names() == []
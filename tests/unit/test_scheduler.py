@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from trip_planner.shared_libraries.itinerary_validation import (
+    parse_time,
+    validate_itinerary,
+)
+from trip_planner.shared_libraries.poi_store import POIStore
+from trip_planner.shared_libraries.scheduler import (
+    DAY_END,
+    DAY_START,
+    EVENING_FROM,
+    area_tokens,
+    distance_matrix,
+    k_medoids,
+    order_route,
+    schedule_itinerary,
+)
+
+
+def _store(*pois):
+    store = POIStore()
+    for name, category, area in pois:
+        store.add(name, category, area, reason=f"Visit {name}", source=1)
+    return store
+
+
+def test_area_tokens_drop_generic_address_words():
+    assert area_tokens("Shibuya Station, Shibuya City") == {"shibuya"}
+
+
+def test_distance_matrix_is_symmetric():
+    store = _store(("A", "Sight", "Asakusa"), ("B", "Sight", "Asakusa"), ("C", "Sight", ""))
+    dist = distance_matrix(list(store))
+
+    assert dist[0][1] == dist[1][0] == 0.0
+    assert dist[0][2] == dist[2][0] == 0.75
+
+
+def test_k_medoids_groups_by_area_within_capacity():
+    dist = [
+        [0, 0, 1, 1],
+        [0, 0, 1, 1],
+        [1, 1, 0, 0],
+        [1, 1, 0, 0],
+    ]
+    assert sorted(k_medoids(dist, 2, 2)) == [[0, 1], [2, 3]]
+    assert all(len(cluster) <= 1 for cluster in k_medoids(dist, 4, 1))
+
+
+def test_order_route_visits_points_along_a_line():
+    points = [0, 3, 1, 2]
+    dist = [[abs(i - j) for j in range(4)] for i in range(4)]
+
+    assert order_route(points, dist) in ([0, 1, 2, 3], [3, 2, 1, 0])
+
+
+def test_schedule_itinerary_builds_valid_days():
+    store = _store(
+        ("Senso-ji", "Sight", "Asakusa"),
+        ("Nakamise", "Shopping", "Asakusa"),
+        ("Ichiran", "Food", "Shibuya"),
+        ("Hachiko", "Sight", "Shibuya"),
+        ("Golden Gai", "Nightlife", "Shinjuku"),
+        ("Park Hyatt", "Stay", "Shinjuku"),
+    )
+
+    itinerary, unscheduled = schedule_itinerary(store, "Tokyo", 2)
+
+    assert unscheduled == []
+    assert [day["day_number"] for day in itinerary["days"]] == [1, 2]
+    report = validate_itinerary(itinerary)
+    assert report.errors == []
+    events = [event for day in itinerary["days"] for event in day["events"]]
+    # Hotels are never scheduled; nightlife waits for the evening
+    assert sorted(event["location"] for event in events) == [
+        "Golden Gai", "Hachiko", "Ichiran", "Nakamise", "Senso-ji",
+    ]
+    nightlife = next(event for event in events if event["location"] == "Golden Gai")
+    assert parse_time(nightlife["start_time"]) >= EVENING_FROM
+    for event in events:
+        assert DAY_START <= parse_time(event["start_time"]) < parse_time(event["end_time"]) <= DAY_END
+
+
+def test_places_that_do_not_fit_are_reported():
+    store = _store(*((f"Park {i}", "Nature", "Ueno") for i in range(10)))
+
+    itinerary, unscheduled = schedule_itinerary(store, "Tokyo", 1)
+
+    scheduled = len(itinerary["days"][0]["events"])
+    assert scheduled < 10
+    assert len(unscheduled) == 10 - scheduled
+
+
+def test_empty_store_schedules_nothing():
+    assert schedule_itinerary(POIStore(), "Tokyo") == ({"destination": "Tokyo", "days": []}, [])
@@ -0,0 +1,78 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import ClassVar
+
+import pytest
+
+from trip_planner.tools import search
+
+
+class FakeDDGS:
+    results: ClassVar[dict] = {}
+    calls: ClassVar[list] = []
+
+    def videos(self, keywords, **kwargs):
+        FakeDDGS.calls.append(keywords)
+        return FakeDDGS.results.get(keywords, [])
+
+
+@pytest.fixture(autouse=True)
+def fake_ddgs(monkeypatch):
+    FakeDDGS.results = {}
+    FakeDDGS.calls = []
+    monkeypatch.setattr(search, "DDGS", FakeDDGS)
+    search.search_cache.clear()
+    return FakeDDGS
+
+
+def _video(video_id: str, title: str = "A video"):
+    return {"title": title, "content": f"https://www.youtube.com/watch?v={video_id}", "duration": "10:00"}
+
+
+def test_normalize_query():
+    assert search.normalize_query("  Tokyo   FOOD site:youtube.com ") == "tokyo food"
+
+
+def test_empty_search_says_so(fake_ddgs):
+    assert search.search_videos("nowhere", None) == "No videos found."
+
+
+def test_results_without_youtube_links_say_so(fake_ddgs):
+    fake_ddgs.results["tokyo"] = [{"title": "Vimeo", "content": "https://vimeo.com/1"}]
+    assert search.search_videos("tokyo", None) == "No valid YouTube links found."
+    assert search.search_videos_batch(["tokyo"], None) == "No valid YouTube links found."
+
+
+def test_searches_are_cached_by_normalized_query(fake_ddgs):
+    fake_ddgs.results["tokyo"] = [_video("aaaaaaaaaaa")]
+    first = search.search_videos("Tokyo", None)
+    second = search.search_videos("tokyo site:youtube.com", None)
+
+    assert first == second
+    assert "aaaaaaaaaaa" in first
+    assert fake_ddgs.calls == ["tokyo"]
+
+
+def test_batch_merges_and_ranks_across_queries(fake_ddgs):
+    fake_ddgs.results["tokyo"] = [_video("aaaaaaaaaaa", "A"), _video("bbbbbbbbbbb", "B")]
+    fake_ddgs.results["tokyo food"] = [_video("bbbbbbbbbbb", "B"), _video("ccccccccccc", "C")]
+
+    lines = search.search_videos_batch(["Tokyo", "tokyo food", "TOKYO"], None).splitlines()
+
+    # B ranks for both queries, so it comes first; duplicates are merged
+    assert [line.split("**")[1] for line in lines] == ["B", "A", "C"]
+    assert sorted(fake_ddgs.calls) == ["tokyo", "tokyo food"]
@@ -0,0 +1,160 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import datetime
+import threading
+
+import pytest
+
+from trip_planner.shared_libraries import snapshot_codec
+from trip_planner.shared_libraries.snapshot_codec import NONE, ZLIB, SnapshotCodec
+from trip_planner.state_manager import StateManager
+
+TRANSCRIPT = "Senso-ji at dawn, then ramen in Shibuya and bars in Golden Gai. " * 200
+
+
+def _state(**extra):
+    return {
+        "destination": "Tokyo",
+        "ideas_raw_text": [TRANSCRIPT],
+        "itinerary": {"destination": "Tokyo", "days": [{"day_number": 1, "events": []}]},
+        "count": 3,
+        "ratio": 0.5,
+        "done": False,
+        "missing": None,
+        **extra,
+    }
+
+
+@pytest.mark.parametrize("compression", [NONE, ZLIB])
+@pytest.mark.parametrize("blob_min_bytes", [0, 1024])
+def test_round_trip(compression, blob_min_bytes):
+    codec = SnapshotCodec(compression=compression, blob_min_bytes=blob_min_bytes)
+
+    payload, refs = codec.encode(_state())
+
+    assert payload[:3] == b"VTS"
+    assert len(refs) == (1 if blob_min_bytes else 0)
+    assert codec.decode(payload) == _state()
+
+
+def test_compression_shrinks_repetitive_state():
+    payload, _ = SnapshotCodec(compression=ZLIB).encode(_state())
+    assert len(payload) < len(TRANSCRIPT) // 10
+
+
+def test_unknown_format_version_is_rejected():
+    codec = SnapshotCodec(compression=ZLIB)
+    payload, _ = codec.encode(_state())
+
+    with pytest.raises(ValueError, match="format version"):
+        codec.decode(payload[:3] + bytes([snapshot_codec.FORMAT_VERSION + 1]) + payload[4:])
+    with pytest.raises(ValueError, match="Not a state snapshot"):
+        codec.decode(b"XYZ" + payload[3:])
+
+
+@pytest.mark.parametrize(
+    "value",
+    [datetime.date(2025, 1, 1), {1}, (1, 2), {1: "a"}, float("nan"), object()],
+)
+def test_values_json_would_change_are_refused(value):
+    codec = SnapshotCodec(compression=ZLIB, blob_min_bytes=1024)
+
+    with pytest.raises(TypeError):
+        codec.encode(_state(extra=value))
+    # Nothing was left referenced
+    assert codec.blobs.stats() == {"blobs": 0, "bytes": 0}
+
+
+def test_blobs_are_shared_and_freed_with_the_last_reference():
+    codec = SnapshotCodec(compression=ZLIB, blob_min_bytes=1024)
+    _, first = codec.encode(_state())
+    _, second = codec.encode(_state(destination="Kyoto"))
+
+    assert first == second
+    assert codec.blobs.refcount(first[0]) == 2
+    assert codec.blobs.stats()["blobs"] == 1
+
+    codec.release(first)
+    assert codec.blobs.refcount(first[0]) == 1
+    codec.release(second)
+    assert codec.blobs.stats() == {"blobs": 0, "bytes": 0}
+
+
+def test_unencodable_state_is_kept_uncompressed():
+    manager = StateManager(codec=SnapshotCodec(compression=ZLIB))
+    state = _state(visited={"Senso-ji"})
+
+    manager.save_user_state("user", state)
+
+    assert manager.get_user_state("user") == state
+
+
+def test_blob_bytes_count_toward_the_memory_ceiling():
+    codec = SnapshotCodec(compression=NONE, blob_min_bytes=1024)
+    manager = StateManager(max_total_bytes=2 * len(TRANSCRIPT) + 4096, codec=codec)
+
+    for i in range(4):
+        text = f"{i} {TRANSCRIPT}"
+        manager.save_user_state(f"user{i}", {"ideas_raw_text": [text]})
+
+    stats = manager.stats()
+    assert stats["bytes"] <= manager.max_total_bytes
+    assert stats["bytes"] >= codec.resident_bytes()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 2
+
+
+def test_decode_keeps_blobs_alive_through_a_concurrent_drop(monkeypatch):
+    codec = SnapshotCodec(compression=ZLIB, blob_min_bytes=1024)
+    manager = StateManager(codec=codec)
+    manager.save_user_state("user", _state())
+
+    decoding = threading.Event()
+    dropped = threading.Event()
+    real_decode = codec.decode
+
+    def slow_decode(payload):
+        decoding.set()
+        assert dropped.wait(5)
+        return real_decode(payload)
+
+    def drop():
+        assert decoding.wait(5)
+        # A save that no longer holds the transcript frees the old snapshot's blob
+        manager.save_user_state("user", {"destination": "Tokyo"})
+        dropped.set()
+
+    monkeypatch.setattr(codec, "decode", slow_decode)
+    thread = threading.Thread(target=drop)
+    thread.start()
+    state = manager.get_user_state("user")
+    thread.join()
+
+    assert state == _state()
+    assert codec.blobs.stats() == {"blobs": 0, "bytes": 0}
+
+
+def test_undecodable_snapshot_restores_nothing(monkeypatch):
+    codec = SnapshotCodec(compression=ZLIB)
+    manager = StateManager(codec=codec)
+    manager.save_user_state("user", _state())
+
+    def broken(payload):
+        raise ValueError("corrupt")
+
+    monkeypatch.setattr(codec, "decode", broken)
+    assert manager.get_user_state("user") == {}
@@ -0,0 +1,96 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from trip_planner.state_backends import SQLiteStateBackend, StateBackend
+from trip_planner.state_manager import StateManager
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteStateBackend(str(tmp_path / "state.sqlite3"), compact_every=0)
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        StateBackend()
+
+
+def test_replays_latest_value_per_key(backend):
+    backend.write_changes("u1", {"destination": "Tokyo", "ideas_videos": ["a"]}, [])
+    backend.write_changes("u1", {"ideas_videos": ["a", "b"]}, [])
+    backend.write_changes("u2", {"destination": "Paris"}, [])
+
+    assert backend.load("u1") == {"destination": "Tokyo", "ideas_videos": ["a", "b"]}
+    assert backend.load("u2") == {"destination": "Paris"}
+    assert backend.keys("u1") == {"destination", "ideas_videos"}
+
+
+def test_tombstones_hide_deleted_keys(backend):
+    backend.write_changes("u1", {"destination": "Tokyo", "itinerary": {"days": []}}, [])
+    backend.write_changes("u1", {}, ["itinerary"])
+
+    assert backend.load("u1") == {"destination": "Tokyo"}
+    assert backend.keys("u1") == {"destination"}
+
+
+def test_compaction_keeps_the_replayed_state(backend):
+    for i in range(5):
+        backend.write_changes("u1", {"count": i, "gone": i}, [])
+    backend.write_changes("u1", {}, ["gone"])
+    backend.compact()
+
+    assert backend.load("u1") == {"count": 4}
+    rows = backend._connect().execute("SELECT COUNT(*) FROM state_log").fetchone()[0]
+    assert rows == 1
+
+
+def test_manager_writes_only_changed_keys(backend, monkeypatch):
+    manager = StateManager(backend=backend)
+    writes = []
+    original = backend.write_changes
+    monkeypatch.setattr(
+        backend, "write_changes",
+        lambda user_id, changed, deleted: (writes.append((dict(changed), list(deleted))), original(user_id, changed, deleted)),
+    )
+
+    manager.save_user_state("u1", {"destination": "Tokyo", "ideas_videos": ["a"]})
+    manager.save_user_state("u1", {"destination": "Tokyo", "ideas_videos": ["a", "b"]})
+    manager.save_user_state("u1", {"destination": "Tokyo"})
+
+    assert writes[1] == ({"ideas_videos": ["a", "b"]}, [])
+    assert writes[2] == ({}, ["ideas_videos"])
+
+
+def test_keys_deleted_while_evicted_are_tombstoned(backend):
+    manager = StateManager(backend=backend)
+    manager.save_user_state("u1", {"destination": "Tokyo", "itinerary": {"days": []}})
+
+    # A restart (or eviction) loses the in-memory snapshot
+    manager = StateManager(backend=backend)
+    manager.save_user_state("u1", {"destination": "Kyoto"})
+
+    assert StateManager(backend=backend).get_user_state("u1") == {"destination": "Kyoto"}
+
+
+def test_evicted_users_are_hydrated_from_the_backend(backend):
+    manager = StateManager(max_users=1, backend=backend)
+    manager.save_user_state("u1", {"destination": "Tokyo"})
+    manager.save_user_state("u2", {"destination": "Paris"})
+
+    assert manager.stats()["evictions"] == 1
+    assert manager.get_user_state("u1") == {"destination": "Tokyo"}
@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from trip_planner import state_manager as state_manager_module
+from trip_planner.state_manager import StateManager
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(state_manager_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_user_is_evicted_past_max_users(clock):
+    manager = StateManager(max_users=2)
+    manager.save_user_state("a", {"destination": "Tokyo"})
+    manager.save_user_state("b", {"destination": "Kyoto"})
+    # Touching "a" makes "b" the least recently used
+    assert manager.get_user_state("a") == {"destination": "Tokyo"}
+
+    manager.save_user_state("c", {"destination": "Osaka"})
+
+    assert manager.get_user_state("b") == {}
+    assert manager.get_user_state("a") == {"destination": "Tokyo"}
+    assert manager.get_user_state("c") == {"destination": "Osaka"}
+    assert manager.stats()["evictions"] == 1
+
+
+def test_idle_users_expire(clock):
+    manager = StateManager(idle_ttl_seconds=60)
+    manager.save_user_state("a", {"destination": "Tokyo"})
+    manager.save_user_state("b", {"destination": "Kyoto"})
+
+    clock[0] += 30
+    assert manager.get_user_state("b") == {"destination": "Kyoto"}
+    clock[0] += 45
+
+    # "a" has been idle for 75s, "b" for 45s
+    assert manager.get_user_state("a") == {}
+    assert manager.get_user_state("b") == {"destination": "Kyoto"}
+    assert manager.stats()["expirations"] == 1
+
+
+def test_idle_users_are_swept_on_save(clock):
+    manager = StateManager(idle_ttl_seconds=60)
+    manager.save_user_state("a", {"destination": "Tokyo"})
+    clock[0] += 61
+
+    manager.save_user_state("b", {"destination": "Kyoto"})
+
+    assert manager.stats()["entries"] == 1
+    assert manager.user_bytes("a") == 0
+
+
+def test_byte_ceiling_evicts_oldest_users(clock):
+    transcript = "ramen " * 2000
+    manager = StateManager(max_total_bytes=3 * len(transcript))
+    for user in ("a", "b", "c", "d"):
+        manager.save_user_state(user, {"ideas_raw_text": [transcript]})
+
+    stats = manager.stats()
+    assert stats["bytes"] <= manager.max_total_bytes
+    assert stats["entries"] == 2
+    assert manager.user_bytes("a") == manager.user_bytes("b") == 0
+    assert manager.user_bytes("d") > len(transcript)
+
+
+def test_newest_snapshot_is_kept_even_over_the_ceiling(clock):
+    manager = StateManager(max_total_bytes=10)
+    manager.save_user_state("a", {"destination": "Tokyo"})
+
+    assert manager.get_user_state("a") == {"destination": "Tokyo"}
+    assert manager.stats()["evictions"] == 0
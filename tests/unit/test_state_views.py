@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+
+import pytest
+
+from trip_planner import state_views
+from trip_planner.shared_libraries.poi_store import POIStore
+from trip_planner.shared_libraries.tokens import estimate_tokens
+
+
+def _state(**extra):
+    store = POIStore()
+    store.add("Senso-ji", "Sight", "Asakusa", "Oldest temple", 1)
+    store.add("Ichiran", "Food", "Shibuya", "Ramen", 1)
+    return {"destination": "Tokyo", "ideas_pois": store.to_state(), **extra}
+
+
+@pytest.fixture
+def schedule_calls(monkeypatch):
+    calls = []
+    real = state_views.schedule_itinerary
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(state_views, "schedule_itinerary", counting)
+    state_views._draft_cache.clear()
+    return calls
+
+
+def test_stored_draft_is_rendered_without_rescheduling(schedule_calls):
+    draft = {
+        "destination": "Tokyo",
+        "days": [{"day_number": 1, "events": [{
+            "location": "Meiji Jingu", "description": "Shrine", "address": "Harajuku",
+            "start_time": "09:00", "end_time": "10:30",
+        }]}],
+    }
+    text = state_views.render_draft_itinerary(
+        _state(itinerary_draft=draft, itinerary_draft_unscheduled=["Ichiran"])
+    )
+
+    assert "Meiji Jingu" in text
+    assert text.endswith("Not scheduled (no room left): Ichiran")
+    assert schedule_calls == []
+
+
+def test_default_draft_is_rescheduled_only_when_the_pois_change(schedule_calls):
+    state = _state()
+    first = state_views.render_draft_itinerary(state)
+    assert state_views.render_draft_itinerary(dict(state)) == first
+    assert len(schedule_calls) == 1
+
+    store = POIStore.from_state(state["ideas_pois"])
+    store.add("Hachiko", "Sight", "Shibuya", "Statue", 2)
+    assert "Hachiko" in state_views.render_draft_itinerary(_state(ideas_pois=store.to_state()))
+    assert len(schedule_calls) == 2
+
+
+def test_itinerary_over_budget_shows_whole_days_and_says_how_many_are_left():
+    event = {"location": "Place", "address": "Somewhere far away", "start_time": "09:00", "end_time": "10:00"}
+    itinerary = {
+        "destination": "Tokyo",
+        "days": [{"day_number": i + 1, "events": [dict(event)] * 4} for i in range(6)],
+    }
+
+    text = state_views.render_itinerary(itinerary, tokens=100)
+
+    lines = text.splitlines()
+    assert lines[0] == "Tokyo, 6 days"
+    shown = sum(line.startswith("Day ") for line in lines)
+    assert 0 < shown < 6
+    assert lines[-1] == f"... ({6 - shown} more days not shown)"
+    # Every day shown is complete
+    assert len(lines) == 2 + shown * 5
+
+
+def _long_itinerary():
+    event = {
+        "location": "Place",
+        "address": "Somewhere far away",
+        "description": "A long description of everything worth seeing there. " * 10,
+        "start_time": "09:00",
+        "end_time": "10:00",
+    }
+    return {
+        "destination": "Tokyo",
+        "days": [{"day_number": i + 1, "events": [dict(event)] * 4} for i in range(10)],
+    }
+
+
+def test_presentation_sees_the_whole_itinerary():
+    itinerary = _long_itinerary()
+    state = _state(ideas_videos=["v"], ideas_refined_text=["n"], itinerary=itinerary)
+
+    view = state_views.render_state_views(state)["itinerary"]
+
+    assert json.loads(view) == itinerary
+    assert estimate_tokens(view) > state_views.ITINERARY_TOKENS
+
+
+def test_intermediate_stages_see_a_capped_itinerary():
+    # Fresh transcripts are waiting: the pipeline refines again before presenting
+    state = _state(ideas_videos=["v"], ideas_raw_text=["t"], itinerary=_long_itinerary())
+
+    view = state_views.render_state_views(state)["itinerary"]
+
+    assert view.startswith("Tokyo, 10 days\n")
+    assert estimate_tokens(view) <= state_views.ITINERARY_TOKENS
@@ -0,0 +1,123 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from trip_planner.tools import transcriber, youtube
+
+
+@pytest.fixture
+def host_slots(monkeypatch):
+    """A fresh semaphore table, so tests don't share slots with each other."""
+    monkeypatch.setattr(transcriber, "_host_semaphores", {})
+    return transcriber._host_semaphores
+
+
+def test_host_key_normalizes_youtube_hosts():
+    assert transcriber._host_key("https://www.youtube.com/watch?v=abc") == "youtube.com"
+    assert transcriber._host_key("https://m.youtube.com/watch?v=abc") == "youtube.com"
+    assert transcriber._host_key("https://youtu.be/abc") == "youtube.com"
+
+
+def test_fetch_releases_slot_when_the_download_raises(host_slots, monkeypatch):
+    def boom(url, deadline=None):
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", boom)
+    with pytest.raises(RuntimeError):
+        transcriber._fetch_transcript("https://youtu.be/abc")
+
+    semaphore = transcriber._get_host_semaphore("youtube.com")
+    assert semaphore._value == transcriber.PER_HOST_LIMIT
+
+
+def test_queued_videos_get_their_own_time_budget(host_slots, monkeypatch):
+    monkeypatch.setattr(transcriber, "VIDEO_TIMEOUT_SECONDS", 0.5)
+    monkeypatch.setattr(transcriber, "PER_HOST_LIMIT", 3)
+    budgets = []
+    lock = threading.Lock()
+
+    def fetch(url, deadline=None):
+        with lock:
+            budgets.append(deadline - time.monotonic())
+        time.sleep(0.3)
+        youtube._check_deadline(deadline)
+        return f"transcript of {url}"
+
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", fetch)
+    urls = [f"https://youtu.be/{i}" for i in range(4)]
+
+    # The fourth video waits 0.3s for a slot, then still gets its full 0.5s
+    assert transcriber._transcribe_batch(urls) == [f"transcript of {url}" for url in urls]
+    assert all(budget > 0.45 for budget in budgets)
+
+
+def test_slow_fetches_are_cut_off_and_free_their_slot(host_slots, monkeypatch):
+    monkeypatch.setattr(transcriber, "VIDEO_TIMEOUT_SECONDS", 0.2)
+
+    def fetch(url, deadline=None):
+        # Reads until the deadline stops it, like the subtitle download
+        try:
+            while True:
+                youtube._check_deadline(deadline)
+                time.sleep(0.02)
+        except TimeoutError as e:
+            return f"Error retrieving transcript: {e}"
+
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", fetch)
+
+    started = time.monotonic()
+    results = transcriber._transcribe_batch(["https://youtu.be/a", "https://youtu.be/b"])
+
+    assert all(r.startswith("Error retrieving transcript: timed out") for r in results)
+    assert time.monotonic() - started < 1
+    assert transcriber._get_host_semaphore("youtube.com")._value == transcriber.PER_HOST_LIMIT
+
+
+def test_batch_keeps_input_order(host_slots, monkeypatch):
+    def fetch(url, deadline=None):
+        # Later videos finish first
+        time.sleep(0.05 if url.endswith("a") else 0)
+        return f"transcript of {url}"
+
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", fetch)
+    urls = ["https://youtu.be/a", "https://youtu.be/b", "https://example.com/c"]
+
+    assert transcriber._transcribe_batch(urls) == [f"transcript of {url}" for url in urls]
+    assert transcriber._get_host_semaphore("youtube.com")._value == transcriber.PER_HOST_LIMIT
+
+
+def test_circuit_open_results_are_failures_not_mock_transcripts(host_slots, monkeypatch):
+    open_result = f"{youtube.CIRCUIT_OPEN_PREFIX} (retry in 30s) for https://youtu.be/abc"
+    monkeypatch.setattr(transcriber, "get_youtube_transcript", lambda url, deadline=None: open_result)
+    state = {"ideas_videos": ["https://youtu.be/abc"]}
+
+    summary = transcriber.transcribe_videos(SimpleNamespace(state=state))
+
+    assert state["ideas_raw_text"] == []
+    assert "Transcribed 0 videos" in summary
+    assert youtube.CIRCUIT_OPEN_PREFIX in summary
+
+
+def test_rate_limited_results_still_use_the_fail_safe_transcript():
+    text, error = transcriber._resolve_result("https://youtu.be/abc", "Error: HTTP Error 429: Too Many Requests")
+
+    assert error is None
+    assert "Using Cached Data for https://youtu.be/abc" in text
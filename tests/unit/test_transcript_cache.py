@@ -0,0 +1,82 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from trip_planner.shared_libraries import transcript_cache as cache_module
+from trip_planner.shared_libraries.transcript_cache import TranscriptCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", fake.time)
+    return fake
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "t.sqlite3"))
+    assert cache.get("vid", "en") is None
+    cache.put("vid", "en", "hello world")
+
+    assert cache.get("vid", "en") == "hello world"
+    # The language is part of the key
+    assert cache.get("vid", "fr") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0}
+
+
+def test_failures_expire_after_the_negative_ttl(tmp_path, clock):
+    cache = TranscriptCache(str(tmp_path / "t.sqlite3"), ttl_seconds=3600, negative_ttl_seconds=60)
+    cache.put("ok", "en", "transcript")
+    cache.put("bad", "en", "Skipped: No subtitles found", is_error=True)
+
+    clock.now += 61
+    assert cache.get("bad", "en") is None
+    assert cache.get("ok", "en") == "transcript"
+
+    clock.now += 3600
+    assert cache.get("ok", "en") is None
+
+
+def test_evicts_least_recently_used_over_the_size_cap(tmp_path, clock):
+    cache = TranscriptCache(str(tmp_path / "t.sqlite3"), max_bytes=25)
+    cache.put("a", "en", "a" * 10)
+    clock.now += 1
+    cache.put("b", "en", "b" * 10)
+    clock.now += 1
+    # Touch "a", so "b" is the least recently used
+    assert cache.get("a", "en") == "a" * 10
+    clock.now += 1
+    cache.put("c", "en", "c" * 10)
+
+    assert cache.get("b", "en") is None
+    assert cache.get("a", "en") == "a" * 10
+    assert cache.get("c", "en") == "c" * 10
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_larger_than_the_cap_are_not_stored(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "t.sqlite3"), max_bytes=5)
+    cache.put("big", "en", "x" * 6)
+    assert cache.get("big", "en") is None
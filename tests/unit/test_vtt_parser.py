@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from trip_planner.tools.youtube import _parse_vtt_lines
+
+
+def _vtt(*cues: str) -> list[str]:
+    lines = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    for i, cue in enumerate(cues):
+        lines += [f"00:00:{i:02d}.000 --> 00:00:{i + 1:02d}.000 align:start position:0%", *cue.split("\n"), ""]
+    return lines
+
+
+def _parse(lines, **budget):
+    return _parse_vtt_lines(lines, **{"max_chars": 0, "max_tokens": 0, **budget})
+
+
+def test_rolling_auto_captions_are_deduplicated():
+    lines = _vtt(
+        "we<00:00:00.400><c> went</c><00:00:00.800><c> to</c>",
+        "we went to\nthe<00:00:01.300><c> fish</c><00:00:01.600><c> market</c>",
+        "the fish market",
+        "the fish market\nfor<00:00:03.300><c> breakfast</c>",
+    )
+
+    assert _parse(lines) == "we went to the fish market for breakfast"
+
+
+def test_one_word_rolling_lines_are_deduplicated():
+    lines = _vtt("so", "so\nwe went", "we went\nhome")
+
+    assert _parse(lines) == "so we went home"
+
+
+def test_manual_subtitles_keep_repeated_words_at_cue_boundaries():
+    lines = _vtt("I said no no", "no way this is very", "very good")
+
+    assert _parse(lines) == "I said no no no way this is very very good"
+
+
+def test_manual_subtitles_keep_repeated_lines_apart():
+    lines = _vtt("Thank you.", "Where are we going?", "Thank you.")
+
+    assert _parse(lines) == "Thank you. Where are we going? Thank you."
+
+
+def test_headers_notes_and_cue_ids_are_skipped():
+    lines = [
+        "WEBVTT", "",
+        "NOTE generated by a tool", "spanning two lines", "",
+        "STYLE", "::cue { color: white }", "",
+        "1", "00:00:00.000 --> 00:00:01.000", "Fish &amp; chips", "",
+    ]
+
+    assert _parse(lines) == "Fish & chips"
+
+
+def test_reading_stops_at_the_budget():
+    def lines():
+        yield from _vtt(*(f"word{i} filler" for i in range(1000)))
+        raise AssertionError("read past the budget")
+
+    text = _parse(lines(), max_chars=60)
+
+    assert text.endswith("... (truncated)")
+    assert len(text) <= 60 + len("... (truncated)")
+    assert text.startswith("word0 filler word1 filler")
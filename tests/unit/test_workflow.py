@@ -0,0 +1,149 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from pydantic import Field
+
+from trip_planner import workflow
+from trip_planner.state_views import render_state_views
+
+ITINERARY = {"destination": "Tokyo", "days": [{"day_number": 1, "events": []}]}
+
+
+class ScriptedAgent(BaseAgent):
+    """Records the state it was handed and emits one event per scripted state delta."""
+    script: list = Field(default_factory=list)
+    seen: list = Field(default_factory=list)
+
+    async def _run_async_impl(self, ctx):
+        self.seen.append(dict(ctx.session.state))
+        for delta in self.script or [{}]:
+            yield Event(invocation_id=ctx.invocation_id, author=self.name, actions=EventActions(state_delta=delta))
+
+
+def _workflow(root_script=(), gather_script=(), plan_script=()):
+    gather = ScriptedAgent(name=workflow.GATHER_AGENT_NAME, script=list(gather_script))
+    plan = ScriptedAgent(name=workflow.PLAN_AGENT_NAME, script=list(plan_script))
+    root = ScriptedAgent(name="root_agent", script=list(root_script), sub_agents=[gather, plan])
+    return workflow.TripPlannerWorkflow(name="trip_planner_workflow", sub_agents=[root])
+
+
+def _run(agent, state):
+    """Drives the workflow the way the Runner does, applying each event to the session."""
+    async def run():
+        service = InMemorySessionService()
+        session = await service.create_session(app_name="trip_planner", user_id="u1", state=state)
+        ctx = InvocationContext(
+            session_service=service, invocation_id="inv-1", agent=agent, session=session
+        )
+        events = []
+        async for event in agent._run_async_impl(ctx):
+            await service.append_event(session, event)
+            events.append(event)
+        return events, session.state
+
+    return asyncio.run(run())
+
+
+def _tool(name, result, updates=None):
+    calls = []
+
+    async def tool(tool_context):
+        calls.append(name)
+        tool_context.state.update(updates or {})
+        return result
+
+    tool.__name__ = name
+    return tool, calls
+
+
+@pytest.mark.parametrize("state, stage", [
+    ({}, workflow.DESTINATION),
+    ({"destination": "None"}, workflow.DESTINATION),
+    ({"destination": "Tokyo"}, workflow.GATHER),
+    ({"destination": "Tokyo", "ideas_videos": ["v"]}, workflow.INGEST),
+    ({"destination": "Tokyo", "ideas_videos": ["v"], "ideas_raw_text": ["t"]}, workflow.REFINE),
+    ({"destination": "Tokyo", "ideas_videos": ["v"], "ideas_refined_text": ["n"]}, workflow.PLAN),
+    ({"destination": "Tokyo", "ideas_videos": ["v"], "ideas_refined_text": ["n"], "itinerary": {}}, workflow.PLAN),
+    ({"destination": "Tokyo", "ideas_videos": ["v"], "ideas_refined_text": ["n"], "itinerary": {"destination": "Tokyo", "days": [{}]}}, workflow.PRESENT),
+])
+def test_next_stage(state, stage):
+    assert workflow.next_stage(state) == stage
+
+
+def test_stages_are_delegated_and_cut_off_once_they_complete(monkeypatch):
+    ingest, calls = _tool("ingest_videos", "Success", {"ideas_refined_text": ["n"]})
+    monkeypatch.setattr(workflow, "ingest_videos", ingest)
+    agent = _workflow(
+        gather_script=[{"ideas_videos": ["v"]}, {"gather_kept_going": True}],
+        plan_script=[{"itinerary": ITINERARY}],
+    )
+
+    events, state = _run(agent, {"destination": "Tokyo"})
+
+    assert [event.author for event in events] == [
+        workflow.GATHER_AGENT_NAME,
+        "trip_planner_workflow",
+        workflow.PLAN_AGENT_NAME,
+        "root_agent",
+    ]
+    assert calls == ["ingest_videos"]
+    # The gather agent was stopped at the event that completed its stage
+    assert "gather_kept_going" not in state
+    assert state["itinerary"] == ITINERARY
+
+
+def test_a_stuck_ingest_is_handed_to_root_with_a_stage_note(monkeypatch):
+    ingest, calls = _tool("ingest_videos", "Partial Success: Transcribed 0 videos. Failures:\nv: Skipped")
+    monkeypatch.setattr(workflow, "ingest_videos", ingest)
+    agent = _workflow()
+    root = agent.sub_agents[0]
+
+    events, state = _run(agent, {"destination": "Tokyo", "ideas_videos": ["v"]})
+
+    assert calls == ["ingest_videos"]
+    assert [event.author for event in events] == ["trip_planner_workflow", "root_agent"]
+    note = render_state_views(root.seen[0])["stage_note"]
+    assert note.startswith("The ingest step made no progress this turn: Partial Success: Transcribed 0 videos.")
+    # Session-only: gone before the turn's state is persisted
+    assert workflow.STAGE_NOTE_KEY not in state
+
+
+def test_other_delegations_have_no_stage_note():
+    agent = _workflow()
+    root = agent.sub_agents[0]
+
+    _run(agent, {"destination": "Tokyo", "ideas_videos": ["v"], "itinerary": ITINERARY})
+
+    assert render_state_views(root.seen[0])["stage_note"] == "None"
+
+
+def test_welcome_back_is_said_once_by_the_workflow():
+    agent = _workflow()
+    root = agent.sub_agents[0]
+    state = {"destination": "Tokyo", "ideas_videos": ["v"], "itinerary": ITINERARY, "_just_restored": True}
+
+    events, _ = _run(agent, state)
+
+    assert events[0].content.parts[0].text.startswith("Welcome back!")
+    assert [event.author for event in events] == ["trip_planner_workflow", "root_agent"]
+    assert render_state_views(root.seen[0])["just_restored"] is False
@@ -0,0 +1,114 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from trip_planner.shared_libraries import ydl_pool as ydl_pool_module
+from trip_planner.shared_libraries.ydl_pool import YoutubeDLPool
+
+
+class FakeYoutubeDL:
+    def __init__(self, params):
+        self.params = params
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_ydl(monkeypatch):
+    monkeypatch.setattr(ydl_pool_module.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+
+
+def test_returned_instances_are_reused():
+    pool = YoutubeDLPool()
+
+    with pool.acquire({"quiet": True}) as first:
+        pass
+    with pool.acquire({"quiet": True}) as second:
+        pass
+
+    assert second is first
+    assert not first.closed
+    assert pool.stats() == {"idle": 1, "created": 1, "reused": 1}
+
+
+def test_checked_out_instances_are_never_shared():
+    pool = YoutubeDLPool()
+
+    with pool.acquire({"quiet": True}) as first, pool.acquire({"quiet": True}) as second:
+        assert second is not first
+        assert pool.stats()["idle"] == 0
+
+    assert pool.stats() == {"idle": 2, "created": 2, "reused": 0}
+
+
+def test_instances_are_keyed_by_their_options():
+    pool = YoutubeDLPool()
+
+    with pool.acquire({"quiet": True, "proxy": "http://a"}) as first:
+        pass
+    with pool.acquire({"proxy": "http://b", "quiet": True}) as second:
+        pass
+    # Same options in a different order share an instance
+    with pool.acquire({"proxy": "http://a", "quiet": True}) as third:
+        pass
+
+    assert second is not first
+    assert second.params == {"proxy": "http://b", "quiet": True}
+    assert third is first
+
+
+def test_instances_get_their_own_copy_of_the_options():
+    pool = YoutubeDLPool()
+    opts = {"quiet": True}
+
+    with pool.acquire(opts) as ydl:
+        ydl.params["quiet"] = False
+
+    assert opts == {"quiet": True}
+
+
+def test_instances_are_returned_when_the_caller_raises():
+    pool = YoutubeDLPool()
+
+    with pytest.raises(RuntimeError), pool.acquire({"quiet": True}):
+        raise RuntimeError("download failed")
+
+    assert pool.stats()["idle"] == 1
+
+
+def test_instances_beyond_the_idle_limit_are_closed():
+    pool = YoutubeDLPool(max_idle_per_key=1)
+
+    with pool.acquire({"quiet": True}) as first, pool.acquire({"quiet": True}) as second:
+        pass
+
+    assert not second.closed
+    assert first.closed
+    assert pool.stats()["idle"] == 1
+
+
+def test_close_closes_idle_instances():
+    pool = YoutubeDLPool()
+    with pool.acquire({"quiet": True}) as ydl:
+        pass
+
+    pool.close()
+
+    assert ydl.closed
+    assert pool.stats()["idle"] == 0
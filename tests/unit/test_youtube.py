@@ -0,0 +1,119 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import io
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from trip_planner.shared_libraries.transcript_cache import TranscriptCache
+from trip_planner.tools import youtube
+
+URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TranscriptCache(str(tmp_path / "t.sqlite3"))
+    monkeypatch.setattr(youtube, "transcript_cache", cache)
+    monkeypatch.setattr(youtube, "CACHE_ENABLED", True)
+    return cache
+
+
+def _download_returning(monkeypatch, text):
+    calls = []
+    monkeypatch.setattr(youtube, "_download_transcript", lambda url, deadline=None: calls.append(url) or text)
+    return calls
+
+
+def test_extract_video_id():
+    for url in (
+        URL,
+        "https://youtu.be/abcdefghijk?t=3",
+        "https://www.youtube.com/shorts/abcdefghijk",
+        "https://www.youtube.com/embed/abcdefghijk",
+    ):
+        assert youtube.extract_video_id(url) == "abcdefghijk"
+
+
+def test_transcripts_are_cached(cache, monkeypatch):
+    calls = _download_returning(monkeypatch, "hello tokyo")
+    assert youtube.get_youtube_transcript(URL) == "hello tokyo"
+    assert youtube.get_youtube_transcript(URL) == "hello tokyo"
+    assert len(calls) == 1
+
+
+def test_missing_subtitles_are_negatively_cached(cache, monkeypatch):
+    calls = _download_returning(monkeypatch, f"{youtube.NO_SUBTITLES_PREFIX} for {URL}")
+    youtube.get_youtube_transcript(URL)
+    youtube.get_youtube_transcript(URL)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("text", [
+    "Error retrieving transcript: HTTP Error 429: Too Many Requests",
+    "Error retrieving transcript: Sign in to confirm you're not a bot",
+    f"{youtube.CIRCUIT_OPEN_PREFIX} (retry in 30s) for {URL}",
+    "Error retrieving transcript: timed out",
+])
+def test_blocks_and_transient_errors_are_not_cached(cache, monkeypatch, text):
+    calls = _download_returning(monkeypatch, text)
+    youtube.get_youtube_transcript(URL)
+    youtube.get_youtube_transcript(URL)
+    assert len(calls) == 2
+
+
+class _SlowResponse(io.BytesIO):
+    """A subtitle track that trickles in one small chunk at a time."""
+    def read(self, size=-1):
+        time.sleep(0.05)
+        return super().read(16)
+
+
+class _FakeYDL:
+    def extract_info(self, url, download=False):
+        return {"requested_subtitles": {"en": {"url": "https://example.com/subs.vtt"}}}
+
+    def urlopen(self, url):
+        cues = "".join(f"00:00:{i:02d}.000 --> 00:00:{i + 1:02d}.000\nword{i}\n\n" for i in range(60))
+        return _SlowResponse(f"WEBVTT\n\n{cues}".encode())
+
+
+@pytest.fixture
+def fake_ydl(monkeypatch):
+    @contextmanager
+    def acquire(ydl_opts):
+        yield _FakeYDL()
+
+    monkeypatch.setattr(youtube.ydl_pool, "acquire", acquire)
+
+
+def test_download_stops_reading_at_the_deadline(fake_ydl):
+    started = time.monotonic()
+    result = youtube._download_transcript_in_memory(URL, deadline=started + 0.2)
+
+    assert result.startswith("Error retrieving transcript: timed out")
+    assert time.monotonic() - started < 1
+
+
+def test_download_without_a_deadline_reads_everything(fake_ydl, monkeypatch):
+    monkeypatch.setattr(_SlowResponse, "read", lambda self, size=-1: io.BytesIO.read(self, size))
+
+    result = youtube._download_transcript_in_memory(URL)
+
+    assert result.split()[:2] == ["word0", "word1"]
+    assert len(result.split()) == 60
@@ -13,10 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 from google.adk.agents import Agent
+from google.adk.apps import App
 from google.adk.tools import load_memory
 
-from trip_planner import prompt
+from trip_planner.state_views import root_agent_instruction
 
 from trip_planner.sub_agents.gather_videos.agent import gather_videos_agent
 from trip_planner.sub_agents.build_itinerary.agent import build_itinerary_agent
@@ -24,8 +27,11 @@ from trip_planner.sub_agents.build_itinerary.agent import build_itinerary_agent
 from trip_planner.tools.memory import memorize
 from trip_planner.tools.transcriber import transcribe_videos
 from trip_planner.tools.compactor import compact_travel_ideas
+from trip_planner.tools.pipeline import ingest_videos
 from trip_planner.callbacks import root_agent_pre_hook
 from trip_planner.callbacks import persist_session_state
+from trip_planner.memory_ingest import MemoryIngestPlugin
+from trip_planner.workflow import TripPlannerWorkflow
 
 
 from trip_planner.logger_config import setup_logging
@@ -35,12 +41,32 @@ root_agent = Agent(
     model="gemini-2.5-flash",
     name="root_agent",
     description="A Trip Planner using the services of multiple sub-agents",
-    instruction=prompt.ROOT_AGENT_INSTR,
+    instruction=root_agent_instruction,
     sub_agents=[
         gather_videos_agent,
         build_itinerary_agent
     ],
-    tools=[memorize, transcribe_videos, compact_travel_ideas, load_memory],
+    tools=[memorize, ingest_videos, transcribe_videos, compact_travel_ideas, load_memory],
     before_agent_callback=root_agent_pre_hook,
     after_agent_callback=persist_session_state,
 )
+
+# "workflow" puts a code-driven orchestrator in front of the LLM root agent:
+# pipeline routing and the ingest/refine tools run without model calls,
+# while root_agent still handles the conversational parts.
+if os.getenv("TRIP_PLANNER_ORCHESTRATOR", "llm").lower() == "workflow":
+    # The wrapper hydrates and persists once per turn; the inner agent
+    # running the same callbacks would do it all twice
+    root_agent.before_agent_callback = None
+    root_agent.after_agent_callback = None
+    root_agent = TripPlannerWorkflow(
+        name="trip_planner_workflow",
+        description="Deterministic trip planning pipeline around the root agent",
+        sub_agents=[root_agent],
+        before_agent_callback=root_agent_pre_hook,
+        after_agent_callback=persist_session_state,
+    )
+
+# Runners built from the App close its plugins on shutdown, which flushes
+# the debounced memory ingestion while its event loop is still alive
+app = App(name="trip_planner", root_agent=root_agent, plugins=[MemoryIngestPlugin()])
@@ -14,6 +14,7 @@
 # limitations under the License.
 from google.adk.agents.callback_context import CallbackContext
 from trip_planner.state_manager import state_manager
+from trip_planner.memory_ingest import memory_ingest_scheduler
 from trip_planner.tools.memory import _load_precreated_scenario
 import logging
 
@@ -28,11 +29,11 @@ async def hydrate_session_state(callback_context: CallbackContext):
     user_id = "default_user"
     
     if not callback_context.state.get("destination"):
-        logger.debug(f"\n[System] 💧 Looking for user state to hydrate...")
+        logger.debug("\n[System] 💧 Looking for user state to hydrate...")
         saved_state = state_manager.get_user_state(user_id)
         
         if saved_state and saved_state.get("destination"):
-            logger.debug(f"\n[System] 💧 Hydrating user state...")
+            logger.debug("\n[System] 💧 Hydrating user state...")
             callback_context.state.update(saved_state)
             callback_context.state._value["_just_restored"] = True
 
@@ -57,11 +58,12 @@ async def persist_session_state(callback_context: CallbackContext):
     state_manager.save_user_state(user_id, state_as_dict)
     
     # 4. Save History
-
-    await callback_context._invocation_context.memory_service.add_session_to_memory(
+    # Queued for debounced background indexing, off the response path
+    memory_ingest_scheduler.schedule(
+        callback_context._invocation_context.memory_service,
         callback_context._invocation_context.session)
     
-    logger.debug(f"  [Memory] 💾 Snapshot saved for user '{user_id}'")
+    logger.debug("  [Memory] 💾 Snapshot saved for user '%s'", user_id)
 
 
 async def root_agent_pre_hook(callback_context: CallbackContext):
@@ -12,24 +12,137 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import atexit
+import copy
+import json
 import logging
-import sys
+import logging.handlers
 import os
-from dotenv import load_dotenv
-
-import logging
+import queue
 import sys
-import os
+import threading
+import time
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+# Templates tracked by the rate limiter before idle ones are pruned
+MAX_RATE_LIMITED_TEMPLATES = 1000
+# Log arguments of these types cannot change after the call
+_IMMUTABLE_ARG_TYPES = (str, int, float, bytes, type(None))
+
+_listener = None
+
+
+class CloudLoggingFormatter(logging.Formatter):
+    """
+    One JSON object per line. Cloud Run / Agent Engine parse stdout lines
+    like this into structured entries, with `severity` as the log level.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "severity": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "logging.googleapis.com/sourceLocation": {
+                "file": record.pathname,
+                "line": record.lineno,
+                "function": record.funcName,
+            },
+        }
+        if record.exc_info:
+            entry["message"] += "\n" + self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Lets through at most `limit` DEBUG records per message template every
+    `window` seconds; the per-video lines of a 50-video batch share one
+    template. The first record of the next window reports how many were dropped.
+    """
+    def __init__(self, limit: int = 20, window: float = 10.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        # Format: { (logger name, template): [window start, count, suppressed] }
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno > logging.DEBUG:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None and len(self._counters) >= MAX_RATE_LIMITED_TEMPLATES:
+                self._counters = {
+                    k: c for k, c in self._counters.items() if now - c[0] < self.window
+                }
+            if counter is None or now - counter[0] >= self.window:
+                suppressed = counter[2] if counter else 0
+                self._counters[key] = [now, 1, 0]
+                if suppressed:
+                    # Format first: the note must not be read as a template,
+                    # and a literal "%" in the message must not break it
+                    try:
+                        message = record.getMessage()
+                    except (TypeError, ValueError):
+                        message = str(record.msg)
+                    record.msg = f"{message} ({suppressed} similar lines suppressed)"
+                    record.args = None
+                return True
+            if counter[1] < self.limit:
+                counter[1] += 1
+                return True
+            counter[2] += 1
+            return False
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread when every
+    log argument is immutable (strings, numbers), the common case. Records
+    with other arguments (state dicts, lists) go through the stock
+    prepare(), which renders the message in the caller before they change.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and (not isinstance(args, tuple) or not all(isinstance(arg, _IMMUTABLE_ARG_TYPES) for arg in args)):
+            return super().prepare(record)
+        return copy.copy(record)
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Flush whatever is still queued when the process exits
+atexit.register(_stop_listener)
+
+
 def setup_logging():
     """
     Configures the Global Root Logger.
     """
+    global _listener
     load_dotenv()
     
     env_level_str = os.environ.get("LOG_LEVEL", "INFO").upper()
     numeric_level = getattr(logging, env_level_str, logging.INFO)
+    # "text" for local runs, "json" for one structured entry per line in Cloud Logging
+    log_format = os.environ.get("LOG_FORMAT", "text").lower()
+    # Write log lines from a background thread instead of the calling coroutine
+    log_async = os.environ.get("LOG_ASYNC", "1").lower() not in ("0", "false", "no")
+    # At most this many DEBUG lines per message template per window (0 = unlimited)
+    rate_limit = DebugRateLimitFilter(
+        limit=int(os.environ.get("LOG_DEBUG_RATE_LIMIT", "20")),
+        window=float(os.environ.get("LOG_DEBUG_RATE_WINDOW_SECONDS", "10")),
+    )
 
     # 1. Get the ROOT logger (no name provided)
     root_logger = logging.getLogger()
@@ -38,25 +151,39 @@ def setup_logging():
     # 2. Clear default handlers (Vertex/Cloud Run often adds a default one)
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
+    _stop_listener()
 
     # 3. Create a clean Console Handler for Cloud Logging
     # Using sys.stdout ensures it lands in the "stdout" stream in Log Explorer
     c_handler = logging.StreamHandler(sys.stdout)
     c_handler.setLevel(numeric_level)
     
-    # 4. Use a format that is easy to grep in Cloud Logs
-    c_format = logging.Formatter('%(levelname)s: [%(name)s] %(message)s')
+    # 4. Use a format that is easy to grep in Cloud Logs, or structured JSON
+    if log_format == "json":
+        c_format = CloudLoggingFormatter()
+    else:
+        c_format = logging.Formatter('%(levelname)s: [%(name)s] %(message)s')
     c_handler.setFormatter(c_format)
 
-    root_logger.addHandler(c_handler)
+    # 5. Hand records to a background thread, so tools never block on stdout.
+    # The rate limit runs in the caller, before a dropped record is queued.
+    if log_async:
+        q_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        q_handler.addFilter(rate_limit)
+        _listener = logging.handlers.QueueListener(q_handler.queue, c_handler, respect_handler_level=True)
+        _listener.start()
+        root_logger.addHandler(q_handler)
+    else:
+        c_handler.addFilter(rate_limit)
+        root_logger.addHandler(c_handler)
 
-    # 5. Silence chatty third-party libraries (Optional but recommended for DEBUG)
+    # 6. Silence chatty third-party libraries (Optional but recommended for DEBUG)
     # If you don't do this, 'DEBUG' will show you every HTTP request Google makes.
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("google.auth").setLevel(logging.WARNING)
     logging.getLogger("fsspec").setLevel(logging.WARNING)
 
-    # 6. Test it immediately
-    root_logger.info(f"Logging configured at level: {env_level_str}")
+    # 7. Test it immediately
+    root_logger.info("Logging configured at level: %s", env_level_str)
     
-    return root_logger
\ No newline at end of file
+    return root_logger
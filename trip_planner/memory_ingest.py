@@ -0,0 +1,213 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Debounced background ingestion of sessions into the ADK memory service."""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from google.adk.memory.base_memory_service import BaseMemoryService
+from google.adk.plugins.base_plugin import BasePlugin
+
+from trip_planner.shared_libraries.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_SECONDS = float(os.environ.get("MEMORY_INGEST_DEBOUNCE_SECONDS", "5"))
+# Upper bound on how long a busy session can keep pushing its ingest back
+MAX_DELAY_SECONDS = float(os.environ.get("MEMORY_INGEST_MAX_DELAY_SECONDS", "30"))
+# How long process exit waits for the final flush
+EXIT_FLUSH_TIMEOUT_SECONDS = float(os.environ.get("MEMORY_INGEST_EXIT_TIMEOUT_SECONDS", "10"))
+
+
+def _supports_event_deltas(memory_service) -> bool:
+    """True if the service implements add_events_to_memory (the base class only raises)."""
+    method = getattr(type(memory_service), "add_events_to_memory", None)
+    return method is not None and method is not BaseMemoryService.add_events_to_memory
+
+
+class MemoryIngestScheduler:
+    """
+    Takes memory ingestion off the response path.
+    `schedule()` only records the session; a timer waits until no new turn
+    has arrived for `debounce_seconds` (or `max_delay_seconds` have passed
+    since the first pending turn), then ingests every pending session in
+    one batch, sending only the events added since the last ingest of that
+    session.
+    Timers and flushes run on the scheduler's own event loop, in a daemon
+    thread, so they outlive the loop of the request that scheduled them
+    (e.g. asyncio.run() per query) and can still flush at process exit.
+    """
+    def __init__(
+        self,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        max_delay_seconds: float = MAX_DELAY_SECONDS,
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        # Format: { (app, user, session_id): (memory_service, session, first_at, last_at) }
+        self._pending = {}
+        # Format: { (app, user, session_id): number of events already ingested }
+        self._ingested_events = LRUCache(max_entries=10000)
+        # Guards _pending and _timer: schedule() runs on request loops
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: Future | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self.batches = 0
+        self.events_ingested = 0
+        self.failures = 0
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """The scheduler's event loop, started on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="memory-ingest", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def schedule(self, memory_service, session):
+        """Queues a session for ingestion. Never blocks on the memory backend."""
+        if memory_service is None or session is None:
+            return
+
+        loop = self._background_loop()
+        key = (session.app_name, session.user_id, session.id)
+        now = time.monotonic()
+        with self._lock:
+            first_at = self._pending[key][2] if key in self._pending else now
+            self._pending[key] = (memory_service, session, first_at, now)
+            if self._timer is None:
+                self._timer = asyncio.run_coroutine_threadsafe(self._run_timer(), loop)
+
+    def _next_deadline(self) -> float:
+        return min(
+            min(last_at + self.debounce_seconds, first_at + self.max_delay_seconds)
+            for _, _, first_at, last_at in self._pending.values()
+        )
+
+    async def _run_timer(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    # The next schedule() starts a new timer
+                    self._timer = None
+                    return
+                wait = self._next_deadline() - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            await self._flush()
+
+    async def flush(self):
+        """Ingests everything pending right now, on the scheduler's loop."""
+        loop = self._background_loop()
+        if asyncio.get_running_loop() is loop:
+            await self._flush()
+        else:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._flush(), loop))
+
+    async def _flush(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+
+            results = await asyncio.gather(
+                *(
+                    self._ingest(key, memory_service, session)
+                    for key, (memory_service, session, _, _) in batch.items()
+                ),
+                return_exceptions=True,
+            )
+            self.batches += 1
+            for key, result in zip(batch, results, strict=True):
+                if isinstance(result, Exception):
+                    self.failures += 1
+                    logger.warning("[Memory] Ingest failed for session %s: %s", key[2], result)
+
+    async def _ingest(self, key, memory_service, session):
+        already = self._ingested_events.get(key, 0)
+        events = list(session.events[already:])
+        if not events:
+            return
+
+        if _supports_event_deltas(memory_service):
+            # Incremental: only the events since the last ingest
+            await memory_service.add_events_to_memory(
+                app_name=session.app_name,
+                user_id=session.user_id,
+                events=events,
+                session_id=session.id,
+            )
+        else:
+            # Older ADK / backends without delta support get the whole session
+            await memory_service.add_session_to_memory(session)
+
+        self._ingested_events.put(key, already + len(events))
+        self.events_ingested += len(events)
+        logger.debug("  [Memory] 💾 Indexed %s new events for session %s", len(events), key[2])
+
+    async def shutdown(self):
+        """
+        Flushes pending sessions now instead of waiting for the timer.
+        MemoryIngestPlugin does this when the runner closes.
+        """
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "events_ingested": self.events_ingested,
+            "failures": self.failures,
+        }
+
+    def _flush_at_exit(self):
+        """Last-chance flush at interpreter exit, bounded by EXIT_FLUSH_TIMEOUT_SECONDS."""
+        if not self._pending or self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._flush(), self._loop)
+        try:
+            future.result(timeout=EXIT_FLUSH_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning("[Memory] %s sessions were not ingested at exit: %s", len(self._pending), e)
+
+
+class MemoryIngestPlugin(BasePlugin):
+    """Flushes pending memory ingestion when the runner closes."""
+    def __init__(self, scheduler: MemoryIngestScheduler | None = None):
+        super().__init__(name="memory_ingest")
+        self.scheduler = scheduler
+
+    async def close(self) -> None:
+        await (self.scheduler or memory_ingest_scheduler).shutdown()
+
+
+# Global Singleton
+memory_ingest_scheduler = MemoryIngestScheduler()
+atexit.register(memory_ingest_scheduler._flush_at_exit)
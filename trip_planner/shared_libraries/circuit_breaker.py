@@ -0,0 +1,158 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide circuit breakers for flaky upstreams (e.g. YouTube)."""
+
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = int(os.environ.get("YT_BREAKER_FAILURE_THRESHOLD", "2"))
+BASE_BACKOFF_SECONDS = float(os.environ.get("YT_BREAKER_BASE_BACKOFF_SECONDS", "30"))
+MAX_BACKOFF_SECONDS = float(os.environ.get("YT_BREAKER_MAX_BACKOFF_SECONDS", "900"))
+JITTER = 0.2
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    While open, requests fail fast. After an exponentially growing,
+    jittered backoff the breaker goes half-open and lets exactly one
+    probe through: success closes it, failure re-opens it with a
+    longer backoff.
+    """
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        base_backoff_seconds: float = BASE_BACKOFF_SECONDS,
+        max_backoff_seconds: float = MAX_BACKOFF_SECONDS,
+        jitter: float = JITTER,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.jitter = jitter
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        # Trips since the last success; drives the exponential backoff
+        self.consecutive_trips = 0
+        self.total_trips = 0
+        self.rejected = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """True if the caller may hit the upstream now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.monotonic() >= self._open_until:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                logger.info("[Breaker] %s: half-open, probing", self.name)
+
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state == OPEN:
+                # A straggler that started before the trip; wait for the probe
+                return
+            if self.state == HALF_OPEN:
+                logger.info("[Breaker] %s: closed after successful probe", self.name)
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.consecutive_trips = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == OPEN:
+                # Already tripped by an earlier concurrent request
+                return
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def record_neutral(self):
+        """The call finished without telling us anything about blocking."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self):
+        self.consecutive_trips += 1
+        self.total_trips += 1
+        backoff = min(
+            self.max_backoff_seconds,
+            self.base_backoff_seconds * (2 ** (self.consecutive_trips - 1)),
+        )
+        backoff *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.state = OPEN
+        self._open_until = time.monotonic() + backoff
+        self._probe_in_flight = False
+        logger.warning("[Breaker] %s: open for %.0fs (trip #%s)", self.name, backoff, self.total_trips)
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 if not open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def snapshot(self) -> dict:
+        """Current state and counters, for monitoring."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "consecutive_trips": self.consecutive_trips,
+            "total_trips": self.total_trips,
+            "rejected": self.rejected,
+            "retry_after_seconds": round(self.retry_after(), 1),
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Returns the process-wide breaker for `name`, creating it on first use."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def breaker_stats() -> dict:
+    """Snapshots of every breaker, keyed by name."""
+    with _breakers_lock:
+        return {name: breaker.snapshot() for name, breaker in _breakers.items()}
@@ -0,0 +1,261 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local, single-pass validation and repair of itinerary JSON."""
+
+import copy
+import re
+from itertools import pairwise
+from typing import Any
+
+from trip_planner.shared_libraries.poi_store import normalize_name
+
+REQUIRED_EVENT_FIELDS = ("location", "description", "address", "start_time", "end_time")
+
+# "9:00", "09:00", "9.00", "0900", "9:00:00", "9:00 pm", "9pm"
+_TIME_RE = re.compile(
+    r"^\s*(\d{1,2})(?:[:.h]?(\d{2}))?(?::\d{2})?\s*([ap]\.?m\.?)?\s*$", re.IGNORECASE
+)
+_NAMED_TIMES = {"noon": 12 * 60, "midday": 12 * 60, "midnight": 0}
+_BOOL_STRINGS = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False}
+DAY_MINUTES = 24 * 60
+# An end_time before start_time is read as "after midnight" up to this long
+MAX_OVERNIGHT_MINUTES = 12 * 60
+
+
+def parse_time(value: Any) -> int | None:
+    """Minutes after midnight, or None if `value` is not a recognizable time."""
+    if not isinstance(value, str):
+        return None
+    if value.strip().lower() in _NAMED_TIMES:
+        return _NAMED_TIMES[value.strip().lower()]
+    match = _TIME_RE.match(value)
+    if not match:
+        return None
+    hours, minutes, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if meridiem[0].lower() == "p" else 0)
+    elif match.group(2) is None:
+        # A bare number is only a time with am/pm, e.g. "9pm"
+        return None
+    if hours == 24 and minutes == 0:
+        return DAY_MINUTES
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def format_time(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class ItineraryValidator:
+    """
+    Checks an itinerary dict in one pass and collects every problem with
+    its path (e.g. "days[1].events[0].end_time"), instead of stopping at
+    the first one. Trivial problems are repaired in a copy of the input:
+    time formats ("9:00" -> "09:00"), numeric strings, boolean strings,
+    and the order of days and events. Each repair is recorded.
+    Warnings (a place visited twice, an event running past midnight) are
+    reported but do not reject the itinerary.
+    """
+    def __init__(self, itinerary: Any):
+        self.original = itinerary
+        self.itinerary = copy.deepcopy(itinerary)
+        self.errors = []
+        self.repairs = []
+        self.warnings = []
+        # Reordering is applied last, so every path refers to the input as sent
+        self._reorders = []
+        self._days_order = None
+
+    def error(self, path: str, message: str):
+        self.errors.append(f"{path}: {message}")
+
+    def warn(self, path: str, message: str):
+        self.warnings.append(f"{path}: {message}")
+
+    def repair(self, path: str, old: Any, new: Any):
+        self.repairs.append(f"{path}: {old!r} -> {new!r}")
+
+    def validate(self) -> "ItineraryValidator":
+        data = self.itinerary
+        if not isinstance(data, dict):
+            self.error("itinerary", "must be a JSON object with 'destination' and 'days'")
+            return self
+
+        destination = data.get("destination")
+        if not isinstance(destination, str) or not destination.strip():
+            self.error("destination", "is required (e.g. \"Tokyo\")")
+
+        days = data.get("days")
+        if not isinstance(days, list) or not days:
+            self.error("days", "must be a non-empty list of days")
+            return self
+
+        for i, day in enumerate(days):
+            self._check_day(f"days[{i}]", day)
+        self._check_day_numbers(days)
+        self._check_duplicate_locations(days)
+
+        for path, day, order in self._reorders:
+            day["events"] = [day["events"][j] for j in order]
+            self.repair(f"{path}.events", f"order {order}", "sorted by start_time")
+        if self._days_order is not None:
+            data["days"] = [days[i] for i in self._days_order]
+            self.repair("days", [days[i]["day_number"] for i in range(len(days))], "sorted by day_number")
+        return self
+
+    def _check_day(self, path: str, day: Any):
+        if not isinstance(day, dict):
+            self.error(path, "must be an object with 'day_number' and 'events'")
+            return
+
+        day_number = day.get("day_number")
+        if isinstance(day_number, str) and day_number.strip().isdigit():
+            day["day_number"] = int(day_number)
+            self.repair(f"{path}.day_number", day_number, day["day_number"])
+        elif not isinstance(day_number, int) or isinstance(day_number, bool):
+            self.error(f"{path}.day_number", f"must be an integer, got {day_number!r}")
+
+        events = day.get("events", [])
+        if not isinstance(events, list):
+            self.error(f"{path}.events", "must be a list of events")
+            return
+
+        timed = []
+        for j, event in enumerate(events):
+            span = self._check_event(f"{path}.events[{j}]", event)
+            if span is not None:
+                timed.append((span, j))
+
+        timed.sort()
+        # Events out of chronological order are only a presentation problem
+        if len(timed) == len(events) and [j for _, j in timed] != list(range(len(events))):
+            self._reorders.append((path, day, [j for _, j in timed]))
+
+        for ((_, end), j), ((next_start, _), k) in pairwise(timed):
+            if next_start < end:
+                self.error(
+                    f"{path}.events[{k}]",
+                    f"overlaps {path}.events[{j}] ({format_time(next_start)} starts before "
+                    f"{format_time(end - DAY_MINUTES if end > DAY_MINUTES else end)} ends)",
+                )
+
+    def _check_event(self, path: str, event: Any) -> tuple | None:
+        """Checks one event; returns its (start, end) minutes if both times are valid."""
+        if not isinstance(event, dict):
+            self.error(path, "must be an object")
+            return None
+
+        for field in REQUIRED_EVENT_FIELDS:
+            value = event.get(field)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                self.error(f"{path}.{field}", "is required")
+            elif not isinstance(value, str):
+                event[field] = str(value)
+                self.repair(f"{path}.{field}", value, event[field])
+
+        booking = event.get("booking_required")
+        if isinstance(booking, str) and booking.strip().lower() in _BOOL_STRINGS:
+            event["booking_required"] = _BOOL_STRINGS[booking.strip().lower()]
+            self.repair(f"{path}.booking_required", booking, event["booking_required"])
+        elif booking is not None and not isinstance(booking, bool):
+            self.error(f"{path}.booking_required", f"must be true or false, got {booking!r}")
+
+        times = []
+        for field in ("start_time", "end_time"):
+            value = event.get(field)
+            if value is None:
+                continue
+            minutes = parse_time(value)
+            if minutes is None:
+                self.error(f"{path}.{field}", f"{value!r} is not a time in HH:MM format")
+                continue
+            if minutes == DAY_MINUTES and field == "start_time":
+                self.error(f"{path}.{field}", "24:00 is only valid as an end_time; use 00:00")
+                continue
+            normalized = format_time(minutes)
+            if normalized != value:
+                event[field] = normalized
+                self.repair(f"{path}.{field}", value, normalized)
+            times.append(minutes)
+
+        if len(times) != 2:
+            return None
+        start, end = times
+        if start == end:
+            self.error(f"{path}.end_time", f"{event['end_time']} must be after start_time {event['start_time']}")
+            return None
+        if end < start:
+            # e.g. 22:00-02:00 ends the next day
+            if end + DAY_MINUTES - start > MAX_OVERNIGHT_MINUTES:
+                self.error(
+                    f"{path}.end_time",
+                    f"{event['end_time']} must be after start_time {event['start_time']} "
+                    f"(events past midnight may last at most {MAX_OVERNIGHT_MINUTES // 60} hours)",
+                )
+                return None
+            self.warn(path, f"runs overnight ({event['start_time']} to {event['end_time']} the next day)")
+            end += DAY_MINUTES
+        return start, end
+
+    def _check_day_numbers(self, days: list):
+        numbered = [
+            (day["day_number"], i) for i, day in enumerate(days)
+            if isinstance(day, dict) and isinstance(day.get("day_number"), int)
+        ]
+        if len(numbered) != len(days):
+            return
+
+        seen = {}
+        for number, i in numbered:
+            if number in seen:
+                self.error(f"days[{i}].day_number", f"duplicates days[{seen[number]}] (day {number})")
+            seen[number] = i
+        if len(seen) != len(days):
+            return
+
+        expected = list(range(1, len(days) + 1))
+        if sorted(seen) != expected:
+            missing = sorted(set(expected) - set(seen))
+            self.error("days", f"day_number values must run 1..{len(days)} without gaps; missing {missing}")
+        elif [number for number, _ in numbered] != expected:
+            self._days_order = [i for _, i in sorted(numbered)]
+
+    def _check_duplicate_locations(self, days: list):
+        first_seen = {}
+        for i, day in enumerate(days):
+            if not isinstance(day, dict) or not isinstance(day.get("events"), list):
+                continue
+            for j, event in enumerate(day["events"]):
+                if not isinstance(event, dict) or not isinstance(event.get("location"), str):
+                    continue
+                key = normalize_name(event["location"])
+                if not key:
+                    continue
+                path = f"days[{i}].events[{j}].location"
+                if key in first_seen:
+                    # Going back to a place (a hotel, a favorite cafe) can be deliberate
+                    self.warn(path, f"{event['location']!r} is already scheduled at {first_seen[key]}")
+                else:
+                    first_seen[key] = path
+
+
+def validate_itinerary(itinerary: Any) -> ItineraryValidator:
+    """Validates (and repairs a copy of) `itinerary`; see ItineraryValidator."""
+    return ItineraryValidator(itinerary).validate()
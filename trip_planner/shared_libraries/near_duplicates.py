@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local near-duplicate detection for transcripts (word shingling)."""
+
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("NEAR_DUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Words per shingle; longer shingles make matches stricter
+SHINGLE_WORDS = int(os.environ.get("NEAR_DUP_SHINGLE_WORDS", "5"))
+# Two transcripts are near-duplicates if their shingle sets overlap this much...
+JACCARD_THRESHOLD = float(os.environ.get("NEAR_DUP_JACCARD_THRESHOLD", "0.6"))
+# ...or if this share of the smaller one also appears in the larger one (re-cuts)
+CONTAINMENT_THRESHOLD = float(os.environ.get("NEAR_DUP_CONTAINMENT_THRESHOLD", "0.8"))
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, words: int = SHINGLE_WORDS) -> frozenset:
+    """Hashed, case-folded word n-grams of `text`."""
+    tokens = _WORD_RE.findall(text.lower())
+    if len(tokens) <= words:
+        return frozenset([hash(tuple(tokens))]) if tokens else frozenset()
+    return frozenset(hash(tuple(tokens[i:i + words])) for i in range(len(tokens) - words + 1))
+
+
+def similarity(a: frozenset, b: frozenset) -> tuple[float, float]:
+    """(Jaccard, containment of the smaller set in the larger) of two shingle sets."""
+    if not a or not b:
+        return 0.0, 0.0
+    common = len(a & b) if len(a) <= len(b) else len(b & a)
+    return common / (len(a) + len(b) - common), common / min(len(a), len(b))
+
+
+class NearDuplicateIndex:
+    """
+    Remembers the shingle sets of accepted transcripts and finds the one
+    a new transcript nearly duplicates. With the handful of videos in a
+    session, exact shingle overlap is cheaper than building MinHash
+    signatures and has no estimation error.
+    """
+    def __init__(
+        self,
+        shingle_words: int = SHINGLE_WORDS,
+        jaccard_threshold: float = JACCARD_THRESHOLD,
+        containment_threshold: float = CONTAINMENT_THRESHOLD,
+    ):
+        self.shingle_words = shingle_words
+        self.jaccard_threshold = jaccard_threshold
+        self.containment_threshold = containment_threshold
+        # Format: { key: frozenset of shingle hashes }
+        self._shingles = {}
+
+    def shingles_of(self, text: str) -> frozenset:
+        return shingles(text, self.shingle_words)
+
+    def match(self, text_shingles: frozenset) -> tuple | None:
+        """Returns (key, jaccard, containment) of the closest near-duplicate, or None."""
+        best = None
+        for key, other in self._shingles.items():
+            jaccard, containment = similarity(text_shingles, other)
+            if jaccard < self.jaccard_threshold and containment < self.containment_threshold:
+                continue
+            if best is None or (jaccard, containment) > best[1:]:
+                best = (key, jaccard, containment)
+        return best
+
+    def offer(self, key: int, text: str) -> tuple[bool, int | None]:
+        """
+        Decides on one arriving transcript (`key` is its 0-based source index).
+        Returns (keep, replaced): `keep` is False if an accepted transcript
+        already covers it; `replaced` is the key of an accepted transcript
+        that this one covers and supersedes, if any.
+        """
+        text_shingles = self.shingles_of(text)
+        found = self.match(text_shingles)
+        if found is None:
+            self._shingles[key] = text_shingles
+            return True, None
+
+        other, jaccard, containment = found
+        if len(text_shingles) <= len(self._shingles[other]):
+            logger.info(
+                "[Dedup] Skipping transcript #%s: near-duplicate of #%s (jaccard %.2f, containment %.2f)",
+                key + 1, other + 1, jaccard, containment,
+            )
+            return False, None
+
+        # The new one is the fuller cut; it takes over as the representative
+        logger.info(
+            "[Dedup] Transcript #%s supersedes near-duplicate #%s (jaccard %.2f, containment %.2f)",
+            key + 1, other + 1, jaccard, containment,
+        )
+        del self._shingles[other]
+        self._shingles[key] = text_shingles
+        return True, other
+
+
+def select_representatives(items: list[tuple[int, str]]) -> tuple[list[tuple[int, str]], list[int]]:
+    """
+    Groups near-duplicate (index, text) items and keeps one per group: the
+    longest, since it covers the others.
+    Returns (items to keep in input order, skipped indexes).
+    """
+    if not ENABLED:
+        return list(items), []
+
+    index = NearDuplicateIndex()
+    kept, skipped = set(), []
+    # Longest first, so every group's representative is accepted before its copies
+    for key, text in sorted(items, key=lambda item: len(item[1]), reverse=True):
+        keep, replaced = index.offer(key, text)
+        if keep:
+            kept.add(key)
+        else:
+            skipped.append(key)
+        if replaced is not None:
+            kept.discard(replaced)
+            skipped.append(replaced)
+    return [item for item in items if item[0] in kept], sorted(skipped)
@@ -0,0 +1,227 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Structured, deduplicated store of places of interest (POIs)."""
+
+import re
+import unicodedata
+from collections.abc import Iterable
+
+# Categories the distiller is asked to use; anything else lands in "Other"
+CATEGORIES = ("Sight", "Food", "Drink", "Shopping", "Nature", "Activity", "Nightlife", "Stay")
+OTHER = "Other"
+# Distinct reasons kept per POI
+MAX_REASONS = 2
+NO_AREA = "-"
+
+_SOURCE_RE = re.compile(r"^-+\s*Source\s+(\d+)\s*-+$", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_CATEGORY_LOOKUP = {category.lower(): category for category in CATEGORIES}
+
+
+def normalize_name(name: str) -> str:
+    """Merge key for a POI: case, accents, punctuation and a leading "the" ignored."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _SPACE_RE.sub(" ", _NON_WORD_RE.sub(" ", text)).strip()
+    if text.startswith("the "):
+        text = text[4:]
+    return text
+
+
+def normalize_category(category: str) -> str:
+    key = category.strip().lower()
+    if key in _CATEGORY_LOOKUP:
+        return _CATEGORY_LOOKUP[key]
+    # Tolerate plurals and small variations, e.g. "Sights", "Food & Drink"
+    for word in _NON_WORD_RE.sub(" ", key).split():
+        if word.rstrip("s") in _CATEGORY_LOOKUP:
+            return _CATEGORY_LOOKUP[word.rstrip("s")]
+    return OTHER
+
+
+def _clean_field(value: str) -> str:
+    return value.replace("**", "").replace("__", "").strip(" *_`\"'")
+
+
+def parse_poi_line(line: str) -> tuple | None:
+    """Parses a "- Name | Type | Area | Why go there" bullet (Area optional)."""
+    line = line.strip()
+    if not line or line[0] not in "-*•" or "|" not in line:
+        return None
+    fields = [_clean_field(field) for field in line.lstrip("-*• ").split("|")]
+    if len(fields) == 3:
+        name, category, reason = fields
+        area = ""
+    elif len(fields) >= 4:
+        name, category, area = fields[:3]
+        reason = " | ".join(fields[3:])
+    else:
+        return None
+    if not name:
+        return None
+    return name, category, "" if area == NO_AREA else area, reason
+
+
+class POI:
+    """One place, merged across every source that mentions it."""
+    __slots__ = ("area", "category", "name", "reasons", "sources")
+
+    def __init__(self, name: str, category: str, area: str = "", reasons=None, sources=None):
+        self.name = name
+        self.category = category
+        self.area = area
+        self.reasons = list(reasons or [])
+        self.sources = list(sources or [])
+
+    def merge(self, category: str, area: str, reason: str, source: int | None):
+        if self.category == OTHER:
+            self.category = category
+        if not self.area and area:
+            self.area = area
+        known = {normalize_name(r) for r in self.reasons}
+        if reason and normalize_name(reason) not in known and len(self.reasons) < MAX_REASONS:
+            self.reasons.append(reason)
+        if source is not None and source not in self.sources:
+            self.sources.append(source)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "area": self.area,
+            "reasons": self.reasons,
+            "sources": self.sources,
+        }
+
+
+class POIStore:
+    """
+    POIs keyed by normalized name, with an inverted index by category.
+    Filled from the distiller's "- Name | Type | Area | Why" bullets, so the
+    same place mentioned in several videos becomes a single row.
+    """
+    def __init__(self):
+        # Format: { normalized name: POI }, in first-seen order
+        self._pois = {}
+        # Format: { category: [normalized name, ...] }
+        self._by_category = {}
+
+    def __len__(self):
+        return len(self._pois)
+
+    def add(self, name: str, category: str, area: str = "", reason: str = "", source: int | None = None):
+        key = normalize_name(name)
+        if not key:
+            return
+        category = normalize_category(category)
+        poi = self._pois.get(key)
+        if poi is None:
+            poi = POI(name, category)
+            self._pois[key] = poi
+            self._by_category.setdefault(category, []).append(key)
+        elif poi.category == OTHER and category != OTHER:
+            # A later source knows what kind of place it is
+            self._by_category[OTHER].remove(key)
+            self._by_category.setdefault(category, []).append(key)
+        poi.merge(category, area, reason, source)
+
+    def add_notes(self, notes: str, source: int | None = None) -> int:
+        """
+        Adds every POI bullet in `notes`. "--- Source N ---" headers set the
+        source for the lines below them. Returns the number of bullets parsed.
+        """
+        parsed = 0
+        for line in notes.splitlines():
+            header = _SOURCE_RE.match(line.strip())
+            if header:
+                source = int(header.group(1))
+                continue
+            fields = parse_poi_line(line)
+            if fields is None:
+                continue
+            name, category, area, reason = fields
+            self.add(name, category, area, reason, source)
+            parsed += 1
+        return parsed
+
+    def get(self, name: str) -> POI | None:
+        return self._pois.get(normalize_name(name))
+
+    def by_category(self, category: str) -> list[POI]:
+        return [self._pois[key] for key in self._by_category.get(normalize_category(category), [])]
+
+    def categories(self) -> list[str]:
+        """Non-empty categories, in CATEGORIES order."""
+        order = {category: i for i, category in enumerate((*CATEGORIES, OTHER))}
+        return sorted((c for c, keys in self._by_category.items() if keys), key=order.get)
+
+    def __iter__(self):
+        return iter(self._pois.values())
+
+    def to_table(self) -> list[str]:
+        """
+        Compact table lines grouped by category; places mentioned by more
+        sources come first. Sources are written as S1, S2...
+        """
+        lines = []
+        for category in self.categories():
+            pois = sorted(self.by_category(category), key=lambda poi: -len(poi.sources))
+            lines.append(f"## {category} ({len(pois)})")
+            for poi in pois:
+                sources = ",".join(f"S{source}" for source in poi.sources)
+                lines.append(
+                    f"- {poi.name} | {poi.area or NO_AREA} | {'; '.join(poi.reasons) or NO_AREA} | {sources}"
+                )
+        return lines
+
+    def to_state(self) -> list[dict]:
+        """JSON-friendly form for session state."""
+        return [poi.to_dict() for poi in self._pois.values()]
+
+    @classmethod
+    def from_state(cls, entries: Iterable[dict]) -> "POIStore":
+        store = cls()
+        for entry in entries or []:
+            poi = POI(
+                entry["name"],
+                normalize_category(entry.get("category", OTHER)),
+                entry.get("area", ""),
+                entry.get("reasons"),
+                entry.get("sources"),
+            )
+            key = normalize_name(poi.name)
+            store._pois[key] = poi
+            store._by_category.setdefault(poi.category, []).append(key)
+        return store
+
+    @classmethod
+    def from_notes(cls, entries: Iterable[str]) -> "POIStore":
+        """Builds a store from the 'ideas_refined_text' entries."""
+        store = cls()
+        for entry in entries or []:
+            store.add_notes(str(entry))
+        return store
+
+
+def load_poi_store(state) -> POIStore:
+    """The session's POI store ('ideas_pois'), rebuilt from the notes for older sessions."""
+    if state.get("ideas_pois"):
+        return POIStore.from_state(state.get("ideas_pois"))
+    refined_text = state.get("ideas_refined_text") or []
+    if not isinstance(refined_text, list):
+        refined_text = [refined_text]
+    return POIStore.from_notes(refined_text)
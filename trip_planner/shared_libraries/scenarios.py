@@ -0,0 +1,140 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Parsed-once cache of the precreated session scenarios."""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SCENARIO_DIR = os.getenv(
+    "TRIP_PLANNER_SCENARIO_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "scenarios"),
+)
+# How often (at most) to stat a scenario file for changes
+RELOAD_CHECK_SECONDS = float(os.getenv("TRIP_PLANNER_SCENARIO_RELOAD_CHECK_SECONDS", "2"))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively converts dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Returns a fresh, mutable copy of a frozen value for session state."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class _Scenario:
+    __slots__ = ("checked_at", "data", "mtime_ns", "path")
+
+    def __init__(self, path: str, mtime_ns: int, data: Mapping):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.checked_at = time.monotonic()
+        self.data = data
+
+
+class ScenarioCache:
+    """
+    Holds each scenario file as an immutable parsed object.
+    Files are re-read only when their mtime changes, and the mtime itself
+    is checked at most every `reload_check_seconds`.
+    Scenarios can be looked up by path or by name (the file stem in
+    `scenario_dir`, e.g. "empty_default").
+    """
+    def __init__(self, scenario_dir: str = SCENARIO_DIR, reload_check_seconds: float = RELOAD_CHECK_SECONDS):
+        self.scenario_dir = scenario_dir
+        self.reload_check_seconds = reload_check_seconds
+        # Format: { "/abs/path.json": _Scenario }
+        self._scenarios = {}
+        self._lock = threading.Lock()
+
+    def preload(self):
+        """Parses every *.json scenario in the scenario directory."""
+        for path in sorted(glob.glob(os.path.join(self.scenario_dir, "*.json"))):
+            try:
+                self.get(path)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not preload scenario %s: %s", path, e)
+        logger.debug("Preloaded scenarios: %s", self.names())
+
+    def names(self) -> list[str]:
+        """Names of the scenarios loaded from the scenario directory."""
+        return sorted(
+            os.path.splitext(os.path.basename(path))[0]
+            for path in self._scenarios
+            if os.path.dirname(path) == os.path.abspath(self.scenario_dir)
+        )
+
+    def resolve(self, name_or_path: str) -> str:
+        """Maps a scenario name or a (relative) file path to an absolute path."""
+        if os.path.exists(name_or_path):
+            return os.path.abspath(name_or_path)
+        # Fall back to the scenario directory, with or without the .json suffix
+        base = os.path.basename(name_or_path)
+        if not base.endswith(".json"):
+            base += ".json"
+        return os.path.abspath(os.path.join(self.scenario_dir, base))
+
+    def get(self, name_or_path: str) -> Mapping | None:
+        """
+        Returns the frozen scenario, or None if the file does not exist.
+        Raises ValueError if the file is not valid JSON.
+        """
+        path = self.resolve(name_or_path)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._scenarios.get(path)
+            if cached is not None and now - cached.checked_at < self.reload_check_seconds:
+                return cached.data
+
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._scenarios.pop(path, None)
+                return None
+
+            if cached is not None and cached.mtime_ns == mtime_ns:
+                cached.checked_at = now
+                return cached.data
+
+            with open(path) as file:
+                data = freeze(json.load(file))
+            self._scenarios[path] = _Scenario(path, mtime_ns, data)
+            logger.info("Loaded scenario from %s", path)
+            return data
+
+
+# Global Singleton, warmed at import so session creation does no file reads
+scenario_cache = ScenarioCache()
+scenario_cache.preload()
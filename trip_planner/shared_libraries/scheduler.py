@@ -0,0 +1,207 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic day scheduler: POIs -> days -> routes -> time slots."""
+
+import math
+import os
+import re
+
+from trip_planner.shared_libraries.itinerary_validation import format_time, parse_time
+from trip_planner.shared_libraries.poi_store import POI, POIStore
+
+POIS_PER_DAY = int(os.environ.get("SCHEDULER_POIS_PER_DAY", "5"))
+DAY_START = parse_time(os.environ.get("SCHEDULER_DAY_START", "09:00"))
+DAY_END = parse_time(os.environ.get("SCHEDULER_DAY_END", "22:00"))
+TRAVEL_MINUTES = int(os.environ.get("SCHEDULER_TRAVEL_MINUTES", "30"))
+MAX_ITERATIONS = 20
+
+# Minutes spent at a place, by category. "Stay" (hotels) is never scheduled.
+VISIT_MINUTES = {
+    "Sight": 90,
+    "Food": 60,
+    "Drink": 45,
+    "Shopping": 60,
+    "Nature": 120,
+    "Activity": 120,
+    "Nightlife": 90,
+    "Other": 60,
+}
+# Categories that belong at the end of the day, not before EVENING_FROM
+EVENING_CATEGORIES = ("Drink", "Nightlife")
+EVENING_FROM = 18 * 60
+LUNCH_WINDOW = (11 * 60 + 30, 14 * 60)
+DINNER_FROM = 17 * 60 + 30
+# Distance to or from a place whose area is unknown
+UNKNOWN_AREA_DISTANCE = 0.75
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+# Address words that say nothing about where a place is
+_STOPWORDS = frozenset({
+    "the", "of", "and", "de", "la", "street", "st", "road", "rd", "avenue", "ave",
+    "city", "ward", "district", "prefecture", "near", "area", "station",
+})
+
+
+def area_tokens(area: str) -> frozenset:
+    """Words of an address or neighbourhood that identify where it is."""
+    return frozenset(word for word in _WORD_RE.findall(area.lower()) if word not in _STOPWORDS)
+
+
+def distance_matrix(pois: list[POI]) -> list[list[float]]:
+    """1 - Jaccard similarity of the area tokens, for every pair of POIs."""
+    tokens = [area_tokens(poi.area or "") for poi in pois]
+    n = len(pois)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            if not tokens[i] or not tokens[j]:
+                distance = UNKNOWN_AREA_DISTANCE
+            else:
+                distance = 1 - len(tokens[i] & tokens[j]) / len(tokens[i] | tokens[j])
+            matrix[i][j] = matrix[j][i] = distance
+    return matrix
+
+
+def k_medoids(dist: list[list[float]], k: int, capacity: int) -> list[list[int]]:
+    """
+    Partitions points into `k` groups of at most `capacity` around medoids.
+    Seeded deterministically (most central point, then farthest-first);
+    alternates capacitated assignment and medoid updates until stable.
+    """
+    n = len(dist)
+    k = max(1, min(k, n))
+    medoids = [min(range(n), key=lambda i: (sum(dist[i]), i))]
+    while len(medoids) < k:
+        medoids.append(max(
+            (i for i in range(n) if i not in medoids),
+            key=lambda i: (min(dist[i][m] for m in medoids), -i),
+        ))
+
+    clusters = []
+    for _ in range(MAX_ITERATIONS):
+        # Closest pairs first; a full cluster passes the point to the next medoid
+        pairs = sorted((dist[i][m], c, i) for i in range(n) for c, m in enumerate(medoids))
+        clusters = [[] for _ in medoids]
+        assigned = set()
+        for _, c, i in pairs:
+            if i in assigned or len(clusters[c]) >= capacity:
+                continue
+            clusters[c].append(i)
+            assigned.add(i)
+
+        new_medoids = [
+            min(cluster, key=lambda i: (sum(dist[i][j] for j in cluster), i)) if cluster else m
+            for cluster, m in zip(clusters, medoids, strict=True)
+        ]
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+
+    return [sorted(cluster) for cluster in clusters if cluster]
+
+
+def order_route(points: list[int], dist: list[list[float]]) -> list[int]:
+    """Open-path TSP heuristic: nearest neighbour from an extreme point, then 2-opt."""
+    if len(points) <= 2:
+        return list(points)
+
+    # Start at the point farthest from the rest, so the route sweeps across
+    start = max(points, key=lambda i: (sum(dist[i][j] for j in points), -i))
+    route = [start]
+    remaining = [p for p in points if p != start]
+    while remaining:
+        nearest = min(remaining, key=lambda j: (dist[route[-1]][j], j))
+        route.append(nearest)
+        remaining.remove(nearest)
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(route) - 2):
+            for j in range(i + 2, len(route) - 1):
+                a, b, c, d = route[i], route[i + 1], route[j], route[j + 1]
+                if dist[a][c] + dist[b][d] < dist[a][b] + dist[c][d] - 1e-9:
+                    route[i + 1:j + 1] = reversed(route[i + 1:j + 1])
+                    improved = True
+    return route
+
+
+def _event_type(poi: POI, start: int) -> str:
+    if poi.category == "Food":
+        if LUNCH_WINDOW[0] <= start <= LUNCH_WINDOW[1]:
+            return "lunch"
+        if start >= DINNER_FROM:
+            return "dinner"
+    return "visit"
+
+
+def _schedule_day(route: list[POI], destination: str) -> tuple[list[dict], list[POI]]:
+    """Assigns back-to-back time slots; returns (events, POIs that did not fit)."""
+    # Bars and nightlife keep their relative route order but move to the evening
+    route = (
+        [poi for poi in route if poi.category not in EVENING_CATEGORIES]
+        + [poi for poi in route if poi.category in EVENING_CATEGORIES]
+    )
+    events, overflow = [], []
+    clock = DAY_START
+    for poi in route:
+        duration = VISIT_MINUTES.get(poi.category, VISIT_MINUTES["Other"])
+        if poi.category in EVENING_CATEGORIES:
+            clock = max(clock, EVENING_FROM)
+        if clock + duration > DAY_END:
+            overflow.append(poi)
+            continue
+        events.append({
+            "event_type": _event_type(poi, clock),
+            "location": poi.name,
+            "description": "; ".join(poi.reasons) or poi.category,
+            "address": poi.area or destination,
+            "start_time": format_time(clock),
+            "end_time": format_time(clock + duration),
+            "booking_required": False,
+        })
+        clock += duration + TRAVEL_MINUTES
+    return events, overflow
+
+
+def schedule_itinerary(store: POIStore, destination: str, num_days: int = 0) -> tuple[dict, list[str]]:
+    """
+    Builds a draft itinerary (the Itinerary schema as a dict) from the POIs:
+    clusters them into days by area, orders each day's route and assigns
+    time slots. `num_days` defaults to enough days for POIS_PER_DAY each.
+    Returns (itinerary, names of POIs that did not fit).
+    """
+    pois = [poi for poi in store if poi.category != "Stay"]
+    if not pois:
+        return {"destination": destination, "days": []}, []
+
+    if num_days <= 0:
+        num_days = math.ceil(len(pois) / max(1, POIS_PER_DAY))
+    num_days = min(num_days, len(pois))
+
+    dist = distance_matrix(pois)
+    capacity = math.ceil(len(pois) / num_days)
+    clusters = k_medoids(dist, num_days, capacity)
+
+    days, unscheduled = [], []
+    for cluster in clusters:
+        route = [pois[i] for i in order_route(cluster, dist)]
+        events, overflow = _schedule_day(route, destination)
+        unscheduled.extend(poi.name for poi in overflow)
+        if events:
+            days.append({"day_number": len(days) + 1, "events": events})
+
+    return {"destination": destination, "days": days}, unscheduled
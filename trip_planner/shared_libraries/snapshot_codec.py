@@ -0,0 +1,322 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compressed binary snapshots of session state."""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Optional accelerators; the stdlib fallbacks produce compatible output
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# "auto" picks zstd, then lz4, then zlib; "none" keeps plain dict snapshots
+COMPRESSION = os.environ.get("STATE_SNAPSHOT_CODEC", "auto").lower()
+# Strings at least this long are stored once, out of line, and shared by
+# every snapshot that contains them (0 keeps everything inline)
+BLOB_MIN_BYTES = int(os.environ.get("STATE_SNAPSHOT_BLOB_MIN_BYTES", "0"))
+
+FORMAT_VERSION = 1
+_MAGIC = b"VTS"
+# magic, format version, compression id
+_HEADER = struct.Struct(">3sBB")
+_BLOB_KEY = "\x00blob"
+
+NONE, ZLIB, ZSTD, LZ4 = 0, 1, 2, 3
+_NAMES = {NONE: "none", ZLIB: "zlib", ZSTD: "zstd", LZ4: "lz4"}
+ZLIB_LEVEL = 3
+ZSTD_LEVEL = 3
+
+
+def available_compression() -> int:
+    """The best compression installed here."""
+    if zstandard is not None:
+        return ZSTD
+    if lz4_frame is not None:
+        return LZ4
+    return ZLIB
+
+
+def _check_json_native(value, path: str = "state"):
+    """
+    Raises TypeError for anything that would not survive a JSON round trip
+    unchanged: tuples and sets (back as lists), dates and other objects
+    (back as strings, if at all), non-string keys and non-finite floats.
+    """
+    if value is None or isinstance(value, (str, bool, int)):
+        return
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise TypeError(f"{path}: {value} is not valid JSON")
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"{path}: key {key!r} is not a string")
+            _check_json_native(item, f"{path}.{key}")
+        return
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            _check_json_native(item, f"{path}[{i}]")
+        return
+    raise TypeError(f"{path}: {type(value).__name__} is not JSON-native")
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class BlobStore:
+    """
+    Content-addressed, reference-counted store for large strings.
+    The same transcript or notes held by many users is compressed and
+    kept in memory once.
+    """
+    def __init__(self):
+        # Format: { sha256 hex: [compressed bytes, compression id, refcount] }
+        self._blobs = {}
+        # Compressed bytes held, across every blob
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, text: str, compress) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            entry = self._blobs.get(digest)
+            if entry is not None:
+                entry[2] += 1
+                return digest
+        compression, data = compress(text.encode("utf-8"))
+        with self._lock:
+            entry = self._blobs.get(digest)
+            if entry is None:
+                entry = self._blobs[digest] = [data, compression, 0]
+                self.bytes += len(data)
+            entry[2] += 1
+        return digest
+
+    def get(self, digest: str, decompress) -> str:
+        with self._lock:
+            data, compression, _ = self._blobs[digest]
+        return decompress(compression, data).decode("utf-8")
+
+    def retain(self, digests):
+        """Takes one more reference on each blob, e.g. to read it outside the owner's lock."""
+        with self._lock:
+            for digest in digests:
+                self._blobs[digest][2] += 1
+
+    def release(self, digests):
+        with self._lock:
+            for digest in digests:
+                entry = self._blobs.get(digest)
+                if entry is None:
+                    continue
+                entry[2] -= 1
+                if entry[2] <= 0:
+                    del self._blobs[digest]
+                    self.bytes -= len(entry[0])
+
+    def refcount(self, digest: str) -> int:
+        with self._lock:
+            entry = self._blobs.get(digest)
+            return entry[2] if entry is not None else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"blobs": len(self._blobs), "bytes": self.bytes}
+
+
+class SnapshotCodec:
+    """
+    Encodes a state dict as: a 5-byte header (magic, format version,
+    compression id) followed by compressed JSON. JSON goes through orjson
+    when installed; compression is zstd, LZ4 or zlib, whichever is
+    available. Keeps running totals of bytes and time for monitoring.
+    """
+    def __init__(self, compression: int | None = None, blob_min_bytes: int = BLOB_MIN_BYTES):
+        self.compression = available_compression() if compression is None else compression
+        self.blob_min_bytes = blob_min_bytes
+        self.blobs = BlobStore()
+        self._stats_lock = threading.Lock()
+        self.encoded = 0
+        self.decoded = 0
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def _compress(self, data: bytes) -> tuple[int, bytes]:
+        if self.compression == ZSTD:
+            # zstd contexts are not thread-safe; compressors are cheap to create
+            return ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        if self.compression == LZ4:
+            return LZ4, lz4_frame.compress(data)
+        if self.compression == ZLIB:
+            return ZLIB, zlib.compress(data, ZLIB_LEVEL)
+        return NONE, data
+
+    def _decompress(self, compression: int, data: bytes) -> bytes:
+        if compression == ZSTD:
+            if zstandard is None:
+                raise ValueError("Snapshot is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if compression == LZ4:
+            if lz4_frame is None:
+                raise ValueError("Snapshot is LZ4-compressed but lz4 is not installed")
+            return lz4_frame.decompress(data)
+        if compression == ZLIB:
+            return zlib.decompress(data)
+        if compression == NONE:
+            return data
+        raise ValueError(f"Unknown snapshot compression id {compression}")
+
+    def _outline(self, value, refs: list):
+        """Replaces large strings with references into the blob store."""
+        if isinstance(value, str):
+            if len(value) >= self.blob_min_bytes:
+                digest = self.blobs.put(value, self._compress)
+                refs.append(digest)
+                return {_BLOB_KEY: digest}
+            return value
+        if isinstance(value, dict):
+            return {k: self._outline(v, refs) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._outline(v, refs) for v in value]
+        return value
+
+    def _inline(self, value):
+        if isinstance(value, dict):
+            if len(value) == 1 and _BLOB_KEY in value:
+                return self.blobs.get(value[_BLOB_KEY], self._decompress)
+            return {k: self._inline(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._inline(v) for v in value]
+        return value
+
+    def encode(self, state: dict) -> tuple[bytes, list[str]]:
+        """
+        Returns (snapshot bytes, blob references). The caller owns the
+        references and must hand them to `release()` when it drops the snapshot.
+        Raises TypeError if `state` holds values JSON would not give back as-is.
+        """
+        start = time.perf_counter()
+        _check_json_native(state)
+        refs = []
+        try:
+            if self.blob_min_bytes > 0:
+                state = self._outline(state, refs)
+            raw = _dumps(state)
+            compression, data = self._compress(raw)
+        except Exception:
+            self.release(refs)
+            raise
+        payload = _HEADER.pack(_MAGIC, FORMAT_VERSION, compression) + data
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.encoded += 1
+            self.raw_bytes += len(raw)
+            self.encoded_bytes += len(payload)
+            self.encode_seconds += elapsed
+        return payload, refs
+
+    def decode(self, payload: bytes) -> dict:
+        start = time.perf_counter()
+        magic, version, compression = _HEADER.unpack_from(payload)
+        if magic != _MAGIC:
+            raise ValueError("Not a state snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {version}")
+        state = _loads(self._decompress(compression, payload[_HEADER.size:]))
+        if self.blob_min_bytes > 0:
+            state = self._inline(state)
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.decoded += 1
+            self.decode_seconds += elapsed
+        return state
+
+    def retain(self, refs: list[str]):
+        if refs:
+            self.blobs.retain(refs)
+
+    def release(self, refs: list[str]):
+        if refs:
+            self.blobs.release(refs)
+
+    def resident_bytes(self) -> int:
+        """Bytes held outside the snapshots themselves (the shared blobs)."""
+        return self.blobs.bytes
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = {
+                "compression": _NAMES[self.compression],
+                "json": "orjson" if orjson is not None else "json",
+                "encoded": self.encoded,
+                "decoded": self.decoded,
+                "ratio": round(self.raw_bytes / self.encoded_bytes, 2) if self.encoded_bytes else None,
+                "avg_encode_ms": round(self.encode_seconds * 1000 / self.encoded, 3) if self.encoded else None,
+                "avg_decode_ms": round(self.decode_seconds * 1000 / self.decoded, 3) if self.decoded else None,
+            }
+        if self.blob_min_bytes > 0:
+            stats["blob_store"] = self.blobs.stats()
+        return stats
+
+
+def create_codec_from_env() -> SnapshotCodec | None:
+    """The codec selected by STATE_SNAPSHOT_CODEC, or None for plain dict snapshots."""
+    if COMPRESSION == "none":
+        return None
+    names = {"zstd": ZSTD, "lz4": LZ4, "zlib": ZLIB}
+    if COMPRESSION == "auto":
+        return SnapshotCodec()
+    if COMPRESSION not in names:
+        logger.warning("[State] Unknown STATE_SNAPSHOT_CODEC '%s', using auto", COMPRESSION)
+        return SnapshotCodec()
+    requested = names[COMPRESSION]
+    if (requested == ZSTD and zstandard is None) or (requested == LZ4 and lz4_frame is None):
+        logger.warning("[State] %s is not installed, falling back to %s", COMPRESSION, _NAMES[available_compression()])
+        return SnapshotCodec()
+    return SnapshotCodec(compression=requested)
@@ -0,0 +1,73 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cheap, local token estimates used for text budgets."""
+
+# Gemini averages roughly 4 characters per token on English prose.
+# Good enough for budgeting; never use it for billing.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the number of model tokens in `text`."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def chars_for_tokens(tokens: int) -> int:
+    """Approximates how many characters fit in a token budget."""
+    return tokens * CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, tokens: int, marker: str = "...") -> str:
+    """Cuts `text` to roughly `tokens`, ending with `marker` if anything was dropped."""
+    max_chars = chars_for_tokens(tokens)
+    if len(text) <= max_chars:
+        return text
+    return text[: max(0, max_chars - len(marker))].rstrip() + marker
+
+
+def split_by_tokens(text: str, tokens: int, overlap_tokens: int = 0) -> list[str]:
+    """
+    Splits `text` into chunks of roughly `tokens` each, preferring to cut
+    at a sentence end, then at whitespace. Consecutive chunks share about
+    `overlap_tokens` of text so nothing is lost at a boundary.
+    """
+    max_chars = chars_for_tokens(tokens)
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    overlap_chars = min(chars_for_tokens(overlap_tokens), max_chars // 2)
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            # Only look for a boundary in the back fifth of the window
+            floor = start + max_chars * 4 // 5
+            cut = max(text.rfind(mark, floor, end) for mark in (". ", "? ", "! ", "\n"))
+            if cut < 0:
+                cut = text.rfind(" ", floor, end)
+            if cut >= 0:
+                end = cut + 1
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        if overlap_chars:
+            # Restart the overlap at a word boundary
+            space = text.find(" ", end - overlap_chars, end)
+            start = space + 1 if space >= 0 else end
+        else:
+            start = end
+    return [chunk for chunk in chunks if chunk]
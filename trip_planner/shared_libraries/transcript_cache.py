@@ -0,0 +1,161 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent on-disk cache for parsed YouTube transcripts."""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cloud runtimes only guarantee a writable /tmp, so default there.
+CACHE_DIR = os.environ.get(
+    "TRANSCRIPT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "vid2trip_cache")
+)
+CACHE_ENABLED = os.environ.get("TRANSCRIPT_CACHE_ENABLED", "1") != "0"
+CACHE_MAX_BYTES = int(float(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", "200")) * 1024 * 1024)
+CACHE_TTL_SECONDS = float(os.environ.get("TRANSCRIPT_CACHE_TTL_HOURS", "168")) * 3600
+NEGATIVE_TTL_SECONDS = float(os.environ.get("TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS", "600"))
+
+
+class TranscriptCache:
+    """
+    A content-addressed transcript store backed by SQLite.
+    Entries are keyed by (video_id, lang), evicted least-recently-used
+    once the total size passes `max_bytes`, and treated as stale after
+    `ttl_seconds` (or `negative_ttl_seconds` for cached failures).
+    """
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = CACHE_MAX_BYTES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        negative_ttl_seconds: float = NEGATIVE_TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    video_id TEXT NOT NULL,
+                    lang TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    is_error INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    PRIMARY KEY (video_id, lang)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts (accessed_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, video_id: str, lang: str) -> str | None:
+        """Returns the cached transcript (or cached failure), or None on a miss."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT text, is_error, created_at FROM transcripts WHERE video_id = ? AND lang = ?",
+                (video_id, lang),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            text, is_error, created_at = row
+            ttl = self.negative_ttl_seconds if is_error else self.ttl_seconds
+            if now - created_at > ttl:
+                # Stale: drop it so the caller refetches
+                conn.execute(
+                    "DELETE FROM transcripts WHERE video_id = ? AND lang = ?",
+                    (video_id, lang),
+                )
+                conn.commit()
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE transcripts SET accessed_at = ? WHERE video_id = ? AND lang = ?",
+                (now, video_id, lang),
+            )
+            conn.commit()
+            self.hits += 1
+            return text
+
+    def put(self, video_id: str, lang: str, text: str, is_error: bool = False):
+        """Stores a transcript (or a failure message) and enforces the size cap."""
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, lang, text, int(is_error), now, now, size),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drops least-recently-used entries until we are under the size cap."""
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT video_id, lang, size_bytes FROM transcripts ORDER BY accessed_at ASC"
+        ).fetchall()
+        for video_id, lang, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute(
+                "DELETE FROM transcripts WHERE video_id = ? AND lang = ?",
+                (video_id, lang),
+            )
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters for monitoring."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+# Global Singleton
+transcript_cache = TranscriptCache(os.path.join(CACHE_DIR, "transcripts.sqlite3"))
@@ -0,0 +1,104 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A pool of preconfigured, reusable yt-dlp extractor instances."""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+import yt_dlp
+
+logger = logging.getLogger(__name__)
+
+# Idle instances kept per option set; extra ones are closed on return
+MAX_IDLE_PER_KEY = int(os.environ.get("YT_DLP_POOL_MAX_IDLE", "8"))
+
+
+class YoutubeDLPool:
+    """
+    Hands out YoutubeDL instances keyed by their options (proxy included).
+    Building a YoutubeDL registers every extractor, processes options and
+    sets up HTTP handlers; reusing one keeps all of that, plus its
+    keep-alive connections. An instance is only ever used by one worker
+    at a time, so concurrent transcription threads never share one.
+    """
+    def __init__(self, max_idle_per_key: int = MAX_IDLE_PER_KEY):
+        self.max_idle_per_key = max_idle_per_key
+        # Format: { options_key: [idle YoutubeDL, ...] }
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def _key(ydl_opts: dict) -> str:
+        return json.dumps(ydl_opts, sort_keys=True, default=str)
+
+    @contextmanager
+    def acquire(self, ydl_opts: dict):
+        """Checks out an instance for `ydl_opts`, returning it to the pool afterwards."""
+        key = self._key(ydl_opts)
+        ydl = None
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                ydl = idle.pop()
+                self.reused += 1
+
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(dict(ydl_opts))
+            with self._lock:
+                self.created += 1
+
+        try:
+            yield ydl
+        finally:
+            self._release(key, ydl)
+
+    def _release(self, key: str, ydl):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append(ydl)
+                return
+        ydl.close()
+
+    def close(self):
+        """Closes every idle instance (and its connections)."""
+        with self._lock:
+            instances = [ydl for idle in self._idle.values() for ydl in idle]
+            self._idle.clear()
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception as e:
+                logger.debug("[Tool] Error closing pooled YoutubeDL: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+# Global Singleton
+ydl_pool = YoutubeDLPool()
+atexit.register(ydl_pool.close)
@@ -0,0 +1,179 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Durable persistence backends for the StateManager."""
+
+import abc
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# "memory" keeps today's process-local behaviour; "sqlite" survives restarts.
+STATE_BACKEND = os.environ.get("STATE_BACKEND", "memory").lower()
+STATE_DB_PATH = os.environ.get(
+    "STATE_DB_PATH", os.path.join(tempfile.gettempdir(), "vid2trip_cache", "state.sqlite3")
+)
+COMPACT_EVERY = int(os.environ.get("STATE_COMPACT_EVERY", "500"))
+
+
+class StateBackend(abc.ABC):
+    """
+    Interface for durable state storage.
+    Backends receive only the keys that changed since the last snapshot.
+    Writes for one user arrive in order, one at a time.
+    """
+    @abc.abstractmethod
+    def write_changes(self, user_id: str, changed: dict[str, Any], deleted: list[str]):
+        """Records new values for `changed` and tombstones for `deleted`."""
+
+    @abc.abstractmethod
+    def load(self, user_id: str) -> dict:
+        """The latest value of every live key for a user."""
+
+    def keys(self, user_id: str) -> set[str]:
+        """The live keys stored for a user."""
+        return set(self.load(user_id))
+
+    def compact(self):
+        """
+        Optional housekeeping hook, deliberately not abstract: backends with
+        nothing to compact inherit this no-op.
+        """
+        return None
+
+
+class SQLiteStateBackend(StateBackend):
+    """
+    An append-only log of per-key state changes in a local SQLite file.
+    Every save appends one row per changed (or deleted) key, so the write
+    cost tracks the size of the change. Every `compact_every` rows the log
+    is compacted down to the latest row per key.
+    """
+    def __init__(self, path: str = STATE_DB_PATH, compact_every: int = COMPACT_EVERY):
+        self.path = path
+        self.compact_every = compact_every
+        self._rows_since_compact = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS state_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    written_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_state_log_user_key ON state_log (user_id, key, seq)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def write_changes(self, user_id: str, changed: dict[str, Any], deleted: list[str]):
+        now = time.time()
+        rows = [
+            (user_id, key, json.dumps(value, default=str), 0, now)
+            for key, value in changed.items()
+        ]
+        rows += [(user_id, key, None, 1, now) for key in deleted]
+        if not rows:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT INTO state_log (user_id, key, value, deleted, written_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            self._rows_since_compact += len(rows)
+            if self.compact_every and self._rows_since_compact >= self.compact_every:
+                self._compact_locked(conn)
+
+    def load(self, user_id: str) -> dict:
+        """Replays the latest value of every key for a user."""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                """
+                SELECT key, value, deleted FROM state_log
+                WHERE seq IN (
+                    SELECT MAX(seq) FROM state_log WHERE user_id = ? GROUP BY key
+                )
+                """,
+                (user_id,),
+            ).fetchall()
+
+        return {key: json.loads(value) for key, value, deleted in rows if not deleted}
+
+    def keys(self, user_id: str) -> set[str]:
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                """
+                SELECT key, deleted FROM state_log
+                WHERE seq IN (
+                    SELECT MAX(seq) FROM state_log WHERE user_id = ? GROUP BY key
+                )
+                """,
+                (user_id,),
+            ).fetchall()
+        return {key for key, deleted in rows if not deleted}
+
+    def compact(self):
+        with self._lock:
+            self._compact_locked(self._connect())
+
+    def _compact_locked(self, conn: sqlite3.Connection):
+        """Keeps only the newest row per (user, key) and drops tombstones."""
+        started = time.perf_counter()
+        conn.execute(
+            """
+            DELETE FROM state_log WHERE seq NOT IN (
+                SELECT MAX(seq) FROM state_log GROUP BY user_id, key
+            )
+            """
+        )
+        conn.execute("DELETE FROM state_log WHERE deleted = 1")
+        conn.commit()
+        self._rows_since_compact = 0
+        logger.debug("[State] Compacted state log in %.1fms", (time.perf_counter() - started) * 1000)
+
+
+def create_backend_from_env() -> StateBackend | None:
+    """Builds the backend selected by STATE_BACKEND, or None for memory-only."""
+    if STATE_BACKEND == "sqlite":
+        return SQLiteStateBackend()
+    if STATE_BACKEND not in ("", "memory", "none"):
+        logger.warning("Unknown STATE_BACKEND '%s', keeping state in memory only", STATE_BACKEND)
+    return None
@@ -12,23 +12,299 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from trip_planner.shared_libraries.snapshot_codec import (
+    SnapshotCodec,
+    create_codec_from_env,
+)
+from trip_planner.state_backends import StateBackend, create_backend_from_env
+
+logger = logging.getLogger(__name__)
+
+MAX_USERS = int(os.environ.get("STATE_MAX_USERS", "1000"))
+IDLE_TTL_SECONDS = float(os.environ.get("STATE_IDLE_TTL_SECONDS", str(24 * 3600)))
+MAX_TOTAL_BYTES = int(float(os.environ.get("STATE_MAX_TOTAL_MB", "256")) * 1024 * 1024)
+USER_LOCK_STRIPES = 64
+
+
+def approx_size(value) -> int:
+    """
+    Cheap estimate of how many bytes a state value keeps alive.
+    Walks dicts/lists and counts strings by length; not exact, but
+    proportional to the transcripts and itineraries that dominate.
+    """
+    if isinstance(value, str):
+        return sys.getsizeof("") + len(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            approx_size(k) + approx_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def fingerprint(value) -> int:
+    """
+    Structural hash of a state value, used to spot which keys changed.
+    Python caches string hashes, so re-fingerprinting unchanged
+    transcripts costs one lookup per string rather than a full scan.
+    """
+    if isinstance(value, dict):
+        return hash(("d", tuple((k, fingerprint(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return hash(("l", tuple(fingerprint(v) for v in value)))
+    try:
+        return hash((type(value).__name__, value))
+    except TypeError:
+        return hash(("r", repr(value)))
+
+
+class _Snapshot:
+    """
+    A user's last state: either the dict itself, or (with a codec) its
+    compressed encoding plus the blob references that encoding holds.
+    """
+    __slots__ = ("blob_refs", "key_fingerprints", "key_sizes", "last_access", "payload", "size", "state")
+
+    def __init__(self, state: dict | None, key_fingerprints: dict, key_sizes: dict,
+                 payload: bytes | None = None, blob_refs: list | None = None):
+        self.state = state
+        self.payload = payload
+        self.blob_refs = blob_refs or []
+        self.key_fingerprints = key_fingerprints
+        self.key_sizes = key_sizes
+        # Resident bytes: the encoded snapshot if there is one
+        self.size = len(payload) if payload is not None else sum(key_sizes.values())
+        self.last_access = time.monotonic()
+
+
 class StateManager:
     """
-    A simple in-memory store to hold the latest state for each user.
+    A bounded in-memory store to hold the latest state for each user.
     Used solely for the 'Abandon & Resume' hydration feature.
+    Snapshots are evicted least-recently-used once there are more than
+    `max_users` of them or their approximate size passes `max_total_bytes`,
+    and dropped after `idle_ttl_seconds` without a save or restore.
+    With a `backend`, only the keys that changed since the previous
+    snapshot are written through, and users missing from memory (evicted,
+    or lost in a restart) are hydrated from it.
+    With a `codec`, suspended users are held as compressed snapshots and
+    decoded on restore; the blobs those snapshots share count toward
+    `max_total_bytes` too.
     """
-    def __init__(self):
-        # Format: { "user_id": { "destination": "Tokyo", ... } }
-        self._user_latest_state = {}
+    def __init__(
+        self,
+        max_users: int = MAX_USERS,
+        idle_ttl_seconds: float = IDLE_TTL_SECONDS,
+        max_total_bytes: int = MAX_TOTAL_BYTES,
+        backend: StateBackend | None = None,
+        codec: SnapshotCodec | None = None,
+    ):
+        self.backend = backend
+        self.codec = codec
+        self.max_users = max_users
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_total_bytes = max_total_bytes
+        # Format: { "user_id": _Snapshot({ "destination": "Tokyo", ... }) }, LRU first
+        self._user_latest_state = OrderedDict()
+        self._total_bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = threading.Lock()
+        # Striped per-user locks: ordering for one user's backend traffic
+        self._user_locks = [threading.Lock() for _ in range(USER_LOCK_STRIPES)]
 
     def save_user_state(self, user_id: str, state: dict):
         """Snapshots the current state dictionary for a user."""
-        if user_id:
-            self._user_latest_state[user_id] = state.copy()
+        if not user_id:
+            return
+
+        payload, blob_refs = self._encode(user_id, state)
+
+        # Saves for one user run one at a time, so their backend writes
+        # land in the same order as their snapshots
+        with self._user_lock(user_id):
+            with self._lock:
+                previous = self._user_latest_state.get(user_id)
+                prev_fingerprints = previous.key_fingerprints if previous else {}
+                prev_sizes = previous.key_sizes if previous else {}
+
+                # Diff against the last snapshot, key by key
+                key_fingerprints = {}
+                key_sizes = {}
+                changed = {}
+                for key, value in state.items():
+                    fp = fingerprint(value)
+                    key_fingerprints[key] = fp
+                    if prev_fingerprints.get(key) == fp:
+                        if payload is None:
+                            key_sizes[key] = prev_sizes.get(key) or approx_size(key) + approx_size(value)
+                    else:
+                        changed[key] = value
+                        if payload is None:
+                            key_sizes[key] = approx_size(key) + approx_size(value)
+                deleted = [key for key in prev_fingerprints if key not in state]
+
+                if payload is not None:
+                    snapshot = _Snapshot(None, key_fingerprints, key_sizes, payload, blob_refs)
+                else:
+                    snapshot = _Snapshot(state.copy(), key_fingerprints, key_sizes)
+                self._drop(user_id)
+                self._user_latest_state[user_id] = snapshot
+                self._total_bytes += snapshot.size
+                self._enforce_limits()
+
+            if not self.backend:
+                return
+            try:
+                if previous is None:
+                    # Nothing in memory to diff against: keys dropped while the
+                    # user was evicted still need their tombstones
+                    deleted = [key for key in self.backend.keys(user_id) if key not in state]
+                if changed or deleted:
+                    self.backend.write_changes(user_id, changed, deleted)
+            except Exception as e:
+                logger.warning("[State] Could not persist state for '%s': %s", user_id, e)
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        return self._user_locks[hash(user_id) % len(self._user_locks)]
+
+    def _encode(self, user_id: str, state: dict) -> tuple[bytes | None, list | None]:
+        """(payload, blob refs) from the codec, or (None, None) to keep the plain dict."""
+        if self.codec is None:
+            return None, None
+        try:
+            start = time.perf_counter()
+            payload, blob_refs = self.codec.encode(state)
+        except Exception as e:
+            logger.warning("[State] Could not encode snapshot for '%s', keeping it uncompressed: %s", user_id, e)
+            return None, None
+        logger.debug(
+            "[State] Encoded snapshot for '%s': %s bytes in %.2f ms",
+            user_id, len(payload), (time.perf_counter() - start) * 1000,
+        )
+        return payload, blob_refs
 
     def get_user_state(self, user_id: str):
         """Retrieves the last known state for a user."""
-        return self._user_latest_state.get(user_id, {})
+        payload = None
+        blob_refs = []
+        with self._lock:
+            snapshot = self._user_latest_state.get(user_id)
+            if snapshot is not None:
+                if time.monotonic() - snapshot.last_access <= self.idle_ttl_seconds:
+                    snapshot.last_access = time.monotonic()
+                    self._user_latest_state.move_to_end(user_id)
+                    if snapshot.payload is None:
+                        return snapshot.state
+                    payload = snapshot.payload
+                    # Our own references, so a concurrent save, eviction or
+                    # expiry cannot free the blobs while we decode
+                    blob_refs = list(snapshot.blob_refs)
+                    self.codec.retain(blob_refs)
+                else:
+                    self._drop(user_id)
+                    self._expirations += 1
+
+        if payload is not None:
+            try:
+                # Decoded outside the lock; every restore gets a fresh dict
+                return self.codec.decode(payload)
+            except Exception as e:
+                logger.warning("[State] Could not decode snapshot for '%s': %s", user_id, e)
+            finally:
+                self.codec.release(blob_refs)
+
+        if not self.backend:
+            return {}
+
+        # Not in memory: hydrate from the durable backend. The user lock
+        # keeps a concurrent save from landing between the load and the
+        # snapshot below.
+        with self._user_lock(user_id):
+            try:
+                state = self.backend.load(user_id)
+            except Exception as e:
+                logger.warning("[State] Could not load state for '%s': %s", user_id, e)
+                return {}
+            if state:
+                self._hydrate_snapshot(user_id, state)
+        return state
+
+    def _hydrate_snapshot(self, user_id: str, state: dict):
+
+        key_fingerprints = {key: fingerprint(value) for key, value in state.items()}
+        payload, blob_refs = self._encode(user_id, state)
+        if payload is not None:
+            snapshot = _Snapshot(None, key_fingerprints, {}, payload, blob_refs)
+        else:
+            snapshot = _Snapshot(
+                state,
+                key_fingerprints,
+                {key: approx_size(key) + approx_size(value) for key, value in state.items()},
+            )
+        with self._lock:
+            self._drop(user_id)
+            self._user_latest_state[user_id] = snapshot
+            self._total_bytes += snapshot.size
+            self._enforce_limits()
+
+    def user_bytes(self, user_id: str) -> int:
+        """Approximate bytes held for a single user (0 if none)."""
+        with self._lock:
+            snapshot = self._user_latest_state.get(user_id)
+            return snapshot.size if snapshot else 0
+
+    def stats(self) -> dict:
+        """Returns entry/byte/eviction counters for monitoring."""
+        with self._lock:
+            return {
+                "entries": len(self._user_latest_state),
+                "bytes": self._resident_bytes(),
+                "max_bytes": self.max_total_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "codec": self.codec.stats() if self.codec is not None else None,
+            }
+
+    def _drop(self, user_id: str):
+        snapshot = self._user_latest_state.pop(user_id, None)
+        if snapshot is not None:
+            self._total_bytes -= snapshot.size
+            if snapshot.blob_refs:
+                self.codec.release(snapshot.blob_refs)
+
+    def _resident_bytes(self) -> int:
+        """Snapshot bytes plus the blobs they share."""
+        if self.codec is None:
+            return self._total_bytes
+        return self._total_bytes + self.codec.resident_bytes()
+
+    def _enforce_limits(self):
+        """Expires idle users, then evicts LRU users until under both ceilings."""
+        now = time.monotonic()
+        for user_id, snapshot in list(self._user_latest_state.items()):
+            if now - snapshot.last_access <= self.idle_ttl_seconds:
+                # Entries are in LRU order, so the rest are fresher
+                break
+            self._drop(user_id)
+            self._expirations += 1
+
+        # Never evict the snapshot that was just written (last in order)
+        while len(self._user_latest_state) > 1 and (
+            len(self._user_latest_state) > self.max_users
+            or self._resident_bytes() > self.max_total_bytes
+        ):
+            user_id = next(iter(self._user_latest_state))
+            self._drop(user_id)
+            self._evictions += 1
 
 # Global Singleton
-state_manager = StateManager()
\ No newline at end of file
+state_manager = StateManager(backend=create_backend_from_env(), codec=create_codec_from_env())
@@ -0,0 +1,274 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact, token-budgeted views of session state for agent instructions."""
+
+import hashlib
+import json
+import logging
+import os
+
+from google.adk.agents.readonly_context import ReadonlyContext
+
+from trip_planner import prompt
+from trip_planner.shared_libraries.cache import LRUCache
+from trip_planner.shared_libraries.poi_store import load_poi_store, parse_poi_line
+from trip_planner.shared_libraries.scheduler import schedule_itinerary
+from trip_planner.shared_libraries.tokens import estimate_tokens, truncate_to_tokens
+from trip_planner.sub_agents.build_itinerary.prompt import BUILD_ITINERARY_INSTR
+from trip_planner.workflow import PRESENT, next_stage
+
+logger = logging.getLogger(__name__)
+
+# Token budget for each rendered view
+DESTINATION_TOKENS = int(os.environ.get("STATE_VIEW_DESTINATION_TOKENS", "32"))
+VIDEOS_TOKENS = int(os.environ.get("STATE_VIEW_VIDEOS_TOKENS", "200"))
+NOTES_TOKENS = int(os.environ.get("STATE_VIEW_NOTES_TOKENS", "200"))
+ITINERARY_TOKENS = int(os.environ.get("STATE_VIEW_ITINERARY_TOKENS", "2000"))
+POI_TOKENS = int(os.environ.get("STATE_VIEW_POI_TOKENS", "6000"))
+
+# Per-event description length in the detailed itinerary view
+DESCRIPTION_TOKENS = 25
+EMPTY = "None"
+
+# Default drafts for sessions without a stored one, by POI store fingerprint,
+# so the builder does not reschedule on every turn
+_draft_cache = LRUCache(max_entries=int(os.environ.get("STATE_VIEW_DRAFT_CACHE_ENTRIES", "64")))
+
+
+def _is_empty(value) -> bool:
+    return not value or value == EMPTY
+
+
+def _join_within_budget(header: str, items: list[str], tokens: int, more: str = "more") -> str:
+    """Appends items one per line until the budget is spent, then counts the rest."""
+    lines = [header]
+    used = estimate_tokens(header)
+    for shown, item in enumerate(items):
+        cost = estimate_tokens(item) + 1
+        if used + cost > tokens:
+            lines.append(f"... ({len(items) - shown} {more})")
+            break
+        lines.append(item)
+        used += cost
+    return "\n".join(lines)
+
+
+def render_destination(destination, tokens: int = DESTINATION_TOKENS) -> str:
+    if _is_empty(destination):
+        return EMPTY
+    return truncate_to_tokens(str(destination), tokens)
+
+
+def render_stage_note(note, tokens: int = NOTES_TOKENS) -> str:
+    """Why the workflow handed a stuck pipeline stage to the root agent."""
+    if _is_empty(note):
+        return EMPTY
+    return truncate_to_tokens(str(note), tokens)
+
+
+def render_videos(videos, tokens: int = VIDEOS_TOKENS) -> str:
+    """Video count plus as many URLs as fit."""
+    if _is_empty(videos):
+        return EMPTY
+    if not isinstance(videos, list):
+        videos = [videos]
+    items = [f"- {truncate_to_tokens(str(url), 30)}" for url in videos]
+    return _join_within_budget(f"{len(videos)} videos", items, tokens)
+
+
+def render_raw_text(raw_text, tokens: int = NOTES_TOKENS) -> str:
+    """Only whether transcripts are waiting for compaction, and how big they are."""
+    if _is_empty(raw_text):
+        return EMPTY
+    if not isinstance(raw_text, list):
+        raw_text = [raw_text]
+    total = sum(estimate_tokens(str(text)) for text in raw_text)
+    return truncate_to_tokens(
+        f"{len(raw_text)} transcripts pending compaction (~{total} tokens, not shown)", tokens
+    )
+
+
+def _source_digest(note: str) -> str:
+    """First content line of a compacted source, without its "--- Source N ---" header."""
+    lines = [line.strip() for line in note.splitlines() if line.strip()]
+    if lines and lines[0].startswith("---"):
+        label = lines[0].strip("- ").strip()
+        lines = lines[1:]
+    else:
+        label = "Source"
+    first = lines[0].replace("**", "").lstrip("-# ").strip() if lines else ""
+    return f"- {label}: {truncate_to_tokens(first, 20)}"
+
+
+def render_refined_text(refined_text, tokens: int = NOTES_TOKENS) -> str:
+    """Number and size of the compacted notes, with a one-line digest per source."""
+    if _is_empty(refined_text):
+        return EMPTY
+    if not isinstance(refined_text, list):
+        refined_text = [refined_text]
+    total = sum(estimate_tokens(str(note)) for note in refined_text)
+    header = f"{len(refined_text)} sources of notes (~{total} tokens)"
+    items = [_source_digest(str(note)) for note in refined_text]
+    return _join_within_budget(header, items, tokens)
+
+
+def _render_event(event: dict, with_description: bool) -> str:
+    line = f"  - {event.get('start_time', '?')}-{event.get('end_time', '?')} {event.get('location', '?')}"
+    if event.get("address"):
+        line += f" ({event['address']})"
+    if event.get("booking_required"):
+        line += " [booking required]"
+    if with_description and event.get("description"):
+        line += f": {truncate_to_tokens(str(event['description']), DESCRIPTION_TOKENS)}"
+    return line
+
+
+def _render_days(days: list, with_description: bool) -> list[str]:
+    blocks = []
+    for day in days:
+        events = day.get("events") or []
+        lines = [f"Day {day.get('day_number', '?')}:"]
+        lines.extend(_render_event(event, with_description) for event in events)
+        blocks.append("\n".join(lines))
+    return blocks
+
+
+def render_itinerary(itinerary, tokens: int = ITINERARY_TOKENS) -> str:
+    """
+    Size-capped itinerary summary. Tries times, places, addresses and short
+    descriptions first; drops the descriptions if that does not fit; and
+    finally shows as many whole days as the budget allows, saying how many
+    were left out.
+    """
+    if _is_empty(itinerary):
+        return EMPTY
+    if not isinstance(itinerary, dict):
+        return truncate_to_tokens(str(itinerary), tokens)
+
+    days = itinerary.get("days") or []
+    header = f"{itinerary.get('destination', '?')}, {len(days)} days"
+    for with_description in (True, False):
+        blocks = _render_days(days, with_description)
+        text = "\n".join([header, *blocks])
+        if estimate_tokens(text) <= tokens:
+            return text
+    return _join_within_budget(header, blocks, tokens, more="more days not shown")
+
+
+def render_full_itinerary(itinerary) -> str:
+    """The whole itinerary as JSON, for presenting it: no budget, nothing dropped."""
+    if _is_empty(itinerary):
+        return EMPTY
+    if not isinstance(itinerary, dict):
+        return str(itinerary)
+    return json.dumps(itinerary, ensure_ascii=False, indent=2)
+
+
+def render_places_of_interest(state, tokens: int = POI_TOKENS) -> str:
+    """
+    The POI store as a compact table grouped by category. Notes that held
+    no POI bullets (e.g. raw fallbacks when compaction failed) follow as
+    plain text, so nothing is lost.
+    """
+    refined_text = state.get("ideas_refined_text") or []
+    if not isinstance(refined_text, list):
+        refined_text = [refined_text]
+    store = load_poi_store(state)
+
+    unstructured = [
+        str(note) for note in refined_text
+        if not any(parse_poi_line(line) for line in str(note).splitlines())
+    ]
+    lines = store.to_table() + unstructured
+    if not lines:
+        return EMPTY
+    return _join_within_budget(f"{len(store)} places", lines, tokens)
+
+
+def _default_draft(state) -> tuple[dict, list[str]]:
+    """Schedules the POI store with the default number of days, once per store contents."""
+    destination = str(state.get("destination") or "")
+    source = state.get("ideas_pois") or state.get("ideas_refined_text") or []
+    fingerprint = hashlib.sha256(
+        json.dumps([destination, source], ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    cached = _draft_cache.get(fingerprint)
+    if cached is None:
+        cached = schedule_itinerary(load_poi_store(state), destination)
+        _draft_cache.put(fingerprint, cached)
+    return cached
+
+
+def render_draft_itinerary(state, tokens: int = ITINERARY_TOKENS) -> str:
+    """
+    The locally scheduled draft: the one saved by `draft_itinerary`, or the
+    default schedule of the POI store (rescheduled only when it changes).
+    """
+    draft = state.get("itinerary_draft")
+    unscheduled = state.get("itinerary_draft_unscheduled") or []
+    if not isinstance(draft, dict) or not draft:
+        draft, unscheduled = _default_draft(state)
+    if not draft.get("days"):
+        return EMPTY
+    text = render_itinerary(draft, tokens)
+    if unscheduled:
+        text += f"\nNot scheduled (no room left): {', '.join(unscheduled)}"
+    return text
+
+
+def render_state_views(state) -> dict:
+    """
+    All views used by the root agent's instruction, keyed by placeholder.
+    The itinerary is only size-capped while the pipeline is still routing;
+    once presenting it is the next step, root sees all of it.
+    """
+    itinerary = state.get("itinerary")
+    if next_stage(state) == PRESENT:
+        itinerary_view = render_full_itinerary(itinerary)
+    else:
+        itinerary_view = render_itinerary(itinerary)
+    return {
+        "destination": render_destination(state.get("destination")),
+        "just_restored": bool(state.get("_just_restored")),
+        "stage_note": render_stage_note(state.get("_stage_note")),
+        "ideas_videos": render_videos(state.get("ideas_videos")),
+        "ideas_raw_text": render_raw_text(state.get("ideas_raw_text")),
+        "ideas_refined_text": render_refined_text(state.get("ideas_refined_text")),
+        "itinerary": itinerary_view,
+    }
+
+
+def root_agent_instruction(context: ReadonlyContext) -> str:
+    """
+    InstructionProvider for the root agent.
+    The root agent only routes and presents, so it gets compact views of
+    state instead of the raw transcripts and notes, and the full itinerary
+    only when it is time to present it.
+    """
+    instruction = prompt.ROOT_AGENT_INSTR.format(**render_state_views(context.state))
+    logger.debug("[Context] Root instruction ~%s tokens", estimate_tokens(instruction))
+    return instruction
+
+
+def build_itinerary_instruction(context: ReadonlyContext) -> str:
+    """InstructionProvider for the itinerary builder: a POI table instead of every video's notes."""
+    instruction = BUILD_ITINERARY_INSTR.format(
+        destination=render_destination(context.state.get("destination")),
+        places_of_interest=render_places_of_interest(context.state),
+        draft_itinerary=render_draft_itinerary(context.state),
+    )
+    logger.debug("[Context] Builder instruction ~%s tokens", estimate_tokens(instruction))
+    return instruction
@@ -16,15 +16,15 @@
 """Build itinerary agent. An agent that builds itinerary given a list of itinerary ideas raw text."""
 
 from google.adk.agents import Agent
-from trip_planner.sub_agents.build_itinerary import prompt
-from trip_planner.tools.itinerary import save_itinerary # Import new tool
+from trip_planner.state_views import build_itinerary_instruction
+from trip_planner.tools.itinerary import draft_itinerary, save_itinerary
 from trip_planner.tools.memory import memorize
 
 build_itinerary_agent = Agent(
     model="gemini-2.5-pro",
     name="build_itinerary_agent", # Corrected name
     description="Builds an itinerary by discussing with the user, then saves it.",
-    instruction=prompt.BUILD_ITINERARY_INSTR, 
-    tools=[memorize, save_itinerary], 
+    instruction=build_itinerary_instruction,
+    tools=[memorize, draft_itinerary, save_itinerary],
 )
 
@@ -17,12 +17,15 @@
 
 BUILD_ITINERARY_INSTR = """
 - You are a trip planning agent who helps users build an itinerary.
-- You have access to `save_itinerary` and `memorize` tools.
+- You have access to `draft_itinerary`, `save_itinerary` and `memorize` tools.
 
 # PHASE 1: DRAFTING
-- Use the `ideas_refined_text` to draft a day-by-day itinerary.
-- **EXHAUSTION RULE:** Include EVERY attraction found in the raw text.
-- **SMART SCHEDULING:** Group by neighborhood. Create multiple days if needed.
+- A **DRAFT ITINERARY** has already been scheduled for you from the **Places of interest** table:
+  places are grouped into days by neighborhood, ordered as a route, and given time slots.
+- **START FROM THE DRAFT:** Only edit what needs changing (e.g. opening hours you know of,
+  a better meal slot). Do not rebuild the schedule from scratch.
+- **EXHAUSTION RULE:** Every place in the table must appear, including any listed as not scheduled.
+- If the user wants a different number of days, call `draft_itinerary` with `num_days` and start from the new draft.
 - **ACTION:** Present the full draft to the user as text.
 - **CRITICAL:** Do **NOT** call `save_itinerary` yet. Ask: "Does this itinerary look good?"
 
@@ -52,5 +55,10 @@ x `tool_call: save_itinerary` (text)
 
 # Context
 Trip destination: {destination}
-Trip ideas refined text: {ideas_refined_text}
+
+Places of interest (deduplicated across videos; Name | Area | Why go there | Sources):
+{places_of_interest}
+
+DRAFT ITINERARY (Day N: start-end Place (Area): Why):
+{draft_itinerary}
 """
\ No newline at end of file
@@ -18,12 +18,12 @@
 from google.adk.agents import Agent
 from trip_planner.sub_agents.gather_videos import prompt
 from trip_planner.tools.memory import memorize_to_list
-from trip_planner.tools.search import search_videos
+from trip_planner.tools.search import search_videos, search_videos_batch
 
 gather_videos_agent = Agent(
     model="gemini-2.5-flash",
     name="gather_videos_agent",
     description="Given a trip destination, this agent gathers videos related to the destination.",
     instruction=prompt.GATHER_VIDEOS_AGENT_INSTR,
-    tools=[search_videos, memorize_to_list]
+    tools=[search_videos_batch, search_videos, memorize_to_list]
 )
@@ -21,7 +21,9 @@ GATHER_VIDEOS_AGENT_INSTR = """
 - The user has already provided a destination: "{destination}".
 
 # STEP 1: SEARCH
-- If `ideas_videos` is empty, use `Youtube_tool` to find videos about "{destination}".
+- If `ideas_videos` is empty, call `search_videos_batch` ONCE with 2-4 query variants about "{destination}"
+  (e.g. "things to do in {destination}", "{destination} travel guide", "{destination} food guide").
+- Do NOT call `search_videos` repeatedly for variants; the batch tool already merges and deduplicates them.
 - Present the list to the user with numbers (1, 2, 3...).
 - ASK: "Which videos do you want to keep? (e.g. 1 and 3)"
 
@@ -13,17 +13,218 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import weakref
+
 from google.adk.tools import ToolContext
 from google.genai import Client
-import logging
+
+from trip_planner.shared_libraries.cache import LRUCache
+from trip_planner.shared_libraries.near_duplicates import select_representatives
+from trip_planner.shared_libraries.poi_store import POIStore
+from trip_planner.shared_libraries.tokens import (
+    estimate_tokens,
+    split_by_tokens,
+    truncate_to_tokens,
+)
 
 logger = logging.getLogger(__name__)
 
-def compact_travel_ideas(tool_context: ToolContext):
+COMPACTION_MODEL = "gemini-2.5-flash"
+MAX_CONCURRENCY = int(os.environ.get("COMPACTION_MAX_CONCURRENCY", "4"))
+# Input budget for a single Gemini call. Longer transcripts are split into
+# chunks that are compacted in parallel (map) and then merged (reduce).
+CALL_MAX_TOKENS = int(os.environ.get("COMPACTION_CALL_MAX_TOKENS", "8000"))
+# Text shared between neighbouring chunks so a place is never cut in half
+CHUNK_OVERLAP_TOKENS = 100
+# Room left in each call for the prompt template itself
+PROMPT_OVERHEAD_TOKENS = 300
+
+# Bump DISTILLER_PROMPT_VERSION whenever any prompt below changes,
+# so cached compactions from the old prompt are no longer served.
+DISTILLER_PROMPT_VERSION = "3"
+# One bullet per place, parsed into the structured POI store
+POI_FORMAT = """- Name | Type | Area | Why go there
+       Type is one of: Sight, Food, Drink, Shopping, Nature, Activity, Nightlife, Stay.
+       Area is the neighborhood or address if mentioned, otherwise "-"."""
+
+DISTILLER_PROMPT = """
+    You are a Data Distiller. Convert this raw YouTube transcript into structured travel notes.
+
+    INPUT TRANSCRIPT{part}:
+    {transcript}
+
+    INSTRUCTIONS:
+    1. Extract specific Places of Interest (Name, Type, Why go there).
+    2. Extract specific Food/Drink recommendations.
+    3. Ignore host chatter, intros, outros, and sponsor reads.
+    4. Output format: one bullet per place, exactly:
+       {poi_format}
+    """
+
+MERGE_PROMPT = """
+    You are a Data Distiller. The travel notes below were extracted from consecutive
+    parts of the same YouTube video. Merge them into one set of notes.
+
+    PARTIAL NOTES:
+    {notes}
+
+    INSTRUCTIONS:
+    1. Keep every distinct Place of Interest and Food/Drink recommendation.
+    2. Merge duplicates of the same place into a single bullet.
+    3. Do not add anything that is not in the notes.
+    4. Output format: one bullet per place, exactly:
+       {poi_format}
+    """
+
+# Gemini output for a given transcript/model/prompt is reused across
+# sessions and users, so repeat destinations skip the LLM call entirely.
+compaction_cache = LRUCache(
+    max_entries=int(os.environ.get("COMPACTION_CACHE_MAX_ENTRIES", "512"))
+)
+
+# One client per event loop. The async surface (client.aio) binds its
+# connection pool to the loop it first runs on, so a client is reused by
+# every call on its loop and dropped with it.
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+def _get_client() -> Client:
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None:
+            client = _clients[loop] = Client()
+    return client
+
+def _is_compactable(transcript: str) -> bool:
+    # Skip if empty or error message
+    return bool(transcript) and not transcript.startswith("Skipped") and len(transcript) >= 50
+
+def _compaction_cache_key(kind: str, text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (COMPACTION_MODEL, DISTILLER_PROMPT_VERSION, str(CALL_MAX_TOKENS), kind, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+async def _generate(kind: str, text: str, prompt: str, semaphore: asyncio.Semaphore) -> str:
+    """One cached Gemini call, capped by the shared semaphore."""
+    cache_key = _compaction_cache_key(kind, text)
+    notes = compaction_cache.get(cache_key)
+    if notes is not None:
+        return notes
+
+    async with semaphore:
+        response = await _get_client().aio.models.generate_content(
+            model=COMPACTION_MODEL,
+            contents=prompt
+        )
+    compaction_cache.put(cache_key, response.text)
+    return response.text
+
+async def _map_chunks(index: int, chunks: list[str], semaphore: asyncio.Semaphore) -> list[str]:
+    """Distills every chunk in parallel; failed chunks are dropped."""
+    async def distill(part: int, chunk: str):
+        label = f" (part {part+1} of {len(chunks)})" if len(chunks) > 1 else ""
+        prompt = DISTILLER_PROMPT.format(part=label, transcript=chunk, poi_format=POI_FORMAT)
+        try:
+            return await _generate("map", chunk, prompt, semaphore)
+        except Exception as e:
+            logger.warning("[Compaction] Failed for #%s part %s: %s", index+1, part+1, e)
+            return None
 
-    # Initialize client specifically for this tool
-    client = Client()
+    results = await asyncio.gather(*(distill(part, chunk) for part, chunk in enumerate(chunks)))
+    return [notes for notes in results if notes]
 
+async def _reduce_notes(index: int, partials: list[str], semaphore: asyncio.Semaphore) -> tuple[str, bool]:
+    """
+    Merges partial notes in groups that fit the per-call budget, repeating
+    until one set of notes is left. If a merge call fails, its group is
+    kept as plain concatenated notes.
+    Returns (notes, complete); `complete` is False if any merge failed.
+    """
+    budget = max(1, CALL_MAX_TOKENS - PROMPT_OVERHEAD_TOKENS)
+    failures = 0
+
+    async def merge(group: list[str]) -> str:
+        nonlocal failures
+        if len(group) == 1:
+            return group[0]
+        joined = "\n\n".join(group)
+        try:
+            return await _generate("reduce", joined, MERGE_PROMPT.format(notes=joined, poi_format=POI_FORMAT), semaphore)
+        except Exception as e:
+            logger.warning("[Compaction] Merging notes failed for #%s: %s", index+1, e)
+            failures += 1
+            return joined
+
+    while len(partials) > 1:
+        groups, current, used = [], [], 0
+        for notes in partials:
+            notes = truncate_to_tokens(notes, budget)
+            cost = estimate_tokens(notes)
+            if current and used + cost > budget:
+                groups.append(current)
+                current, used = [], 0
+            current.append(notes)
+            used += cost
+        groups.append(current)
+
+        merged = await asyncio.gather(*(merge(group) for group in groups))
+        if len(groups) == len(partials):
+            # Nothing could be paired up; stop rather than loop forever
+            return "\n\n".join(merged), failures == 0
+        partials = list(merged)
+        logger.debug("  ... Transcript #%s: reduced to %s partial notes", index+1, len(partials))
+
+    return partials[0], failures == 0
+
+async def _compact_transcript(index: int, transcript: str, semaphore: asyncio.Semaphore):
+    """
+    Distills a single transcript, however long.
+    The transcript is split into chunks that fit COMPACTION_CALL_MAX_TOKENS;
+    chunks are distilled in parallel and their notes merged into one entry.
+    Returns (entry, succeeded) so the caller can keep source ordering.
+    """
+    cache_key = _compaction_cache_key("transcript", transcript)
+    notes = compaction_cache.get(cache_key)
+    if notes is not None:
+        logger.debug("  ... Transcript #%s served from compaction cache", index+1)
+        return f"--- Source {index+1} ---\n{notes}", True
+
+    chunks = split_by_tokens(
+        transcript, max(1, CALL_MAX_TOKENS - PROMPT_OVERHEAD_TOKENS), CHUNK_OVERLAP_TOKENS
+    )
+    logger.debug("  ... Processing transcript #%s in %s chunk(s)...", index+1, len(chunks))
+
+    partials = await _map_chunks(index, chunks, semaphore)
+    if not partials:
+        # Fallback: Pass raw text if AI fails, so we don't lose data
+        logger.warning("[Compaction] Transcript #%s not compacted; keeping its first 5000 characters", index+1)
+        return transcript[:5000], False
+
+    notes, complete = await _reduce_notes(index, partials, semaphore)
+    if complete and len(partials) == len(chunks):
+        # Only cache complete results; a retry may recover dropped chunks
+        # or failed merges
+        compaction_cache.put(cache_key, notes)
+    # Tag the source for the Builder Agent
+    return f"--- Source {index+1} ---\n{notes}", True
+
+def publish_pois(state, refined_entries: list[str]):
+    """Rebuilds the deduplicated POI store from the notes into 'ideas_pois'."""
+    state["ideas_pois"] = POIStore.from_notes(refined_entries).to_state()
+    if state.get("itinerary_draft"):
+        # A draft scheduled from the old POIs is stale
+        state["itinerary_draft"] = {}
+        state["itinerary_draft_unscheduled"] = []
+
+async def compact_travel_ideas(tool_context: ToolContext):
     """
     Reads raw video transcripts from 'ideas_raw_text', extracts 
     high-value travel POIs, and saves them to 'ideas_refined_text'.
@@ -36,51 +237,33 @@ def compact_travel_ideas(tool_context: ToolContext):
     if not raw_texts:
         return "No raw transcripts found to compact."
 
-    logger.debug(f"\n[Tool] Compacting {len(raw_texts)} transcripts using Gemini...")
-    
-    # Initialize output list
-    state["ideas_refined_text"] = []
+    logger.debug("\n[Tool] Compacting %s transcripts using Gemini...", len(raw_texts))
     
-    success_count = 0
-    
-    for i, transcript in enumerate(raw_texts):
-        # Skip if empty or error message
-        if not transcript or transcript.startswith("Skipped") or len(transcript) < 50:
-            continue
-            
-        logger.debug(f"  ... Processing transcript #{i+1}...")
-        
-        prompt = f"""
-        You are a Data Distiller. Convert this raw YouTube transcript into structured travel notes.
-        
-        INPUT TRANSCRIPT:
-        {transcript[:30000]} # Truncate for safety
-        
-        INSTRUCTIONS:
-        1. Extract specific Places of Interest (Name, Type, Why go there).
-        2. Extract specific Food/Drink recommendations.
-        3. Ignore host chatter, intros, outros, and sponsor reads.
-        4. Output format: Bullet points.
-        """
-        
-        try:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
-            # Tag the source for the Builder Agent
-            compacted_entry = f"--- Source {i+1} ---\n{response.text}"
-            state["ideas_refined_text"].append(compacted_entry)
-            success_count += 1
-            
-        except Exception as e:
-            logger.debug(f"  [Error] Compaction failed for #{i+1}: {e}")
-            # Fallback: Pass raw text if AI fails, so we don't lose data
-            state["ideas_refined_text"].append(transcript[:5000])
+    jobs = [
+        (i, transcript) for i, transcript in enumerate(raw_texts)
+        if _is_compactable(transcript)
+    ]
+    # Re-uploads and re-cuts of the same video only need one Gemini call
+    jobs, duplicates = select_representatives(jobs)
+
+    # Run the Gemini calls concurrently, capped by COMPACTION_MAX_CONCURRENCY.
+    # gather() preserves input order, so 'Source N' tags stay in sequence.
+    semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+    results = await asyncio.gather(
+        *(_compact_transcript(i, transcript, semaphore) for i, transcript in jobs)
+    )
+
+    state["ideas_refined_text"] = [entry for entry, _ in results]
+    publish_pois(state, state["ideas_refined_text"])
+    success_count = sum(1 for _, succeeded in results if succeeded)
+    logger.debug("  [Cache] Compaction cache stats: %s", compaction_cache.stats())
 
     # CRITICAL OPTIMIZATION: Free up the memory!
     # We replace the massive raw text list with an empty list or None.
     logger.debug("  [Tool] Optimization: Clearing raw transcripts from memory.")
     state["ideas_raw_text"] = []
 
-    return f"Success: Compacted {success_count} transcripts into structured notes."
\ No newline at end of file
+    summary = f"Success: Compacted {success_count} transcripts into structured notes."
+    if duplicates:
+        summary += f" Skipped {len(duplicates)} near-duplicate transcripts."
+    return summary
@@ -16,10 +16,38 @@
 from typing import Any, Dict
 from google.adk.tools import ToolContext
 from trip_planner.shared_libraries.types import Itinerary
+from trip_planner.shared_libraries.itinerary_validation import validate_itinerary
+from trip_planner.shared_libraries.poi_store import load_poi_store
+from trip_planner.shared_libraries.scheduler import schedule_itinerary
 import logging
 
 logger = logging.getLogger(__name__)
 
+def draft_itinerary(num_days: int, tool_context: ToolContext):
+    """
+    Re-schedules the draft itinerary from the places of interest, locally:
+    groups them into days by area, orders each day's route and assigns
+    time slots. Call it when the user wants a different number of days.
+
+    Args:
+        num_days: Number of days for the trip (0 picks one automatically).
+        tool_context: The ADK tool context.
+    """
+    state = tool_context.state
+    store = load_poi_store(state)
+    if not len(store):
+        return {"status": "No places of interest found to schedule."}
+
+    draft, unscheduled = schedule_itinerary(store, str(state.get("destination") or ""), num_days)
+    state["itinerary_draft"] = draft
+    state["itinerary_draft_unscheduled"] = unscheduled
+    logger.debug("[Tool] Drafted %s days, %s places unscheduled", len(draft['days']), len(unscheduled))
+
+    status = f"Draft rescheduled into {len(draft['days'])} days (see DRAFT ITINERARY)."
+    if unscheduled:
+        status += f" Not enough room for: {', '.join(unscheduled)}."
+    return {"status": status}
+
 def save_itinerary(itinerary: Dict[str, Any], tool_context: ToolContext):
     """
     Finalizes the trip planning process by saving the structured itinerary.
@@ -48,17 +76,37 @@ def save_itinerary(itinerary: Dict[str, Any], tool_context: ToolContext):
                    }
         tool_context: The ADK tool context.
     """
-    logger.debug(f"[Tool] Validating itinerary...")
+    logger.debug("[Tool] Validating itinerary...")
+
+    # Local checks first: every problem in one pass, trivial ones repaired
+    report = validate_itinerary(itinerary)
+    if report.errors:
+        problems = "\n".join(f"- {error}" for error in report.errors)
+        logger.debug("[Tool] Itinerary rejected with %s problems", len(report.errors))
+        return {"status": (
+            f"Error: The itinerary has {len(report.errors)} problem(s). Fix ONLY these, keep everything "
+            f"else unchanged, and call save_itinerary again:\n{problems}"
+        )}
 
     try:
         # Validate that the LLM actually followed the instructions above
-        validated_obj = Itinerary(**itinerary)
+        validated_obj = Itinerary(**report.itinerary)
         itinerary_dict = validated_obj.model_dump()
     except Exception as e:
         # Return a helpful error message to the agent so it can self-correct
         return {"status": f"Error: You missed required fields. Please ensure every event has 'location', 'description', 'start_time', 'end_time', and 'address'. Details: {str(e)}"}
     
     tool_context.state['itinerary'] = itinerary_dict
-    logger.debug(f"[Tool] Itinerary saved for {itinerary_dict.get('destination', 'Unknown')}")
-    
-    return {"status": "Itinerary saved successfully. Return control to root."}
\ No newline at end of file
+    logger.debug("[Tool] Itinerary saved for %s", itinerary_dict.get('destination', 'Unknown'))
+
+    status = "Itinerary saved successfully"
+    if report.repairs:
+        logger.debug("[Tool] Auto-repaired: %s", report.repairs)
+        status += f" (auto-repaired {len(report.repairs)} formatting issues)"
+    status += ". Return control to root."
+    if report.warnings:
+        # Not errors: mention them so they can be raised with the user
+        logger.debug("[Tool] Itinerary warnings: %s", report.warnings)
+        notes = "\n".join(f"- {warning}" for warning in report.warnings)
+        status += f"\nNotes (no change needed unless the user objects):\n{notes}"
+    return {"status": status}
@@ -15,21 +15,24 @@
 
 """The 'memorize_to_list' and 'memorize' tools for several agents to affect session states."""
 
-import json
+import logging
 import os
-from typing import Dict, Any
+from typing import Any, Dict, List
 
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.sessions.state import State
-
 from google.adk.tools import ToolContext
-from typing import List
 
 from trip_planner.shared_libraries import constants
+from trip_planner.shared_libraries.scenarios import scenario_cache, thaw
+
+logger = logging.getLogger(__name__)
 
+# A scenario name (e.g. "empty_default") or a path to a scenario JSON file
 SAMPLE_SCENARIO_PATH = os.getenv(
     "TRIP_PLANNER_SCENARIO", "trip_planner/scenarios/empty_default.json"
 )
+_active_scenario = SAMPLE_SCENARIO_PATH
 
 def memorize_to_list(key: str, values: list[str], tool_context: ToolContext):
     """
@@ -97,24 +100,36 @@ def _set_initial_states(source: Dict[str, Any], target: State | dict[str, Any]):
         # Option B: Or use setdefault (Pythonic way for dicts)
         # target.setdefault(key, value) 
 
+def set_active_scenario(name_or_path: str):
+    """
+    Switches the scenario used for new sessions (e.g. between eval runs).
+    Accepts a scenario name from the scenario directory or a file path.
+    """
+    global _active_scenario
+    _active_scenario = name_or_path
+
 def _load_precreated_scenario(callback_context: CallbackContext):
     """
     Sets up the initial state if not already present.
+    The scenario comes from the preloaded cache, so this does no file reads.
     """    
-    # Optional: Check a flag to skip file I/O entirely after first run
+    # Optional: Check a flag to skip the lookup entirely after first run
     if callback_context.state.get("is_initialized"):
         return
 
-    data = {}
     try:
-        with open(SAMPLE_SCENARIO_PATH, "r") as file:
-            data = json.load(file)
-            print(f"\nLoading Initial State from {SAMPLE_SCENARIO_PATH}...\n")
-    except FileNotFoundError:
-        print(f"Warning: Scenario file not found at {SAMPLE_SCENARIO_PATH}")
+        data = scenario_cache.get(_active_scenario)
+    except ValueError as e:
+        logger.warning("Invalid scenario file %s: %s", _active_scenario, e)
+        return
+
+    if data is None:
+        logger.warning("Scenario file not found at %s", _active_scenario)
         return
 
-    _set_initial_states(data.get("state", {}), callback_context.state)
+    logger.debug("Loading Initial State from %s...", _active_scenario)
+    # The cached scenario is frozen; hand the session its own mutable copy
+    _set_initial_states(thaw(data.get("state", {})), callback_context.state)
     
-    # Mark as initialized so we don't reload the file every turn
+    # Mark as initialized so we don't reload the scenario every turn
     callback_context.state["is_initialized"] = True
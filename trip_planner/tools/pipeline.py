@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fused transcribe-and-compact ingest stage."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from google.adk.tools import ToolContext
+
+from trip_planner.shared_libraries.near_duplicates import ENABLED as NEAR_DUP_ENABLED
+from trip_planner.shared_libraries.near_duplicates import NearDuplicateIndex
+from trip_planner.tools.compactor import (
+    MAX_CONCURRENCY,
+    _compact_transcript,
+    _is_compactable,
+    publish_pois,
+)
+from trip_planner.tools.transcriber import (
+    MAX_WORKERS,
+    _fetch_transcript,
+    _resolve_result,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _transcribe_one(url: str, executor: ThreadPoolExecutor) -> str:
+    """
+    Fetches one transcript on the worker pool. As in transcribe_videos,
+    the video's time limit starts once it holds its host slot.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        text = await loop.run_in_executor(executor, _fetch_transcript, url)
+    except Exception as e:
+        return f"Error retrieving transcript: {e!s}"
+    if text.startswith("Error retrieving transcript: timed out"):
+        logger.debug("  [Warning] %s", text)
+    return text
+
+
+async def ingest_videos(tool_context: ToolContext):
+    """
+    Transcribes every video in 'ideas_videos' and compacts each transcript
+    into structured notes as soon as it arrives, while the other videos are
+    still downloading. Notes land in 'ideas_refined_text' incrementally,
+    in video order. Use this instead of calling `transcribe_videos`
+    and then `compact_travel_ideas`.
+
+    Args:
+        tool_context: The ADK context containing the session state.
+    """
+    state = tool_context.state
+    video_urls = state.get("ideas_videos", [])
+
+    if not video_urls:
+        return "No videos found to transcribe."
+
+    logger.debug("[Tool] Starting streaming ingest for %s videos...", len(video_urls))
+
+    # One slot per video, filled as each compaction finishes
+    refined = [None] * len(video_urls)
+    errors = []
+    # Sources whose notes came out of a successful compaction
+    compacted = set()
+    duplicates = []
+    # Sources replaced by a fuller near-duplicate that arrived later
+    superseded = set()
+    dedup = NearDuplicateIndex() if NEAR_DUP_ENABLED else None
+    semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(MAX_WORKERS, len(video_urls))),
+        thread_name_prefix="ingest",
+    )
+
+    async def process(index: int, url: str):
+        # Producer: transcription on the worker pool
+        text, error = _resolve_result(url, await _transcribe_one(url, executor))
+        if error:
+            errors.append(error)
+            return
+        if not _is_compactable(text):
+            return
+        logger.debug("[Tool]  - Transcribed: %s", url)
+
+        if dedup is not None:
+            keep, replaced = dedup.offer(index, text)
+            if not keep:
+                duplicates.append(index)
+                return
+            if replaced is not None:
+                superseded.add(replaced)
+                duplicates.append(replaced)
+                refined[replaced] = None
+
+        # Consumer: compaction starts immediately for this transcript
+        entry, succeeded = await _compact_transcript(index, text, semaphore)
+        if index in superseded:
+            return
+        refined[index] = entry
+        if succeeded:
+            compacted.add(index)
+
+        # Publish what we have so far, keeping video order
+        state["ideas_refined_text"] = [r for r in refined if r is not None]
+        publish_pois(state, state["ideas_refined_text"])
+
+    try:
+        await asyncio.gather(*(process(i, url) for i, url in enumerate(video_urls)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    state["ideas_refined_text"] = [r for r in refined if r is not None]
+    publish_pois(state, state["ideas_refined_text"])
+    # Nothing left to refine: transcripts went straight to notes
+    state["ideas_raw_text"] = []
+
+    # Count only the representatives that were kept
+    compacted_count = len(compacted - superseded)
+    summary = f"Success: Ingested {len(state['ideas_refined_text'])} videos ({compacted_count} compacted into structured notes)."
+    if duplicates:
+        summary += f" Skipped {len(duplicates)} near-duplicate transcripts."
+    if errors:
+        error_summary = "\n".join(errors)
+        return f"Partial {summary} Failures:\n{error_summary}"
+    return summary
@@ -15,12 +15,83 @@
  
 """Wrapper to Youtube Search Grounding."""
 
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 from duckduckgo_search import DDGS
 from google.adk.tools import ToolContext
-import logging
+
+from trip_planner.shared_libraries.cache import LRUCache
+from trip_planner.tools.youtube import extract_video_id
 
 logger = logging.getLogger(__name__)
 
+MAX_RESULTS = 5
+REGION = os.environ.get("SEARCH_REGION", "wt-wt")
+SAFESEARCH = os.environ.get("SEARCH_SAFESEARCH", "moderate")
+BATCH_MAX_WORKERS = int(os.environ.get("SEARCH_BATCH_MAX_WORKERS", "4"))
+BATCH_MAX_RESULTS = int(os.environ.get("SEARCH_BATCH_MAX_RESULTS", "10"))
+# Reciprocal-rank-fusion damping; higher values flatten rank differences
+RRF_K = 10
+
+# Popular destinations repeat across sessions; serve them from memory
+# instead of spending a DuckDuckGo round trip (and rate-limit budget).
+search_cache = LRUCache(
+    max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", "3600")),
+)
+
+_SITE_FILTER_RE = re.compile(r"site:\s*youtube\.com", re.IGNORECASE)
+
+def normalize_query(query: str) -> str:
+    """Lowercases, drops 'site:youtube.com' and collapses whitespace."""
+    query = _SITE_FILTER_RE.sub(" ", query)
+    return " ".join(query.lower().split())
+
+def _search_raw(query: str, region: str = REGION, safesearch: str = SAFESEARCH, max_results: int = MAX_RESULTS):
+    """
+    Returns the results for a query as a list of DDGS video dicts.
+    Results are cached per (normalized query, region, safesearch, max_results).
+    Raises on search errors, which are never cached.
+    """
+    clean_query = normalize_query(query)
+    cache_key = (clean_query, region, safesearch, max_results)
+
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("[Cache] Search hit for: %s", clean_query)
+        return cached
+
+    logger.debug("[Tool] Searching for videos: %s...", clean_query)
+
+    # 1. Use DuckDuckGo Video Search
+    # max_results controls how many we fetch
+    results = DDGS().videos(
+        keywords=clean_query,
+        max_results=max_results,
+        safesearch=safesearch,
+        region=region,
+    ) or []
+
+    search_cache.put(cache_key, results)
+    return results
+
+def _youtube_only(results: list[dict]) -> list[dict]:
+    # Filter for YouTube links only (just in case)
+    # DDGS returns keys: 'title', 'description', 'content' (which is the URL), 'duration'
+    return [
+        video for video in results
+        if "youtube.com" in video.get('content', '') or "youtu.be" in video.get('content', '')
+    ]
+
+def _format_video(video: dict) -> str:
+    title = video.get('title', 'Unknown Title')
+    link = video.get('content', 'No Link') # 'content' is the direct URL
+    duration = video.get('duration', 'N/A')
+    return f"- **{title}** ({duration}) - Link: {link}"
+
 def search_videos(query: str, tool_context: ToolContext):
     """
     Searches for videos using DuckDuckGo (which returns clean YouTube links) 
@@ -30,41 +101,75 @@ def search_videos(query: str, tool_context: ToolContext):
         query: The search query (e.g. "Things to do in Tokyo"). 
         tool_context: The ADK tool context.
     """
-    # Clean the query if the agent added "site:youtube.com"
-    clean_query = query.replace("site:youtube.com", "").strip()
-    
-    logger.debug(f"[Tool] Searching for videos: {clean_query}...")
-    
-    
     try:
-        # 1. Use DuckDuckGo Video Search
-        # max_results controls how many we fetch
-        results = DDGS().videos(
-            keywords=clean_query,
-            max_results=5,
-            safesearch="moderate",
-            region="wt-wt",
-        )
+        results = _search_raw(query)
         
         if not results:
             return "No videos found."
 
-        # 2. Format the output
-        formatted_results = []
-        for video in results:
-            # DDGS returns keys: 'title', 'description', 'content' (which is the URL), 'duration'
-            title = video.get('title', 'Unknown Title')
-            link = video.get('content', 'No Link') # 'content' is the direct URL
-            duration = video.get('duration', 'N/A')
-            
-            # Filter for YouTube links only (just in case)
-            if "youtube.com" in link or "youtu.be" in link:
-                formatted_results.append(f"- **{title}** ({duration}) - Link: {link}")
-            
-        if not formatted_results:
+        videos = _youtube_only(results)
+        if not videos:
             return "No valid YouTube links found."
 
-        return "\n".join(formatted_results)
+        # 2. Format the output
+        return "\n".join(_format_video(video) for video in videos)
 
     except Exception as e:
-        return f"Error performing video search: {str(e)}"
\ No newline at end of file
+        return f"Error performing video search: {e}"
+
+def search_videos_batch(queries: list[str], tool_context: ToolContext):
+    """
+    Runs several video searches at once (e.g. query variants for the same
+    destination) and returns one merged, deduplicated, ranked list.
+    Prefer this over calling `search_videos` repeatedly.
+
+    Args:
+        queries: The search queries (e.g. ["Things to do in Tokyo", "Tokyo food guide"]).
+        tool_context: The ADK tool context.
+    """
+    # Variants that normalize to the same query are only searched once
+    unique_queries = list(dict.fromkeys(normalize_query(q) for q in queries if q and q.strip()))
+    if not unique_queries:
+        return "No search queries provided."
+
+    def run(query):
+        try:
+            return query, _search_raw(query), None
+        except Exception as e:
+            return query, [], e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(BATCH_MAX_WORKERS, len(unique_queries)))) as executor:
+        outcomes = list(executor.map(run, unique_queries))
+
+    # Merge by canonical video ID, scoring with reciprocal rank fusion:
+    # videos that rank high for several variants float to the top.
+    merged = {}
+    errors = []
+    found_any = False
+    for query, results, error in outcomes:
+        if error is not None:
+            errors.append(f"{query}: {error}")
+            continue
+        found_any = found_any or bool(results)
+        seen_in_query = set()
+        for rank, video in enumerate(_youtube_only(results)):
+            video_id = extract_video_id(video.get('content', ''))
+            if video_id in seen_in_query:
+                continue
+            seen_in_query.add(video_id)
+            score = 1.0 / (RRF_K + rank + 1)
+            if video_id in merged:
+                merged[video_id]["score"] += score
+            else:
+                merged[video_id] = {"video": video, "score": score, "first_seen": len(merged)}
+
+    if not merged:
+        if errors:
+            return "Error performing video search: " + "; ".join(errors)
+        return "No valid YouTube links found." if found_any else "No videos found."
+
+    ranked = sorted(merged.values(), key=lambda m: (-m["score"], m["first_seen"]))
+    lines = [_format_video(m["video"]) for m in ranked[:BATCH_MAX_RESULTS]]
+    if errors:
+        lines.append(f"(Some searches failed: {'; '.join(errors)})")
+    return "\n".join(lines)
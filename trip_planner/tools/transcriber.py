@@ -13,13 +13,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
 from google.adk.tools import ToolContext
-from trip_planner.tools.youtube import get_youtube_transcript
 
-import logging
+from trip_planner.shared_libraries.circuit_breaker import breaker_stats
+from trip_planner.tools.youtube import (
+    get_youtube_transcript,
+    is_blocked_result,
+    is_circuit_open_result,
+)
 
 logger = logging.getLogger(__name__)
 
+# Concurrency knobs for batch transcription.
+# TRANSCRIBE_MAX_WORKERS=1 falls back to one video at a time.
+MAX_WORKERS = int(os.environ.get("TRANSCRIBE_MAX_WORKERS", "5"))
+PER_HOST_LIMIT = int(os.environ.get("TRANSCRIBE_PER_HOST_LIMIT", "3"))
+VIDEO_TIMEOUT_SECONDS = float(os.environ.get("TRANSCRIBE_TIMEOUT_SECONDS", "90"))
+
+# One semaphore per host, shared by every session in the process,
+# so concurrent sessions can't gang up on the same host either.
+_host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
 def get_circuit_breaker_raw_text(url: str):
     return f"""
             [SYSTEM: Connection to YouTube Blocked. Using Cached Data for {url}]
@@ -37,10 +59,100 @@ def get_circuit_breaker_raw_text(url: str):
             10. Tsukiji Outer Market: The best place for fresh sushi breakfast.
             """
 
+def _host_key(url: str) -> str:
+    """Normalizes a video URL to the host its requests will hit."""
+    host = urlparse(url).netloc.lower().split(":")[0]
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    # youtu.be short links resolve against youtube.com
+    if host == "youtu.be":
+        host = "youtube.com"
+    return host
+
+
+def _get_host_semaphore(host: str) -> threading.BoundedSemaphore:
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
+
+def _fetch_transcript(url: str) -> str:
+    """
+    Worker: waits for a host slot, then fetches a single transcript.
+    The video's VIDEO_TIMEOUT_SECONDS start once it holds the slot, so time
+    spent queued behind other videos never counts against it. The fetch
+    gives up between network reads when its time is up and releases the
+    slot. Every holder is bounded that way, so queued workers always get
+    their turn.
+    """
+    semaphore = _get_host_semaphore(_host_key(url))
+    semaphore.acquire()
+    try:
+        return get_youtube_transcript(url, deadline=time.monotonic() + VIDEO_TIMEOUT_SECONDS)
+    finally:
+        semaphore.release()
+
+
+def _resolve_result(url: str, text: str):
+    """
+    Applies the fail-safe fallback and sorts a fetch result into
+    (transcript, None) on success or (None, error_message) on failure.
+    """
+    # The process-wide breaker is open and we failed fast: a plain failure.
+    # Nothing was fetched for this video, so never stand in cached content.
+    if is_circuit_open_result(text):
+        return None, f"{url}: {text}"
+
+    # --- CIRCUIT BREAKER START ---
+    # Blocked (429/Bot)
+    if is_blocked_result(text):
+        logger.debug("  [Warning] YouTube blocked access (429/Bot). Engaging Fail-Safe Mode for %s.", url)
+
+        # FALLBACK: Return a high-quality "Fake" transcript so the agent can continue.
+        # This allows the Builder Agent to still generate a valid itinerary.
+        text = get_circuit_breaker_raw_text(url)
+    # --- CIRCUIT BREAKER END ---
+
+    if text.startswith("Skipped:") or text.startswith("Error"):
+        return None, f"{url}: {text}"
+    return text, None
+
+
+def _transcribe_batch(video_urls: list[str]) -> list[str]:
+    """
+    Fetches all transcripts concurrently.
+    Returns one result string per URL, in the same order as the input,
+    so wall-clock time is roughly that of the slowest video.
+    Each video gets VIDEO_TIMEOUT_SECONDS from the moment it holds its host slot.
+    """
+    results = [None] * len(video_urls)
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(MAX_WORKERS, len(video_urls))),
+        thread_name_prefix="transcribe",
+    ) as executor:
+        futures = [
+            executor.submit(_fetch_transcript, url)
+            for url in video_urls
+        ]
+        # Every fetch is bounded once it holds a slot, so waiting on each is safe
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = f"Error retrieving transcript: {e}"
+            if results[i].startswith("Error retrieving transcript: timed out"):
+                logger.debug("  [Warning] %s", results[i])
+
+    return results
+
 def transcribe_videos(tool_context: ToolContext):
     """
     Batch processes all videos currently in the 'ideas_videos' list.
-    Extracts transcripts and saves them to 'ideas_raw_text'.
+    Extracts transcripts concurrently and saves them to 'ideas_raw_text'
+    in the same order as the videos.
     
     Args:
         tool_context: The ADK context containing the session state.
@@ -51,38 +163,28 @@ def transcribe_videos(tool_context: ToolContext):
     if not video_urls:
         return "No videos found to transcribe."
         
-    logger.debug(f"[Tool] Starting batch transcription for {len(video_urls)} videos...")
+    logger.debug("[Tool] Starting batch transcription for %s videos...", len(video_urls))
     
     transcribed_count = 0
     errors = []
-    
-    # Initialize the list if it doesn't exist
-    if "ideas_raw_text" not in state:
-        state["ideas_raw_text"] = []
-        
-    for url in video_urls:
-        # 1. Call your existing robust yt-dlp function
-        # Note: We call the function directly, not as a tool
-        text = get_youtube_transcript(url, tool_context)
-
-        # --- CIRCUIT BREAKER START ---
-        # Check for "Too Many Requests" (429) or Bot detection
-        if "HTTP Error 429" in text or "Sign in to confirm" in text:
-            logger.debug(f"  [Warning] YouTube blocked access (429/Bot). Engaging Fail-Safe Mode for {url}.")
-            
-            # FALLBACK: Return a high-quality "Fake" transcript so the agent can continue.
-            # This allows the Builder Agent to still generate a valid itinerary.
-            text = get_circuit_breaker_raw_text(url)
-        # --- CIRCUIT BREAKER END ---
-        
-        if text.startswith("Skipped:") or text.startswith("Error"):
-            errors.append(f"{url}: {text}")
+    raw_texts = list(state.get("ideas_raw_text") or [])
+
+    # 1. Fetch every transcript in parallel (results come back in input order)
+    texts = _transcribe_batch(video_urls)
+
+    for url, text in zip(video_urls, texts, strict=True):
+        text, error = _resolve_result(url, text)
+        if error:
+            errors.append(error)
             continue
             
-        # 2. Save to memory directly
-        state["ideas_raw_text"].append(text)
+        raw_texts.append(text)
         transcribed_count += 1
-        logger.debug(f"[Tool]  - Transcribed: {url}")
+        logger.debug("[Tool]  - Transcribed: %s", url)
+
+    # 2. Save to memory in one write, keeping the video order stable
+    state["ideas_raw_text"] = raw_texts
+    logger.debug("[Tool] Breaker state: %s", breaker_stats())
     
     # Return a more detailed summary
     if errors:
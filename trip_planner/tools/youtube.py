@@ -15,111 +15,444 @@
 
 """The 'youtube_transcript_api' tool for several agent to obtain transcript for youtube video."""
 
-import os
+import codecs
 import glob
+import html
 import logging
-import yt_dlp
+import os
+import re
+import tempfile
+import time
 import uuid
+from collections import deque
+
+import yt_dlp
 from google.adk.tools import ToolContext
-import logging
-import tempfile
-import os
+
+from trip_planner.shared_libraries.circuit_breaker import get_breaker
+from trip_planner.shared_libraries.tokens import chars_for_tokens
+from trip_planner.shared_libraries.transcript_cache import (
+    CACHE_ENABLED,
+    transcript_cache,
+)
+from trip_planner.shared_libraries.ydl_pool import ydl_pool
 
 PROXY_URL = os.environ.get("YT_PROXY_URL")
+SUBTITLE_LANG = os.environ.get("YT_SUBTITLE_LANG", "en")
+# "memory" streams the subtitle track straight into the parser;
+# "file" keeps the old write-to-/tmp-and-read-back behaviour.
+SUBTITLE_MODE = os.environ.get("YT_SUBTITLE_MODE", "memory").lower()
+# Bounds every network read, so a stalled fetch can't hold its host slot forever
+SOCKET_TIMEOUT_SECONDS = float(os.environ.get("YT_SOCKET_TIMEOUT_SECONDS", "30"))
+# yt-dlp retries per request (its defaults, 10 and 3, can stretch one
+# video's metadata lookup to several minutes of socket timeouts)
+RETRIES = int(os.environ.get("YT_RETRIES", "2"))
+EXTRACTOR_RETRIES = int(os.environ.get("YT_EXTRACTOR_RETRIES", "1"))
+
+# Prefix of the fail-fast result returned while the YouTube breaker is open
+CIRCUIT_OPEN_PREFIX = "Skipped: YouTube circuit open"
+# Prefix of the result for a video without any subtitle track
+NO_SUBTITLES_PREFIX = "Skipped: No subtitles found"
+
+# Text budget for a single parsed transcript (0 disables a limit).
+# Compaction chunks long transcripts, so this is mostly a ceiling on what
+# 'ideas_raw_text' carries through every snapshot and backend write
+# (30k tokens, ~120 KB, is about two hours of speech).
+TRANSCRIPT_MAX_CHARS = int(os.environ.get("TRANSCRIPT_MAX_CHARS", "0"))
+TRANSCRIPT_MAX_TOKENS = int(os.environ.get("TRANSCRIPT_MAX_TOKENS", "30000"))
+# How far back to look for rolling-caption overlap between cues
+OVERLAP_WINDOW_WORDS = 64
+# Shorter overlaps are only dropped when they repeat the whole previous cue;
+# otherwise they are as likely to be real repeated words ("no no")
+MIN_OVERLAP_WORDS = 2
+# Bump when the parser output changes so stale cached transcripts are refetched
+PARSER_VERSION = "3"
+
+# Inline cue tags: <00:00:01.234>, <c>, </c>, <c.colorE5E5E5>, <v Speaker>, ...
+_VTT_TAG_RE = re.compile(r"<[^>]*>")
+
+# Matches the 11-char video ID in watch, short-link, shorts, embed and live URLs
+_VIDEO_ID_RE = re.compile(
+    r"(?:v=|/shorts/|/embed/|/live/|youtu\.be/)([A-Za-z0-9_-]{11})"
+)
 
 logger = logging.getLogger(__name__)
 
-def get_youtube_transcript(video_url: str, tool_context: ToolContext = None):
+def extract_video_id(video_url: str) -> str:
+    """
+    Returns the canonical YouTube video ID for a URL,
+    or the stripped URL itself if no ID can be found.
+    """
+    match = _VIDEO_ID_RE.search(video_url)
+    return match.group(1) if match else video_url.strip()
+
+def _cache_lang_key() -> str:
+    """Subtitle language plus everything else that shapes the parsed text."""
+    return f"{SUBTITLE_LANG}/p{PARSER_VERSION}/{TRANSCRIPT_MAX_CHARS}c/{TRANSCRIPT_MAX_TOKENS}t"
+
+def _is_failure(text: str) -> bool:
+    return text.startswith("Skipped") or text.startswith("Error")
+
+def _is_rate_limited(text: str) -> bool:
+    # "Too Many Requests" (429) or Bot detection
+    return "HTTP Error 429" in text or "Sign in to confirm" in text
+
+def is_blocked_result(text: str) -> bool:
+    """True if YouTube blocked this request (429/Bot)."""
+    return _is_rate_limited(text)
+
+def is_circuit_open_result(text: str) -> bool:
+    """True if the breaker refused to try; nothing was fetched."""
+    return text.startswith(CIRCUIT_OPEN_PREFIX)
+
+def youtube_breaker():
+    """The breaker for the egress route we use (per proxy, or direct)."""
+    return get_breaker(f"youtube:{PROXY_URL or 'direct'}")
+
+def _check_deadline(deadline: float | None):
+    """Raises TimeoutError once `deadline` (a time.monotonic() value) has passed."""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise TimeoutError("timed out: per-video time limit reached")
+
+def get_youtube_transcript(video_url: str, tool_context: ToolContext | None = None, deadline: float | None = None):
     """
     Retrieves the transcript from a YouTube video URL using yt-dlp.
+    Transcripts (and, briefly, missing subtitles) are cached on disk by video ID
+    and subtitle language, so cache hits never touch YouTube.
+    With a `deadline` (a time.monotonic() value), the download gives up
+    between network reads once it passes.
+    """
+    if not CACHE_ENABLED:
+        return _download_transcript(video_url, deadline)
+
+    video_id = extract_video_id(video_url)
+    cache_lang = _cache_lang_key()
+    try:
+        cached = transcript_cache.get(video_id, cache_lang)
+    except Exception as e:
+        logger.debug("[Cache] Transcript cache unavailable: %s", e)
+        return _download_transcript(video_url, deadline)
+
+    if cached is not None:
+        logger.debug("[Cache] Transcript hit for %s", video_id)
+        return cached
+
+    transcript_text = _download_transcript(video_url, deadline)
+
+    # Only "this video has no subtitles" is worth remembering. Rate limits,
+    # bot checks, breaker fail-fasts and network errors say nothing about
+    # the video and must not outlive the breaker.
+    is_error = _is_failure(transcript_text)
+    if is_error and not transcript_text.startswith(NO_SUBTITLES_PREFIX):
+        return transcript_text
+
+    try:
+        transcript_cache.put(video_id, cache_lang, transcript_text, is_error=is_error)
+    except Exception as e:
+        logger.debug("[Cache] Could not store transcript for %s: %s", video_id, e)
+
+    return transcript_text
+
+def _download_transcript(video_url: str, deadline: float | None = None):
+    """
+    Downloads and parses the subtitles for a single video.
     This method is robust against YouTube's bot detection.
-    Saving to /tmp to avoid Read-Only filesystem errors in Cloud.
     """
-    # Use the system temp directory (usually /tmp in Linux/Cloud)
-    temp_dir = tempfile.gettempdir()
-    temp_id = str(uuid.uuid4())
-    
-    # Define the full path pattern for the output
-    # yt-dlp appends .en.vtt automatically, so we just give the prefix
-    output_template = os.path.join(temp_dir, f"temp_subs_{temp_id}")
-    
-    # Configure yt-dlp to only download subtitles, not the video
+    breaker = youtube_breaker()
+    if not breaker.allow_request():
+        return f"{CIRCUIT_OPEN_PREFIX} (retry in {breaker.retry_after():.0f}s) for {video_url}"
+
+    if SUBTITLE_MODE == "file":
+        transcript_text = _download_transcript_to_file(video_url, deadline)
+    else:
+        transcript_text = _download_transcript_in_memory(video_url, deadline)
+
+    if _is_rate_limited(transcript_text):
+        breaker.record_failure()
+    elif transcript_text.startswith("Error"):
+        # Network hiccups etc. don't prove we're blocked, or unblocked
+        breaker.record_neutral()
+    else:
+        breaker.record_success()
+
+    return transcript_text
+
+def _base_ydl_opts(video_url: str) -> dict:
+    # Configure yt-dlp to only fetch subtitles, not the video
     ydl_opts = {
         'skip_download': True,      # Don't download the video file
         'writeautomaticsub': True,  # Download auto-generated subs
         'writesubtitles': True,     # Download manual subs if available
-        'sub_langs': ['en', 'en-orig', '.*'],   # Prefer English, but accept others
-        'outtmpl': output_template,  # <--- Write to /tmp
+        'sub_langs': [SUBTITLE_LANG, f'{SUBTITLE_LANG}-orig', '.*'],   # Prefer YT_SUBTITLE_LANG, but accept others
+        'subtitlesformat': 'vtt/best',
         'quiet': True,              # Less noise in console
         'no_warnings': True,
-        # CRITICAL: Also move the cache to /tmp so it doesn't try to write to ~
-        'paths': {'home': temp_dir},
+        'socket_timeout': SOCKET_TIMEOUT_SECONDS,
+        'retries': RETRIES,
+        'extractor_retries': EXTRACTOR_RETRIES,
     }
 
     if PROXY_URL:
         ydl_opts['proxy'] = PROXY_URL
-        logger.debug(f"[Tool] Using Proxy for {video_url}...")
+        logger.debug("[Tool] Using Proxy for %s...", video_url)
+
+    return ydl_opts
+
+def _pick_subtitle_track(requested_subtitles: dict):
+    """Chooses the preferred-language track out of yt-dlp's selection."""
+    for lang in (SUBTITLE_LANG, f"{SUBTITLE_LANG}-orig"):
+        if lang in requested_subtitles:
+            return requested_subtitles[lang]
+    return next(iter(requested_subtitles.values()))
+
+def _iter_response_lines(response, chunk_size: int = 64 * 1024, deadline: float | None = None):
+    """
+    Decodes an HTTP response incrementally and yields it line by line.
+    Raises TimeoutError between reads once `deadline` has passed.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        _check_deadline(deadline)
+        chunk = response.read(chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def _download_transcript_in_memory(video_url: str, deadline: float | None = None):
+    """
+    Resolves the subtitle track URL from yt-dlp's extracted info and
+    streams it straight into the parser. Nothing is written to disk.
+    The metadata lookup is bounded by the socket timeout and retry limits;
+    the subtitle download also stops at `deadline`.
+    """
+    ydl_opts = _base_ydl_opts(video_url)
+    # Keep yt-dlp's own cache off the filesystem too
+    ydl_opts['cachedir'] = False
 
     try:
+        # Pooled per option set (incl. proxy): no per-video extractor setup,
+        # and HTTP connections stay alive between videos
+        with ydl_pool.acquire(ydl_opts) as ydl:
+            logger.debug("[Tool]  ... Fetching subs for %s ...", video_url)
+            info = ydl.extract_info(video_url, download=False)
+
+            requested = (info or {}).get('requested_subtitles') or {}
+            if not requested:
+                return f"{NO_SUBTITLES_PREFIX} for {video_url}"
+
+            track = _pick_subtitle_track(requested)
+            _check_deadline(deadline)
+
+            # Some extractors inline the subtitle body instead of a URL
+            if track.get('data'):
+                return _parse_vtt_lines(track['data'].splitlines())
+
+            with ydl.urlopen(track['url']) as response:
+                return _parse_vtt_lines(_iter_response_lines(response, deadline=deadline))
+
+    except Exception as e:
+        # Debugging: Return the actual error so we can see it in the Agent response
+        return f"Error retrieving transcript: {e}"
+
+def _download_transcript_to_file(video_url: str, deadline: float | None = None):
+    """
+    Legacy mode: lets yt-dlp write the VTT files, then reads them back.
+    Saving to /tmp to avoid Read-Only filesystem errors in Cloud.
+    yt-dlp runs the whole download, so `deadline` is only checked before it starts.
+    """
+    # Use the system temp directory (usually /tmp in Linux/Cloud)
+    temp_dir = tempfile.gettempdir()
+    temp_id = str(uuid.uuid4())
+
+    # Define the full path pattern for the output
+    # yt-dlp appends .en.vtt automatically, so we just give the prefix
+    output_template = os.path.join(temp_dir, f"temp_subs_{temp_id}")
+
+    ydl_opts = _base_ydl_opts(video_url)
+    ydl_opts['outtmpl'] = output_template  # <--- Write to /tmp
+    # CRITICAL: Also move the cache to /tmp so it doesn't try to write to ~
+    ydl_opts['paths'] = {'home': temp_dir}
+
+    list_of_files = []
+    try:
+        _check_deadline(deadline)
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            logger.debug(f"[Tool]  ... Fetching subs for {video_url} ...")
+            logger.debug("[Tool]  ... Fetching subs for %s ...", video_url)
             ydl.download([video_url])
 
         # yt-dlp saves files like '/tmp/temp_subs_<id>.en.vtt'
         # We search specifically in the temp_dir
         search_pattern = os.path.join(temp_dir, f"temp_subs_{temp_id}*.vtt")
-        list_of_files = glob.glob(search_pattern)
+        list_of_files = sorted(glob.glob(search_pattern))
         
         if not list_of_files:
-            return f"Skipped: No subtitles found for {video_url}"
+            return f"{NO_SUBTITLES_PREFIX} for {video_url}"
 
-        # Use the first file found (usually English if available)
-        vtt_file = list_of_files[0]
+        # Prefer the configured language, otherwise the first file found
+        preferred = os.path.join(temp_dir, f"temp_subs_{temp_id}.{SUBTITLE_LANG}.vtt")
+        vtt_file = preferred if preferred in list_of_files else list_of_files[0]
         
         # Read and clean the VTT file
-        transcript_text = _parse_vtt(vtt_file)
-        
-        # Clean up: Delete the temporary file
-        try:
-            os.remove(vtt_file)
-        except OSError:
-            pass
-
-        return transcript_text
+        return _parse_vtt(vtt_file)
 
     except Exception as e:
         # Debugging: Return the actual error so we can see it in the Agent response
         return f"Error retrieving transcript: {str(e)}"
 
+    finally:
+        # Clean up: Delete every subtitle file yt-dlp wrote, not just the one we read
+        for path in list_of_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
 def _parse_vtt(file_path):
     """
     Simple helper to strip timestamps and metadata from a WebVTT file.
     """
-    lines = []
-    seen_lines = set() # To remove duplicates common in auto-subs
-    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # Skip empty lines, 'WEBVTT' header, and timestamps (arrows)
-                if not line: continue
-                if 'WEBVTT' in line: continue
-                if '-->' in line: continue
-                if line.isdigit(): continue # Skip raw line numbers
-                
-                # Deduplicate lines (auto-captions often repeat phrases)
-                if line not in seen_lines:
-                    lines.append(line)
-                    seen_lines.add(line)
-        
-        full_text = " ".join(lines)
-        
-        # Truncate if too long for LLM
-        if len(full_text) > 15000:
-            full_text = full_text[:15000] + "... (truncated)"
+        with open(file_path, encoding='utf-8') as f:
+            return _parse_vtt_lines(f)
+    except Exception as e:
+        return f"Error parsing subtitle file: {e}"
+
+def _clean_cue_text(payload_lines: list[str]) -> list[str]:
+    """Joins a cue's payload, drops inline timing/style tags and returns its words."""
+    text = " ".join(payload_lines)
+    if "<" in text:
+        text = _VTT_TAG_RE.sub("", text)
+    if "&" in text:
+        text = html.unescape(text)
+    return text.split()
+
+def _overlap_length(tail_keys: deque, cue_keys: list[str]) -> int:
+    """
+    Length of the longest suffix of the emitted text that the new cue starts with.
+    Rolling auto-captions repeat the previous line at the top of every cue.
+    """
+    if not tail_keys or not cue_keys:
+        return 0
+    tail = list(tail_keys)
+    n = len(tail)
+    first = cue_keys[0]
+    # Earliest matching start gives the longest overlap
+    for start in range(max(0, n - len(cue_keys)), n):
+        if tail[start] == first and tail[start:] == cue_keys[:n - start]:
+            return n - start
+    return 0
+
+def _parse_vtt_lines(raw_lines, max_chars: int = TRANSCRIPT_MAX_CHARS, max_tokens: int = TRANSCRIPT_MAX_TOKENS):
+    """
+    Streaming WebVTT parser.
+    Walks the input cue by cue, strips inline timing tags, removes the
+    rolling-caption overlap between consecutive cues, and stops reading
+    as soon as the character (or estimated token) budget is full.
+    Pass max_chars=0 and max_tokens=0 to parse the whole track.
+    """
+    budget = max_chars or 0
+    if max_tokens:
+        token_chars = chars_for_tokens(max_tokens)
+        budget = min(budget, token_chars) if budget else token_chars
+
+    words = []
+    used_chars = 0
+    truncated = False
+    # Lower-cased recent words, compared against the head of each new cue
+    tail_keys = deque(maxlen=OVERLAP_WINDOW_WORDS)
+    # Words the previous cue added; rolling captions repeat them as a line
+    previous_cue_words = 0
+
+    payload = []
+    in_cue = False
+    skipping_block = False
+
+    def flush_cue():
+        nonlocal used_chars, truncated, previous_cue_words
+        cue_words = _clean_cue_text(payload)
+        payload.clear()
+        if not cue_words:
+            return
+        cue_keys = " ".join(cue_words).lower().split()
+        skip = _overlap_length(tail_keys, cue_keys)
+        if skip < MIN_OVERLAP_WORDS and skip != previous_cue_words:
+            skip = 0
+        new_words = cue_words[skip:]
+        if not new_words:
+            return
+
+        cost = sum(map(len, new_words)) + len(new_words)
+        if budget and used_chars + cost > budget:
+            # Take whatever still fits, then stop reading
+            for word in new_words:
+                if used_chars + len(word) + 1 > budget:
+                    break
+                words.append(word)
+                used_chars += len(word) + 1
+            truncated = True
+            return
+
+        words.extend(new_words)
+        tail_keys.extend(cue_keys[skip:])
+        previous_cue_words = len(new_words)
+        used_chars += cost
+
+    try:
+        for line in raw_lines:
+            line = line.strip()
+
+            if not line:
+                # Blank line ends the current block
+                if in_cue:
+                    flush_cue()
+                    if truncated:
+                        break
+                in_cue = False
+                skipping_block = False
+                continue
+
+            if '-->' in line:
+                # Timing line: a new cue starts here
+                if in_cue:
+                    flush_cue()
+                    if truncated:
+                        break
+                in_cue = True
+                skipping_block = False
+                continue
+
+            if skipping_block:
+                continue
+
+            if in_cue:
+                payload.append(line)
+                continue
+
+            # Outside a cue: header, NOTE/STYLE/REGION blocks, or cue identifiers
+            if line.startswith(('WEBVTT', 'NOTE', 'STYLE', 'REGION', 'Kind:', 'Language:')):
+                skipping_block = not line.startswith(('Kind:', 'Language:'))
+                continue
+
+        else:
+            if in_cue:
+                flush_cue()
+
+        full_text = " ".join(words)
+
+        # Mark the cut so downstream prompts know the text is partial
+        if truncated:
+            full_text += "... (truncated)"
             
         return full_text
-        
+
+    except TimeoutError:
+        # The download ran out of time; not a parsing problem
+        raise
     except Exception as e:
         return f"Error parsing subtitle file: {e}"
\ No newline at end of file
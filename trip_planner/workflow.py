@@ -0,0 +1,160 @@
+# Copyright 2025 Google LLC
+# Copyright 2025 Grace Liu
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Code-driven orchestrator for the trip planning pipeline."""
+
+import logging
+from collections.abc import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.sessions.state import State
+from google.adk.utils.context_utils import Aclosing
+from google.genai import types
+
+from trip_planner.tools.compactor import compact_travel_ideas
+from trip_planner.tools.pipeline import ingest_videos
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages, in order. Mirrors the state machine in ROOT_AGENT_INSTR.
+DESTINATION = "destination"
+GATHER = "gather"
+INGEST = "ingest"
+REFINE = "refine"
+PLAN = "plan"
+PRESENT = "present"
+
+GATHER_AGENT_NAME = "gather_videos_agent"
+PLAN_AGENT_NAME = "build_itinerary_agent"
+
+# Safety net against a stage that keeps "advancing" without changing state
+MAX_STAGES_PER_TURN = 8
+
+# Session-only note telling the root agent a code stage is stuck this turn.
+# Like "_just_restored", it is written to the raw state and never persisted.
+STAGE_NOTE_KEY = "_stage_note"
+
+
+def next_stage(state) -> str:
+    """Picks the pipeline stage purely from session state."""
+    if not state.get("destination") or state.get("destination") == "None":
+        return DESTINATION
+    if not state.get("ideas_videos"):
+        return GATHER
+    if state.get("ideas_raw_text"):
+        return REFINE
+    if state.get("itinerary"):
+        return PRESENT
+    if state.get("ideas_refined_text"):
+        return PLAN
+    return INGEST
+
+
+class _StageContext:
+    """The slice of ToolContext our tools use, backed by a delta-tracking State."""
+    def __init__(self, session_state: dict):
+        self.delta = {}
+        self.state = State(value=session_state, delta=self.delta)
+
+
+class TripPlannerWorkflow(BaseAgent):
+    """
+    Runs destination -> gather -> ingest -> refine -> plan without spending
+    model calls on routing. Ingest and refine run the tools directly in code;
+    the conversational stages are delegated straight to the agent that owns
+    them (the LLM `root_agent` for destination and presentation, and its
+    sub-agents for gathering and planning). A delegated agent is cut off as
+    soon as it writes the state key that completes its stage, so the next
+    stage starts in the same turn instead of after an LLM transfer.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+
+        # Welcome back once, here; root's instruction then sees the flag cleared
+        if state.pop("_just_restored", None):
+            yield self._message(
+                ctx, f"Welcome back! I've restored your planning session for **{state.get('destination')}**."
+            )
+
+        last_code_stage = None
+        last_result = None
+        for _ in range(MAX_STAGES_PER_TURN):
+            stage = next_stage(state)
+            logger.debug("[Workflow] Stage: %s", stage)
+
+            if stage in (INGEST, REFINE):
+                if stage != last_code_stage:
+                    tool = ingest_videos if stage == INGEST else compact_travel_ideas
+                    event = await self._run_tool(ctx, tool)
+                    yield event
+                    last_code_stage = stage
+                    last_result = event.content.parts[0].text
+                    continue
+                # The tool just ran and made no progress (e.g. every video
+                # failed): the root agent talks it through instead of re-running it
+                state[STAGE_NOTE_KEY] = f"The {stage} step made no progress this turn: {last_result}"
+
+            # Conversational stages: hand the turn to the owning agent
+            agent, done_key = self._delegate_for(stage)
+            advanced = False
+            try:
+                async with Aclosing(agent.run_async(ctx)) as agen:
+                    async for event in agen:
+                        yield event
+                        if self._completes(event, done_key):
+                            advanced = True
+                            break
+            finally:
+                state.pop(STAGE_NOTE_KEY, None)
+
+            if not advanced:
+                # The agent is waiting on the user
+                return
+
+    def _delegate_for(self, stage: str):
+        conversation_agent = self.sub_agents[0]
+        if stage == GATHER:
+            return self.find_agent(GATHER_AGENT_NAME), "ideas_videos"
+        if stage == PLAN:
+            return self.find_agent(PLAN_AGENT_NAME), "itinerary"
+        if stage == DESTINATION:
+            return conversation_agent, "destination"
+        # PRESENT, or a stuck code stage: nothing to advance to automatically
+        return conversation_agent, None
+
+    @staticmethod
+    def _completes(event: Event, done_key: str | None) -> bool:
+        if done_key is None or not event.actions or not event.actions.state_delta:
+            return False
+        return bool(event.actions.state_delta.get(done_key))
+
+    async def _run_tool(self, ctx: InvocationContext, tool) -> Event:
+        """Calls a pipeline tool in code and records its state changes as an event."""
+        stage_context = _StageContext(ctx.session.state)
+        result = await tool(stage_context)
+        logger.debug("[Workflow] %s: %s", tool.__name__, result)
+        return self._message(ctx, result, state_delta=stage_context.delta)
+
+    def _message(self, ctx: InvocationContext, text: str, state_delta: dict | None = None) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta or {}),
+        )